@@ -1,26 +1,83 @@
+from __future__ import annotations
+
+import argparse
 import base64
 import html as html_lib
+import importlib
+import importlib.util
 import os
+import sys
 import streamlit as st
-import requests
 import re
-from bs4 import BeautifulSoup
-from urllib.parse import quote_plus, urlparse
-import pandas as pd
+from urllib.parse import quote_plus, urlparse, parse_qsl, urlencode
+import asyncio
+import atexit
+import contextvars
+import copy
+import multiprocessing
+import pickle
+from collections import Counter
+import sqlite3
+import zlib
+import threading
+import unicodedata
 import time, random, hashlib
-from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait as wait_futures
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from email.utils import parsedate_to_datetime
-from typing import Optional, Dict, Tuple, List
+from typing import Optional, Dict, Tuple, List, Union, Iterable, Iterator
 from difflib import SequenceMatcher
+from functools import lru_cache, wraps
 import json
-import os
 
-try:
-    from wordfreq import zipf_frequency
-    WORDFREQ_OK = True
-except Exception:
-    WORDFREQ_OK = False
+
+class _LazyModule:
+    """
+    Stand-in for a heavy dependency that imports it on first attribute access, so a
+    cold start (or `python -m app batch --help`) does not pay for pandas/requests/bs4/lxml.
+    """
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        mod = self.__dict__["_module"]
+        if mod is None:
+            mod = importlib.import_module(self.__dict__["_name"])
+            self.__dict__["_module"] = mod
+        return mod
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+
+pd = _LazyModule("pandas")
+requests = _LazyModule("requests")
+bs4 = _LazyModule("bs4")
+
+
+def _has_module(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+# Optional: wordfreq for the misspelling check (imported on first use; ~0.2s)
+WORDFREQ_OK = _has_module("wordfreq")
+
+
+@lru_cache(maxsize=1)
+def _zipf_frequency():
+    try:
+        from wordfreq import zipf_frequency
+        return zipf_frequency
+    except Exception:
+        return None
 
 def _env_or_secret(key: str, default=None):
     v = os.getenv(key)
@@ -38,11 +95,48 @@ def _first_secret(keys: List[str], default=None):
 # Optional (recommended): JS rendering tool
 # pip install playwright
 # playwright install chromium
-try:
-    from playwright.sync_api import sync_playwright
-    PLAYWRIGHT_OK = True
-except Exception:
-    PLAYWRIGHT_OK = False
+# Imported by the browser pool on its first launch.
+PLAYWRIGHT_OK = _has_module("playwright")
+
+
+def async_playwright():
+    from playwright.async_api import async_playwright as _async_playwright
+    return _async_playwright()
+
+# Optional: lxml (fast C parser; read-only page views skip BeautifulSoup entirely).
+# Imported on the first lxml parse.
+LXML_OK = _has_module("lxml")
+lxml_html = _LazyModule("lxml.html")
+
+# HTML parser backends, fastest first. "html.parser" is the reference behaviour.
+HTML_PARSER_BACKENDS = ("lxml", "html.parser")
+
+
+def _resolve_html_parser(pref: Optional[str]) -> str:
+    pref = (pref or "auto").strip().lower()
+    for name in (HTML_PARSER_BACKENDS if pref == "auto" else (pref,)):
+        if name == "html.parser" or (name == "lxml" and LXML_OK):
+            return name
+    return "html.parser"
+
+
+# Every BeautifulSoup (heading tree, gap rows, FAQ detection, text extraction) stays on
+# html.parser: lxml closes omitted end tags differently (`<p>intro<h2>...`), which
+# reshapes the trees built from the soup.
+HTML_PARSER = _resolve_html_parser(os.getenv("HTML_PARSER", "html.parser"))
+# ParsedPage's tag/attribute views (links, images, meta, title, JSON-LD) do not depend on
+# nesting, so they may read an lxml tree; tests/test_parser_parity.py checks they give the
+# html.parser answers.
+HTML_VIEW_BACKEND = _resolve_html_parser(os.getenv("HTML_VIEW_BACKEND", "auto"))
+
+# Analysis pool workers load this file as __mp_main__ for its functions, and that runs the
+# whole UI body too: page config, CSS and the mode/sidebar widgets, which read as their
+# defaults with no session, so no button fires and nothing is fetched. It costs each worker
+# a few milliseconds once, when it starts (get_analysis_pool keeps workers for the process);
+# keep its "no runtime" warnings out of the worker logs.
+if __name__ == "__mp_main__":
+    st.logger.set_log_level("error")
+    st.config.set_option("global.showWarningOnDirectExecution", False)
 
 
 # =====================================================
@@ -550,6 +644,21 @@ a{
   font-weight: 900 !important;
   text-decoration: underline !important;
 }
+
+/* ------------------------------
+   Run trace waterfall (admin sidebar)
+--------------------------------*/
+.trace-waterfall{ font-size: 11px; line-height: 1.25; }
+.trace-row{ display:flex; align-items:center; gap:6px; margin:1px 0; }
+.trace-label{ flex:0 0 44%; overflow:hidden; white-space:nowrap; text-overflow:ellipsis; color: hsl(var(--foreground)); }
+.trace-track{ flex:1; position:relative; height:10px; background: hsl(var(--muted) / 0.6); border-radius:3px; }
+.trace-bar{ position:absolute; top:1px; height:8px; min-width:2px; border-radius:2px; background: hsl(var(--muted-foreground)); }
+.trace-bar.stage{ background: hsl(var(--primary-dark)); }
+.trace-bar.fetch{ background: hsl(210 80% 55%); }
+.trace-bar.parse{ background: hsl(35 90% 50%); }
+.trace-bar.analyze{ background: hsl(var(--primary-light)); }
+.trace-bar.serp{ background: hsl(280 60% 55%); }
+.trace-bar.error{ background: hsl(0 75% 55%); }
 </style>
 """,
     unsafe_allow_html=True,
@@ -621,6 +730,244 @@ st.markdown(
 )
 
 
+# =====================================================
+# RUN TRACING (SPANS PER STAGE, TIER, PARSE, ANALYZER, SERP CALL)
+# =====================================================
+# TRACE_EXPORT_PATH: when set, each finished run is appended to this file as one line of
+# OTLP/JSON (resourceSpans), the format an OpenTelemetry collector's file receiver reads.
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "").strip()
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "20000"))
+TRACE_WATERFALL_ROWS = 250
+TRACE_SERVICE_NAME = "bayut-competitor-gap-analysis"
+TRACE_KINDS = ("stage", "fetch", "parse", "analyze", "serp")
+
+_ACTIVE_TRACE: contextvars.ContextVar = contextvars.ContextVar("active_trace", default=None)
+_CURRENT_SPAN: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+class RunTrace:
+    """
+    Timed spans for one analysis run, nested by the span open when each one started.
+    - kinds: stage (table builders), fetch (one per URL and per tier attempt), parse,
+      analyze (one analyzer on one URL), serp (one SERP lookup, cache hit or miss)
+    - work handed to another thread joins the run when submitted through
+      contextvars.copy_context().run; analysis-pool workers report their own timings back
+    - spans past TRACE_MAX_SPANS are counted in `dropped`, not kept
+    """
+
+    def __init__(self, name: str, **attrs):
+        self.name = name
+        self.attrs = attrs
+        self.trace_id = os.urandom(16).hex()
+        self.root_id = os.urandom(8).hex()
+        self.started_at = time.time()
+        self.duration_ms: Optional[float] = None
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans: List[dict] = []
+        self.dropped = 0
+
+    def now_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000
+
+    def add(self, name: str, kind: str, start_ms: float, end_ms: float, attrs: Optional[dict] = None,
+            status: str = "ok", parent_id: Optional[str] = None, span_id: Optional[str] = None) -> None:
+        """Record a span timed elsewhere (e.g. in an analysis worker)."""
+        span = {
+            "span_id": span_id or os.urandom(8).hex(), "parent_id": parent_id or _CURRENT_SPAN.get() or self.root_id,
+            "name": name, "kind": kind, "start_ms": round(start_ms, 3), "end_ms": round(end_ms, 3),
+            "status": status, "thread": threading.current_thread().name, "attrs": attrs or {},
+        }
+        with self._lock:
+            if len(self.spans) < TRACE_MAX_SPANS:
+                self.spans.append(span)
+            else:
+                self.dropped += 1
+
+    @contextmanager
+    def span(self, name: str, kind: str, **attrs):
+        """Time the block; the yielded dict is the span's attributes (fill in results as they are known)."""
+        span_id = os.urandom(8).hex()
+        parent_id = _CURRENT_SPAN.get() or self.root_id
+        token = _CURRENT_SPAN.set(span_id)
+        start, status = self.now_ms(), "ok"
+        try:
+            yield attrs
+        except Exception as e:
+            status = "error"
+            attrs.setdefault("error", f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _CURRENT_SPAN.reset(token)
+            self.add(name, kind, start, self.now_ms(), attrs, status=status, parent_id=parent_id, span_id=span_id)
+
+    def finish(self, export_path: Optional[str] = None) -> "RunTrace":
+        if self.duration_ms is None:
+            self.duration_ms = round(self.now_ms(), 3)
+            path = TRACE_EXPORT_PATH if export_path is None else export_path
+            if path:
+                self.export(path)
+        return self
+
+    def elapsed_ms(self) -> float:
+        """Run length; for a run cut short (st.stop) the end of its last span."""
+        if self.duration_ms is not None:
+            return self.duration_ms
+        with self._lock:
+            return max([s["end_ms"] for s in self.spans] or [0.0])
+
+    def sorted_spans(self) -> List[dict]:
+        with self._lock:
+            return sorted(self.spans, key=lambda s: (s["start_ms"], -s["end_ms"]))
+
+    def to_json(self) -> dict:
+        return {
+            "trace_id": self.trace_id, "name": self.name, "attrs": self.attrs,
+            "started_at": datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(),
+            "duration_ms": self.elapsed_ms(), "dropped_spans": self.dropped,
+            "spans": [
+                {"span_id": s["span_id"], "parent_id": None if s["parent_id"] == self.root_id else s["parent_id"],
+                 "name": s["name"], "kind": s["kind"], "start_ms": s["start_ms"],
+                 "duration_ms": round(s["end_ms"] - s["start_ms"], 3), "status": s["status"],
+                 "thread": s["thread"], "attrs": s["attrs"]}
+                for s in self.sorted_spans()
+            ],
+        }
+
+    def to_otlp(self) -> dict:
+        """OTLP/JSON (opentelemetry-proto ExportTraceServiceRequest); the run is the root span."""
+        def nanos(ms: float) -> str:
+            return str(int(self.started_at * 1e9 + ms * 1e6))
+
+        def attributes(d: dict) -> List[dict]:
+            out = []
+            for k, v in d.items():
+                if v is None:
+                    continue
+                if isinstance(v, bool):
+                    val = {"boolValue": v}
+                elif isinstance(v, int):
+                    val = {"intValue": str(v)}
+                elif isinstance(v, float):
+                    val = {"doubleValue": v}
+                else:
+                    val = {"stringValue": str(v)}
+                out.append({"key": k, "value": val})
+            return out
+
+        root = {"traceId": self.trace_id, "spanId": self.root_id, "name": self.name, "kind": 1,
+                "startTimeUnixNano": nanos(0), "endTimeUnixNano": nanos(self.elapsed_ms()),
+                "attributes": attributes({"run.kind": "run", **self.attrs}), "status": {"code": 1}}
+        spans = [root] + [
+            {"traceId": self.trace_id, "spanId": s["span_id"], "parentSpanId": s["parent_id"], "name": s["name"],
+             "kind": 3 if s["kind"] in ("fetch", "serp") else 1,
+             "startTimeUnixNano": nanos(s["start_ms"]), "endTimeUnixNano": nanos(s["end_ms"]),
+             "attributes": attributes({"run.kind": s["kind"], "thread.name": s["thread"], **s["attrs"]}),
+             "status": {"code": 2 if s["status"] == "error" else 1}}
+            for s in self.sorted_spans()
+        ]
+        return {"resourceSpans": [{
+            "resource": {"attributes": attributes({"service.name": TRACE_SERVICE_NAME})},
+            "scopeSpans": [{"scope": {"name": "app"}, "spans": spans}],
+        }]}
+
+    def export(self, path: str) -> None:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(self.to_otlp(), ensure_ascii=False) + "\n")
+        except OSError:
+            pass
+
+    def summary(self) -> pd.DataFrame:
+        """Total/max time and count per (kind, name), slowest first."""
+        rows: Dict[tuple, dict] = {}
+        for s in self.sorted_spans():
+            r = rows.setdefault((s["kind"], s["name"]), {"Kind": s["kind"], "Span": s["name"], "Count": 0,
+                                                         "Total ms": 0.0, "Max ms": 0.0, "Errors": 0})
+            ms = s["end_ms"] - s["start_ms"]
+            r["Count"] += 1
+            r["Total ms"] = round(r["Total ms"] + ms, 1)
+            r["Max ms"] = round(max(r["Max ms"], ms), 1)
+            r["Errors"] += s["status"] == "error"
+        cols = ["Kind", "Span", "Count", "Total ms", "Max ms", "Errors"]
+        return pd.DataFrame(sorted(rows.values(), key=lambda r: -r["Total ms"]), columns=cols)
+
+
+def start_run_trace(name: str, **attrs) -> RunTrace:
+    """Make a new trace the active one for this thread (replacing any a stopped run left open)."""
+    trace = RunTrace(name, **attrs)
+    _ACTIVE_TRACE.set(trace)
+    _CURRENT_SPAN.set(trace.root_id)
+    return trace
+
+def finish_run_trace(trace: RunTrace, export_path: Optional[str] = None) -> RunTrace:
+    if _ACTIVE_TRACE.get() is trace:
+        _ACTIVE_TRACE.set(None)
+        _CURRENT_SPAN.set(None)
+    return trace.finish(export_path)
+
+def active_trace() -> Optional[RunTrace]:
+    return _ACTIVE_TRACE.get()
+
+def trace_span(name: str, kind: str, **attrs):
+    """A span in the active run's trace; outside a traced run a no-op yielding a scratch dict."""
+    trace = _ACTIVE_TRACE.get()
+    return trace.span(name, kind, **attrs) if trace is not None else nullcontext(attrs)
+
+def traced(kind: str, name: Optional[str] = None):
+    """Decorator: run the function inside a span named after it."""
+    def wrap(fn):
+        label = name or fn.__name__
+
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            with trace_span(label, kind):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+def render_trace_waterfall(trace: RunTrace, kinds: Iterable[str] = TRACE_KINDS, limit: int = TRACE_WATERFALL_ROWS) -> str:
+    """HTML waterfall of a run's spans in start order, indented by nesting depth."""
+    spans = [s for s in trace.sorted_spans()]
+    depth = {trace.root_id: -1}
+    for s in spans:
+        depth[s["span_id"]] = depth.get(s["parent_id"], -1) + 1
+    kinds = set(kinds)
+    shown = [s for s in spans if s["kind"] in kinds][:limit]
+    total = max(trace.elapsed_ms(), 1e-6)
+    rows = []
+    for s in shown:
+        ms = s["end_ms"] - s["start_ms"]
+        detail = ", ".join(f"{k}={v}" for k, v in s["attrs"].items() if v not in (None, ""))
+        label = s["name"] + (f" {site_name(s['attrs']['url'])}" if s["attrs"].get("url") else "")
+        tip = html_lib.escape(f"{s['name']} {ms:.0f} ms (+{s['start_ms']:.0f} ms) {detail}", quote=True)
+        cls = "error" if s["status"] == "error" else s["kind"]
+        rows.append(
+            f"<div class='trace-row' title='{tip}'>"
+            f"<div class='trace-label' style='padding-left:{6 * max(depth.get(s['span_id'], 0), 0)}px'>"
+            f"{html_lib.escape(label)} <b>{ms:.0f}</b></div>"
+            f"<div class='trace-track'><div class='trace-bar {cls}' "
+            f"style='left:{100 * s['start_ms'] / total:.2f}%;width:{100 * ms / total:.2f}%'></div></div></div>"
+        )
+    more = len([s for s in spans if s["kind"] in kinds]) - len(shown)
+    tail = f"<div>… {more} more spans (download the trace for all)</div>" if more > 0 else ""
+    return f"<div class='trace-waterfall'>{''.join(rows)}{tail}</div>"
+
+def render_run_trace_sidebar(trace: Optional[RunTrace], key: str) -> None:
+    if trace is None:
+        return
+    st.sidebar.markdown(f"### Run trace ({trace.elapsed_ms() / 1000:.1f}s, {len(trace.spans)} spans)")
+    kinds = st.sidebar.multiselect("Span kinds", TRACE_KINDS, default=list(TRACE_KINDS), key=f"{key}_kinds")
+    st.sidebar.markdown(render_trace_waterfall(trace, kinds), unsafe_allow_html=True)
+    st.sidebar.dataframe(trace.summary(), hide_index=True)
+    st.sidebar.download_button("Download trace (JSON)", json.dumps(trace.to_json(), indent=1),
+                               file_name=f"trace-{trace.trace_id[:8]}.json", mime="application/json", key=f"{key}_json")
+    st.sidebar.download_button("Download trace (OTLP JSON)", json.dumps(trace.to_otlp()),
+                               file_name=f"trace-{trace.trace_id[:8]}.otlp.json", mime="application/json",
+                               key=f"{key}_otlp")
+
+
 # =====================================================
 # FETCH (BEST-EFFORT; SKIP PROTECTED/UNFETCHABLE URLS)
 # =====================================================
@@ -694,6 +1041,104 @@ def looks_blocked(text: str) -> bool:
     ])
 
 
+# -----------------------------
+# Pooled HTTP sessions (keep-alive, retries via adapter)
+# -----------------------------
+HTTP_POOL_CONNECTIONS = 16   # hosts kept pooled
+HTTP_POOL_MAXSIZE = 8        # keep-alive connections per host
+HTTP_RETRIES = 2
+HTTP_BACKOFF = 0.6           # sleeps 0.6s, 1.2s, ... between retries
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class HttpPoolStats:
+    """Counts requests sent vs connections opened; the difference rode a kept-alive connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.opened = 0
+
+    def bump(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"requests": self.requests, "opened": self.opened, "reused": max(0, self.requests - self.opened)}
+
+
+class _CountingPoolMixin:
+    stats: Optional[HttpPoolStats] = None
+
+    def _new_conn(self):
+        self.stats.bump("opened")
+        return super()._new_conn()
+
+    def _make_request(self, *args, **kwargs):
+        self.stats.bump("requests")
+        return super()._make_request(*args, **kwargs)
+
+
+@lru_cache(maxsize=1)
+def _counting_adapter_class():
+    """Built on first use so requests/urllib3 are not imported at startup."""
+    from requests.adapters import HTTPAdapter
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class _CountingAdapter(HTTPAdapter):
+        def __init__(self, stats: HttpPoolStats, **kwargs):
+            self.stats = stats
+            super().__init__(**kwargs)
+
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            extra = {"stats": self.stats}
+            self.poolmanager.pool_classes_by_scheme = {
+                "http": type("CountingHTTPConnectionPool", (_CountingPoolMixin, HTTPConnectionPool), extra),
+                "https": type("CountingHTTPSConnectionPool", (_CountingPoolMixin, HTTPSConnectionPool), extra),
+            }
+
+    return _CountingAdapter
+
+
+def build_http_session(
+    pool_connections: int = HTTP_POOL_CONNECTIONS,
+    pool_maxsize: int = HTTP_POOL_MAXSIZE,
+    retries: int = HTTP_RETRIES,
+    backoff: float = HTTP_BACKOFF,
+) -> requests.Session:
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=HTTP_RETRY_STATUSES,
+        # POSTs (DataForSEO, billed) only retry when the connection never opened
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        # keep worst-case latency bounded; a long Retry-After would stall the UI
+        respect_retry_after_header=False,
+        # hand back the last 429/5xx response instead of raising
+        raise_on_status=False,
+    )
+    stats = HttpPoolStats()
+    adapter = _counting_adapter_class()(stats, pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.pool_stats = stats
+    return session
+
+
+@st.cache_resource(show_spinner=False)
+def get_http_session() -> requests.Session:
+    """Process-wide session shared by the fetch tiers, SERP APIs and HEAD probes."""
+    return build_http_session()
+
+
 @dataclass
 class FetchResult:
     ok: bool
@@ -704,6 +1149,564 @@ class FetchResult:
     reason: Optional[str]
 
 
+@dataclass
+class FetchQualityBar:
+    """A tier candidate that clears this bar is good enough to skip the remaining tiers."""
+    min_text_len: int = 1500
+    min_headings: int = 3
+
+
+FETCH_TIERS = ("direct", "playwright", "jina", "textise")
+FETCH_HTML_TIERS = ("direct", "playwright")  # the others are readers: text of the page, not its HTML
+FETCH_TIER_MIN_LEN = {"direct": 320, "playwright": 320, "jina": 300, "textise": 260}
+FETCH_EARLY_EXIT = FetchQualityBar()
+FETCH_PARALLEL_TIERS = True
+
+# Deadline budgets (seconds) for the async engine. A URL's budget is shared by its tiers:
+# each tier may use this fraction of it, never past the URL deadline. 0 disables the run cap.
+FETCH_URL_BUDGET = 45.0
+FETCH_RUN_BUDGET = 240.0
+FETCH_TIER_BUDGET_SHARE = {"direct": 0.5, "playwright": 1.0, "jina": 1.0, "textise": 1.0}
+
+PLAYWRIGHT_MAX_PAGES = 3
+PLAYWRIGHT_RECYCLE_AFTER = 150
+PLAYWRIGHT_SETTLE_MS = 1400
+
+
+class BrowserPool:
+    """
+    One long-lived headless Chromium shared by every JS render.
+    Playwright objects are bound to the loop that created them, so the browser lives on
+    a dedicated asyncio thread and callers (any thread) submit renders to it.
+    - each render gets its own isolated browser context
+    - at most `max_pages` renders run at once
+    - the browser is health-checked before use and recycled after `recycle_after` pages
+      (a retired browser is closed once its in-flight pages finish)
+    """
+
+    def __init__(self, max_pages: int = PLAYWRIGHT_MAX_PAGES, recycle_after: int = PLAYWRIGHT_RECYCLE_AFTER,
+                 launch_args: Tuple[str, ...] = ("--no-sandbox",)):
+        self.max_pages = max(1, int(max_pages))
+        self.recycle_after = max(1, int(recycle_after))
+        self.launch_args = list(launch_args)
+        self._lock = threading.Lock()
+        self._loop = None
+        self._sem = None
+        self._launch_lock = None
+        self._pw = None
+        self._browser = None
+        self._served = 0
+        self._in_flight: Dict[int, int] = {}
+        self.stats = {"launches": 0, "recycled": 0, "renders": 0, "failures": 0}
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="browser-pool", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    async def _close_quietly(self, browser):
+        try:
+            await browser.close()
+        except Exception:
+            pass
+
+    def _count(self, stat: str):
+        # Launches and recycles are counted on the pool's loop thread, renders on callers' threads.
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _retire(self, browser):
+        self._browser = None
+        self._count("recycled")
+        if self._in_flight.get(id(browser), 0) <= 0:
+            self._in_flight.pop(id(browser), None)
+            asyncio.ensure_future(self._close_quietly(browser))
+
+    async def _acquire_browser(self):
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+        async with self._launch_lock:
+            b = self._browser
+            if b is not None and (not b.is_connected() or self._served >= self.recycle_after):
+                self._retire(b)
+                b = None
+            if b is None:
+                if self._pw is None:
+                    self._pw = await async_playwright().start()
+                try:
+                    b = await self._pw.chromium.launch(headless=True, args=self.launch_args)
+                except Exception:
+                    # driver itself may be gone; restart it once
+                    try:
+                        await self._pw.stop()
+                    except Exception:
+                        pass
+                    self._pw = await async_playwright().start()
+                    b = await self._pw.chromium.launch(headless=True, args=self.launch_args)
+                self._browser, self._served = b, 0
+                self._count("launches")
+            self._served += 1
+            self._in_flight[id(b)] = self._in_flight.get(id(b), 0) + 1
+            return b
+
+    async def _release_browser(self, browser):
+        left = self._in_flight.get(id(browser), 1) - 1
+        self._in_flight[id(browser)] = left
+        if left <= 0 and browser is not self._browser:
+            self._in_flight.pop(id(browser), None)
+            await self._close_quietly(browser)
+
+    async def _render(self, url: str, user_agent: str, timeout_ms: int, settle_ms: int) -> str:
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_pages)
+        async with self._sem:
+            browser = await self._acquire_browser()
+            ctx = None
+            try:
+                ctx = await browser.new_context(user_agent=user_agent)
+                page = await ctx.new_page()
+                await page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
+                await page.wait_for_timeout(settle_ms)
+                return await page.content()
+            finally:
+                if ctx is not None:
+                    try:
+                        await ctx.close()
+                    except Exception:
+                        pass
+                await self._release_browser(browser)
+
+    def render(self, url: str, user_agent: str, timeout_ms: int = 25000,
+               settle_ms: int = PLAYWRIGHT_SETTLE_MS) -> Tuple[bool, str]:
+        if not PLAYWRIGHT_OK:
+            return False, ""
+        fut = asyncio.run_coroutine_threadsafe(
+            self._render(url, user_agent, timeout_ms, settle_ms), self._ensure_loop()
+        )
+        try:
+            # generous cap: queueing behind `max_pages` plus launch time
+            html = fut.result(timeout=(timeout_ms + settle_ms) / 1000.0 + 60)
+            self._count("renders")
+            return True, html
+        except Exception:
+            fut.cancel()
+            self._count("failures")
+            return False, ""
+
+    async def _shutdown(self):
+        if self._browser is not None:
+            await self._close_quietly(self._browser)
+            self._browser = None
+        if self._pw is not None:
+            try:
+                await self._pw.stop()
+            except Exception:
+                pass
+            self._pw = None
+
+    def close(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None or loop.is_closed():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=15)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        self._sem = self._launch_lock = None
+
+
+@st.cache_resource(show_spinner=False)
+def get_browser_pool() -> BrowserPool:
+    """Process-wide pool: survives Streamlit reruns, closed at interpreter exit."""
+    pool = BrowserPool()
+    atexit.register(pool.close)
+    return pool
+
+
+# FETCH_CACHE=0 (or an empty FETCH_CACHE_PATH) fetches every page live.
+FETCH_CACHE_ENABLED = os.getenv("FETCH_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+FETCH_CACHE_PATH = os.getenv(
+    "FETCH_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "fetch_cache.sqlite"),
+)
+FETCH_CACHE_TTL = {"direct": 6 * 3600, "playwright": 6 * 3600, "jina": 24 * 3600, "textise": 24 * 3600}
+FETCH_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+def _cache_url_key(url: str) -> str:
+    """Stable cache key: lowercase scheme/host, no fragment, default port or tracking params, sorted query."""
+    try:
+        p = urlparse((url or "").strip())
+        host = (p.hostname or "").lower()
+        if p.port and not ((p.scheme == "http" and p.port == 80) or (p.scheme == "https" and p.port == 443)):
+            host = f"{host}:{p.port}"
+        query = sorted(
+            (k, v) for k, v in parse_qsl(p.query, keep_blank_values=True)
+            if not k.lower().startswith("utm_") and k.lower() not in ("gclid", "fbclid")
+        )
+        path = (p.path or "/").rstrip("/") or "/"
+        key = f"{(p.scheme or 'https').lower()}://{host}{path}"
+        return key + ("?" + urlencode(query) if query else "")
+    except Exception:
+        return (url or "").strip()
+
+
+class FetchCache:
+    """
+    Persistent per-tier fetch cache (SQLite).
+    - entries keyed by (normalized URL, tier): status, source, headings, validators, timestamps
+    - html/text bodies stored once per content hash (zlib-compressed), shared between entries
+    - per-tier TTLs; stale entries are still returned (fresh=False) so callers can revalidate
+    - least-recently-used entries are evicted once bodies exceed `max_bytes`; bodies no
+      entry points at any more are swept then too (not on every write)
+    """
+
+    def __init__(self, path: str, ttl: Optional[Dict[str, int]] = None, max_bytes: int = FETCH_CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = dict(FETCH_CACHE_TTL if ttl is None else ttl)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "stale": 0, "misses": 0, "revalidated": 0, "writes": 0, "evicted": 0}
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " url_key TEXT NOT NULL, tier TEXT NOT NULL, status INTEGER, source TEXT, headings INTEGER,"
+                " html_sha TEXT, text_sha TEXT, etag TEXT, last_modified TEXT,"
+                " fetched_at REAL, accessed_at REAL, PRIMARY KEY (url_key, tier))"
+            )
+            self._db.execute("CREATE TABLE IF NOT EXISTS blobs (sha TEXT PRIMARY KEY, data BLOB, size INTEGER)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at)")
+            self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def _put_blob(self, body: str) -> str:
+        raw = (body or "").encode("utf-8")
+        sha = hashlib.sha256(raw).hexdigest()
+        if self._db.execute("SELECT 1 FROM blobs WHERE sha = ?", (sha,)).fetchone() is None:
+            data = zlib.compress(raw, 6)
+            self._db.execute("INSERT INTO blobs (sha, data, size) VALUES (?, ?, ?)", (sha, data, len(data)))
+            self._bytes += len(data)
+        return sha
+
+    def _get_blob(self, sha: Optional[str]) -> str:
+        if not sha:
+            return ""
+        row = self._db.execute("SELECT data FROM blobs WHERE sha = ?", (sha,)).fetchone()
+        return zlib.decompress(row[0]).decode("utf-8") if row else ""
+
+    def _drop_orphans(self):
+        freed = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM blobs WHERE sha NOT IN"
+            " (SELECT html_sha FROM entries WHERE html_sha IS NOT NULL"
+            "  UNION SELECT text_sha FROM entries WHERE text_sha IS NOT NULL)"
+        ).fetchone()[0]
+        self._db.execute(
+            "DELETE FROM blobs WHERE sha NOT IN"
+            " (SELECT html_sha FROM entries WHERE html_sha IS NOT NULL"
+            "  UNION SELECT text_sha FROM entries WHERE text_sha IS NOT NULL)"
+        )
+        self._bytes -= freed
+
+    def _evict(self):
+        if self._bytes <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        # Replaced entries leave their old bodies behind; reclaim those before evicting live ones.
+        self._drop_orphans()
+        while self._bytes > target:
+            rows = self._db.execute(
+                "SELECT url_key, tier FROM entries ORDER BY accessed_at ASC LIMIT 32"
+            ).fetchall()
+            if not rows:
+                break
+            self._db.executemany("DELETE FROM entries WHERE url_key = ? AND tier = ?", rows)
+            self.stats["evicted"] += len(rows)
+            self._drop_orphans()
+
+    def get(self, url: str, tier: str) -> Optional[dict]:
+        key = _cache_url_key(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, source, headings, html_sha, text_sha, etag, last_modified, fetched_at"
+                " FROM entries WHERE url_key = ? AND tier = ?", (key, tier)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            status, source, headings, html_sha, text_sha, etag, last_modified, fetched_at = row
+            fresh = (time.time() - (fetched_at or 0)) < self.ttl.get(tier, 0)
+            self.stats["hits" if fresh else "stale"] += 1
+            with self._db:
+                self._db.execute(
+                    "UPDATE entries SET accessed_at = ? WHERE url_key = ? AND tier = ?", (time.time(), key, tier)
+                )
+            return {
+                "tier": tier, "status": status, "source": source, "headings": headings or 0,
+                "html": self._get_blob(html_sha), "text": self._get_blob(text_sha),
+                "etag": etag, "last_modified": last_modified, "fetched_at": fetched_at, "fresh": fresh,
+            }
+
+    def put(self, url: str, tier: str, outcome: dict):
+        key, now = _cache_url_key(url), time.time()
+        with self._lock, self._db:
+            html_sha = self._put_blob(outcome.get("html") or "") if outcome.get("html") else None
+            text_sha = self._put_blob(outcome.get("text") or "") if outcome.get("text") else None
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries"
+                " (url_key, tier, status, source, headings, html_sha, text_sha, etag, last_modified, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, tier, outcome.get("status"), outcome.get("source") or tier, int(outcome.get("headings") or 0),
+                 html_sha, text_sha, outcome.get("etag"), outcome.get("last_modified"), now, now),
+            )
+            self.stats["writes"] += 1
+            self._evict()
+
+    def touch(self, url: str, tier: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Mark an entry fresh again after a 304 Not Modified."""
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE entries SET fetched_at = ?, etag = COALESCE(?, etag),"
+                " last_modified = COALESCE(?, last_modified) WHERE url_key = ? AND tier = ?",
+                (time.time(), etag, last_modified, _cache_url_key(url), tier),
+            )
+            self.stats["revalidated"] += 1
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("DELETE FROM blobs")
+            self._bytes = 0
+
+
+@st.cache_resource(show_spinner=False)
+def get_fetch_cache() -> Optional[FetchCache]:
+    if not FETCH_CACHE_ENABLED or not FETCH_CACHE_PATH:
+        return None
+    try:
+        return FetchCache(FETCH_CACHE_PATH)
+    except Exception:
+        return None
+
+# =====================================================
+# FETCH PROFILES (PER-DOMAIN TIER ORDER + NEGATIVE CACHE)
+# =====================================================
+# FETCH_PROFILE_PATH: SQLite file with what past fetches taught us about each domain
+# ("" disables profiles; every URL then tries FETCH_TIERS in the fixed order).
+FETCH_PROFILE_PATH = os.getenv(
+    "FETCH_PROFILE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "fetch_profiles.sqlite"),
+)
+FETCH_PROFILE_SKIP_AFTER = int(os.getenv("FETCH_PROFILE_SKIP_AFTER", "3"))  # failures in a row before a tier sits out
+FETCH_PROFILE_TIER_COOLDOWN = int(os.getenv("FETCH_PROFILE_TIER_COOLDOWN", str(24 * 3600)))
+FETCH_PROFILE_UNFETCHABLE_AFTER = int(os.getenv("FETCH_PROFILE_UNFETCHABLE_AFTER", "3"))  # failed resolves in a row
+FETCH_PROFILE_DOMAIN_COOLDOWN = int(os.getenv("FETCH_PROFILE_DOMAIN_COOLDOWN", str(12 * 3600)))
+FETCH_PROFILE_LATENCY_ALPHA = 0.3
+# Missing pages say nothing about a domain's blocking, so they never count as failures.
+FETCH_PROFILE_URL_LEVEL_STATUSES = (404, 410)
+# A resolve that failed only with these (no server ever answered) points at our own
+# connection, not the domain, so it does not move the domain towards unfetchable.
+FETCH_PROFILE_TRANSIENT_REASONS = ("network_error", "no_response", "deadline", "no_render")
+
+
+class FetchProfiles:
+    """
+    Persistent per-domain fetch profile (SQLite).
+    - per (domain, tier): attempts, how many cleared the early-exit bar, wins (the chosen
+      result), the current failure streak with its last reason, and a latency EWMA
+    - per domain: resolves in a row where no tier produced usable content
+    - plan(domain): tiers that last brought content first, untried tiers next, failing tiers
+      last; within those, most likely to clear the bar first (ties: faster, then FETCH_TIERS
+      order); a tier failing `skip_after` times in a row sits out for `tier_cooldown`
+    - unfetchable(domain): `unfetchable_after` failed resolves in a row where the site did
+      answer (blocked, error status, no usable text), for `domain_cooldown`
+    Cooldowns expire on their own, so a domain that lifts its blocking is retried.
+    """
+
+    def __init__(self, path: str, skip_after: int = FETCH_PROFILE_SKIP_AFTER,
+                 tier_cooldown: int = FETCH_PROFILE_TIER_COOLDOWN,
+                 unfetchable_after: int = FETCH_PROFILE_UNFETCHABLE_AFTER,
+                 domain_cooldown: int = FETCH_PROFILE_DOMAIN_COOLDOWN):
+        self.path = path
+        self.skip_after = int(skip_after)
+        self.tier_cooldown = int(tier_cooldown)
+        self.unfetchable_after = int(unfetchable_after)
+        self.domain_cooldown = int(domain_cooldown)
+        self._lock = threading.Lock()
+        self.stats = {"planned": 0, "reordered": 0, "tiers_skipped": 0, "domains_skipped": 0}
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS tiers ("
+                " domain TEXT NOT NULL, tier TEXT NOT NULL, attempts INTEGER DEFAULT 0, cleared INTEGER DEFAULT 0,"
+                " wins INTEGER DEFAULT 0, streak INTEGER DEFAULT 0, last_reason TEXT, last_failure_at REAL,"
+                " latency_ms REAL, updated_at REAL, PRIMARY KEY (domain, tier))"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS domains ("
+                " domain TEXT PRIMARY KEY, resolves INTEGER DEFAULT 0, failed_streak INTEGER DEFAULT 0,"
+                " last_reason TEXT, last_failure_at REAL, updated_at REAL)"
+            )
+
+    def _ensure(self, table: str, key: tuple):
+        cols = "domain, tier" if table == "tiers" else "domain"
+        marks = ", ".join("?" for _ in key)
+        self._db.execute(f"INSERT OR IGNORE INTO {table} ({cols}) VALUES ({marks})", key)
+
+    def record_tier(self, domain: str, tier: str, usable: bool, cleared: bool, reason: str,
+                    latency_ms: float, status: Optional[int] = None) -> None:
+        """One tier attempt that went to the network (fresh fetch-cache hits are not attempts)."""
+        if not domain:
+            return
+        now = time.time()
+        counts = status not in FETCH_PROFILE_URL_LEVEL_STATUSES
+        with self._lock, self._db:
+            self._ensure("tiers", (domain, tier))
+            self._db.execute(
+                "UPDATE tiers SET attempts = attempts + 1, cleared = cleared + ?,"
+                " latency_ms = CASE WHEN latency_ms IS NULL THEN ? ELSE latency_ms * ? + ? END,"
+                " streak = CASE WHEN ? THEN 0 WHEN ? THEN streak + 1 ELSE streak END,"
+                " last_reason = CASE WHEN ? THEN last_reason ELSE ? END,"
+                " last_failure_at = CASE WHEN ? THEN last_failure_at ELSE ? END,"
+                " updated_at = ? WHERE domain = ? AND tier = ?",
+                (int(cleared), latency_ms, 1 - FETCH_PROFILE_LATENCY_ALPHA, FETCH_PROFILE_LATENCY_ALPHA * latency_ms,
+                 usable, counts, usable, reason, usable, now, now, domain, tier),
+            )
+
+    def record_result(self, domain: str, winner: Optional[str], reason: str = "",
+                      status: Optional[int] = None) -> None:
+        """How a whole resolve ended: the winning tier, or the failure reason."""
+        if not domain:
+            return
+        now = time.time()
+        with self._lock, self._db:
+            self._ensure("domains", (domain,))
+            if winner:
+                self._ensure("tiers", (domain, winner))
+                self._db.execute("UPDATE tiers SET wins = wins + 1 WHERE domain = ? AND tier = ?", (domain, winner))
+                self._db.execute(
+                    "UPDATE domains SET resolves = resolves + 1, failed_streak = 0, updated_at = ? WHERE domain = ?",
+                    (now, domain),
+                )
+            else:
+                answered = any(r not in FETCH_PROFILE_TRANSIENT_REASONS for r in reason.split(",") if r)
+                bump = int(answered and status not in FETCH_PROFILE_URL_LEVEL_STATUSES)
+                self._db.execute(
+                    "UPDATE domains SET resolves = resolves + 1, failed_streak = failed_streak + ?,"
+                    " last_reason = ?, last_failure_at = ?, updated_at = ? WHERE domain = ?",
+                    (bump, reason, now, now, domain),
+                )
+
+    def unfetchable(self, domain: str) -> bool:
+        if not domain:
+            return False
+        with self._lock:
+            row = self._db.execute(
+                "SELECT failed_streak, last_failure_at FROM domains WHERE domain = ?", (domain,)
+            ).fetchone()
+        if row is None or row[0] < self.unfetchable_after or time.time() - (row[1] or 0) >= self.domain_cooldown:
+            return False
+        self.stats["domains_skipped"] += 1
+        return True
+
+    def plan(self, domain: str, tiers: Iterable[str] = FETCH_TIERS) -> List[str]:
+        """Tiers to try for `domain`, best first; never empty."""
+        tiers = list(tiers)
+        with self._lock:
+            rows = {
+                r[0]: r[1:] for r in self._db.execute(
+                    "SELECT tier, attempts, cleared, streak, last_failure_at, latency_ms, wins FROM tiers WHERE domain = ?",
+                    (domain,),
+                ).fetchall()
+            } if domain else {}
+        now = time.time()
+
+        def cooling(tier: str) -> bool:
+            r = rows.get(tier)
+            return r is not None and r[2] >= self.skip_after and now - (r[3] or 0) < self.tier_cooldown
+
+        def rank(tier: str) -> tuple:
+            # Tiers whose last attempt brought content come first, then untried ones, then
+            # failing ones (shortest streak first); within a group, bar-clear rate, then how
+            # often the tier's candidate was the one chosen, then latency.
+            attempts, cleared, streak, _, latency, wins = rows.get(tier, (0, 0, 0, None, None, 0))
+            group = 1 if not attempts else (2 if streak else 0)
+            return (group, streak, -round((cleared + 1) / (attempts + 2), 2), -round((wins + 1) / (attempts + 2), 2),
+                    latency if latency is not None else float("inf"), tiers.index(tier))
+
+        active = [t for t in tiers if not cooling(t)] or tiers
+        order = sorted(active, key=rank)
+        self.stats["planned"] += 1
+        self.stats["tiers_skipped"] += len(tiers) - len(order)
+        self.stats["reordered"] += order[0] != tiers[0]
+        return order
+
+    def report(self) -> pd.DataFrame:
+        """One row per (domain, tier), for the admin sidebar."""
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT t.domain, t.tier, t.attempts, t.cleared, t.wins, t.streak, t.last_reason, t.last_failure_at,"
+                " t.latency_ms, d.failed_streak, d.last_failure_at FROM tiers t LEFT JOIN domains d ON d.domain = t.domain"
+                " ORDER BY t.domain, t.tier"
+            ).fetchall()
+        out = []
+        for dom, tier, attempts, cleared, wins, streak, reason, failed_at, latency, dom_streak, dom_failed_at in rows:
+            if (dom_streak or 0) >= self.unfetchable_after and now - (dom_failed_at or 0) < self.domain_cooldown:
+                state = "domain skipped"
+            elif streak >= self.skip_after and now - (failed_at or 0) < self.tier_cooldown:
+                state = "tier skipped"
+            else:
+                state = "active"
+            out.append({
+                "Domain": dom, "Tier": tier, "Attempts": attempts, "Cleared bar": cleared, "Wins": wins,
+                "Fail streak": streak, "Last failure": reason or "",
+                "Avg ms": round(latency) if latency is not None else None, "State": state,
+            })
+        return pd.DataFrame(out, columns=["Domain", "Tier", "Attempts", "Cleared bar", "Wins", "Fail streak",
+                                          "Last failure", "Avg ms", "State"])
+
+    def clear(self, domain: Optional[str] = None) -> None:
+        with self._lock, self._db:
+            if domain:
+                self._db.execute("DELETE FROM tiers WHERE domain = ?", (domain,))
+                self._db.execute("DELETE FROM domains WHERE domain = ?", (domain,))
+            else:
+                self._db.execute("DELETE FROM tiers")
+                self._db.execute("DELETE FROM domains")
+
+
+@st.cache_resource(show_spinner=False)
+def get_fetch_profiles() -> Optional[FetchProfiles]:
+    if not FETCH_PROFILE_PATH:
+        return None
+    try:
+        return FetchProfiles(FETCH_PROFILE_PATH)
+    except Exception:
+        return None
+
+def render_fetch_profiles_sidebar(key: str) -> None:
+    profiles = get_fetch_agent().profiles
+    if profiles is None:
+        return
+    st.sidebar.markdown("### Fetch profiles (per domain)")
+    st.sidebar.write("Tier planning:", profiles.stats)
+    st.sidebar.dataframe(profiles.report(), hide_index=True)
+    if st.sidebar.button("Reset fetch profiles", key=key):
+        profiles.clear()
+        st.rerun()
+
+
 class FetchAgent:
     """
     Deterministic resolver:
@@ -711,14 +1714,38 @@ class FetchAgent:
     - optional JS render (Playwright)
     - Jina reader
     - Textise
+    If the direct tier already clears `early_exit`, the other tiers are skipped;
+    otherwise they run (in parallel on the shared fetch threads when `parallel_tiers`)
+    until the URL is settled, and the best candidate wins.
     If all fail => app forces manual paste (hard gate).
+    With `profiles`, each domain's learned order replaces the fixed one (its best tier runs
+    first, repeatedly failing tiers sit out) and known-unfetchable domains are not fetched.
+    A reader tier run first still waits for the HTML tiers, so the result keeps its HTML.
     """
 
-    def __init__(self, default_headers: dict, ignore_tags: set, clean_fn, looks_blocked_fn):
+    def __init__(
+        self,
+        default_headers: dict,
+        ignore_tags: set,
+        clean_fn,
+        looks_blocked_fn,
+        early_exit: Optional[FetchQualityBar] = FETCH_EARLY_EXIT,
+        parallel_tiers: bool = FETCH_PARALLEL_TIERS,
+        browser_pool: Optional[BrowserPool] = None,
+        cache: Optional[FetchCache] = None,
+        session: Optional[requests.Session] = None,
+        profiles: Optional[FetchProfiles] = None,
+    ):
         self.default_headers = default_headers
         self.ignore_tags = ignore_tags
         self.clean = clean_fn
         self.looks_blocked = looks_blocked_fn
+        self.early_exit = early_exit
+        self.parallel_tiers = parallel_tiers
+        self.browser_pool = browser_pool
+        self.cache = cache
+        self.session = session if session is not None else build_http_session()
+        self.profiles = profiles
 
         self.user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0 Safari/537.36",
@@ -726,24 +1753,51 @@ class FetchAgent:
             "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0 Safari/537.36",
         ]
 
-    def _http_get(self, url: str, timeout: int = 25, tries: int = 3) -> Tuple[int, str]:
-        last_code, last_text = 0, ""
-        for i in range(tries):
-            headers = dict(self.default_headers)
-            headers["User-Agent"] = random.choice(self.user_agents)
-            try:
-                r = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True)
-                last_code, last_text = r.status_code, (r.text or "")
-
-                if r.status_code in (429, 500, 502, 503, 504):
-                    time.sleep(1.2 * (i + 1))
-                    continue
-
-                return last_code, last_text
-            except Exception as e:
-                last_code, last_text = 0, str(e)
-                time.sleep(1.2 * (i + 1))
-        return last_code, last_text
+    def _http_fetch(
+        self, url: str, timeout: float = 25, validators: Optional[dict] = None, deadline: Optional[float] = None
+    ) -> Tuple[int, str, dict]:
+        """
+        GET through the pooled session (retries/backoff live in its adapter). Returns (status, body, validators).
+        With a `deadline` (time.monotonic()), socket timeouts shrink to the time left and the body is
+        streamed, so a slow-drip server is dropped at the deadline instead of holding the call.
+        """
+        if deadline is not None:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return 0, "deadline_exceeded", {}
+            timeout = min(timeout, left)
+        headers = dict(self.default_headers)
+        headers["User-Agent"] = random.choice(self.user_agents)
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+        try:
+            r = self.session.get(url, headers=headers, timeout=timeout, allow_redirects=True, stream=deadline is not None)
+            if deadline is not None:
+                chunks = []
+                # read1 returns whatever has arrived, so a trickling body still reaches the
+                # deadline check (iter_content blocks until a whole chunk is in).
+                read1 = getattr(r.raw, "read1", None)  # urllib3 >= 2
+                stream = iter(lambda: read1(16384, decode_content=True), b"") if read1 else r.iter_content(16384)
+                for chunk in stream:
+                    chunks.append(chunk)
+                    if time.monotonic() > deadline:
+                        r.close()
+                        return 0, "deadline_exceeded", {}
+                r._content = b"".join(chunks)  # r.text then decodes exactly as a non-streamed response
+        except Exception as e:
+            return 0, str(e), {}
+        return r.status_code, (r.text or ""), {"etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified")}
+
+    def _http_get(self, url: str, timeout: int = 25, validators: Optional[dict] = None) -> Tuple[int, str]:
+        """
+        `validators` (etag / last_modified of a cached copy) make this a conditional GET;
+        an unchanged resource then comes back as (304, "").
+        """
+        code, text, _ = self._http_fetch(url, timeout=timeout, validators=validators)
+        return code, text
 
     def _jina_url(self, url: str) -> str:
         if url.startswith("https://"):
@@ -766,7 +1820,7 @@ class FetchAgent:
     def _extract_article_text_from_html(self, html: str) -> str:
         if not html:
             return ""
-        soup = BeautifulSoup(html, "html.parser")
+        soup = bs4.BeautifulSoup(html, HTML_PARSER)
         for t in soup.find_all(list(self.ignore_tags)):
             t.decompose()
 
@@ -828,77 +1882,173 @@ class FetchAgent:
         return candidates[0][1]
 
     def _fetch_playwright_html(self, url: str, timeout_ms: int = 25000) -> Tuple[bool, str]:
-        if not PLAYWRIGHT_OK:
-            return False, ""
-        try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True, args=["--no-sandbox"])
-                ctx = browser.new_context(user_agent=random.choice(self.user_agents))
-                page = ctx.new_page()
-                page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
-                page.wait_for_timeout(1400)
-                html = page.content()
-                browser.close()
-            return True, html
-        except Exception:
+        if not PLAYWRIGHT_OK or self.browser_pool is None:
             return False, ""
+        return self.browser_pool.render(url, random.choice(self.user_agents), timeout_ms=timeout_ms)
+
+    def _run_tier(self, tier: str, url: str, deadline: Optional[float] = None, cache_mode: str = "use") -> dict:
+        """
+        Fetch one tier, through the fetch cache when one is configured.
+        cache_mode "revalidate" treats a fresh entry as stale (a conditional GET with its
+        validators); "bypass" skips the cache lookup (a live fetch; its result is still stored).
+        """
+        with trace_span(f"fetch.{tier}", "fetch", url=url, tier=tier) as span:
+            cached = self.cache.get(url, tier) if self.cache is not None and cache_mode != "bypass" else None
+            if cached is not None and cached["fresh"] and cache_mode == "use":
+                span.update(cache="fresh", status=cached.get("status"), bytes=len(cached.get("html") or cached.get("text") or ""))
+                return cached
+            # Stale HTTP entries are revalidated; a 304 keeps the cached outcome.
+            validators = cached if cached is not None and tier != "playwright" else None
+            t0 = time.monotonic()
+            out = self._fetch_tier(tier, url, validators, deadline)
+            latency_ms = (time.monotonic() - t0) * 1000
+            span.update(status=out["status"], bytes=len(out.get("html") or out.get("text") or ""),
+                        cache="miss" if self.cache is not None else None)
+            if cached is not None and out["status"] == 304:
+                self.cache.touch(url, tier, out.get("etag"), out.get("last_modified"))
+                span.update(cache="revalidated", bytes=len(cached.get("html") or cached.get("text") or ""))
+                self._profile_tier(url, cached, latency_ms, deadline)
+                return cached
+            if self.cache is not None and out["status"] == 200 and out["text"]:
+                self.cache.put(url, tier, out)
+            self._profile_tier(url, out, latency_ms, deadline)
+            return out
+
+    def _failure_reason(self, outcome: dict, deadline: Optional[float] = None) -> str:
+        """Why a tier outcome is not a usable candidate ("" when it is)."""
+        status = outcome.get("status")
+        if status is None:
+            return "no_render" if outcome["tier"] == "playwright" else "no_response"
+        if status == 0:
+            return "deadline" if deadline is not None and time.monotonic() >= deadline else "network_error"
+        if status not in (200, 304):
+            return f"http_{status}"
+        txt = self.clean(outcome.get("text") or "")
+        if not txt:
+            return "empty"
+        if self.looks_blocked(txt):
+            return "blocked"
+        if len(txt) < FETCH_TIER_MIN_LEN.get(outcome["tier"], 300):
+            return "too_short"
+        return ""
 
-    def resolve(self, url: str) -> FetchResult:
-        url = (url or "").strip()
-        if not url:
-            return FetchResult(False, None, None, "", "", "empty_url")
+    def _profiled(self, tier: str) -> bool:
+        # Playwright not installed here says nothing about the domain.
+        return tier != "playwright" or (PLAYWRIGHT_OK and self.browser_pool is not None)
+
+    def _profile_tier(self, url: str, outcome: dict, latency_ms: float, deadline: Optional[float]) -> None:
+        if self.profiles is None:
+            return
+        if not self._profiled(outcome["tier"]):
+            return
+        reason = self._failure_reason(outcome, deadline)
+        self.profiles.record_tier(domain_of(url), outcome["tier"], not reason, self._clears_bar(outcome),
+                                  reason, latency_ms, status=outcome.get("status"))
+
+    def plan_tiers(self, url: str) -> List[str]:
+        """Tiers for this URL in the order to try them (the domain's profile, else FETCH_TIERS)."""
+        if self.profiles is None:
+            return list(FETCH_TIERS)
+        # A tier this agent cannot run (Playwright not installed) has no profile to rank by.
+        return self.profiles.plan(domain_of(url), [t for t in FETCH_TIERS if self._profiled(t)])
+
+    def known_unfetchable(self, url: str) -> bool:
+        return self.profiles is not None and self.profiles.unfetchable(domain_of(url))
+
+    def record_resolve(self, url: str, fr: FetchResult, outcomes: List[dict]) -> None:
+        if self.profiles is None:
+            return
+        if fr.ok:
+            self.profiles.record_result(domain_of(url), fr.source)
+        else:
+            reasons = [self._failure_reason(o) for o in outcomes if self._profiled(o["tier"])]
+            self.profiles.record_result(domain_of(url), None, ",".join(dict.fromkeys(r for r in reasons if r)) or fr.reason,
+                                        status=fr.status)
+
+    def _fetch_tier(self, tier: str, url: str, validators: Optional[dict] = None, deadline: Optional[float] = None) -> dict:
+        """Fetch one tier. Returns its raw outcome: status, own html, text, heading count and validators."""
+        out = {"tier": tier, "status": None, "html": "", "text": "", "headings": 0}
+        if tier == "direct":
+            code, html, v = self._http_fetch(url, validators=validators, deadline=deadline)
+            out.update(status=code, **v)
+            if code == 200 and html:
+                out.update(html=html, text=self._extract_article_text_from_html(html))
+                out["headings"] = len(re.findall(r"<h[2-4][\s>]", html, re.I))
+        elif tier == "playwright":
+            timeout_ms = 25000 if deadline is None else int(max(0.0, deadline - time.monotonic()) * 1000)
+            ok, html2 = self._fetch_playwright_html(url, timeout_ms=timeout_ms) if timeout_ms > 0 else (False, "")
+            if ok and html2:
+                out.update(status=200, html=html2, text=self._extract_article_text_from_html(html2))
+                out["headings"] = len(re.findall(r"<h[2-4][\s>]", html2, re.I))
+        elif tier == "jina":
+            code3, txt3, v = self._http_fetch(self._jina_url(url), validators=validators, deadline=deadline)
+            out.update(status=code3, **v)
+            if code3 == 200 and txt3:
+                out["text"] = self.clean(txt3)
+                out["headings"] = len(re.findall(r"(?m)^\s*#{2,4}\s+\S", txt3))
+        elif tier == "textise":
+            code4, html4, v = self._http_fetch(self._textise_url(url), validators=validators, deadline=deadline)
+            out.update(status=code4, **v)
+            if code4 == 200 and html4:
+                soup = bs4.BeautifulSoup(html4, HTML_PARSER)
+                out.update(html=html4, text=self.clean(soup.get_text(" ")))
+                out["headings"] = len(soup.find_all(["h2", "h3", "h4"]))
+        return out
+
+    def _candidate(self, outcome: dict, html_fallback: str) -> Optional[dict]:
+        txt = self.clean(outcome.get("text") or "")
+        if not txt:
+            return None
+        if self.looks_blocked(txt):
+            return None
+        if len(txt) < FETCH_TIER_MIN_LEN.get(outcome["tier"], 300):
+            return None
+        return {
+            "source": outcome["tier"],
+            "status": outcome["status"],
+            # Reader tiers return text only, so they borrow the best HTML seen so far.
+            "html": outcome.get("html") or html_fallback or "",
+            "text": txt,
+            "headings": outcome.get("headings", 0),
+        }
+
+    def _meets_quality_bar(self, cand: Optional[dict]) -> bool:
+        bar = self.early_exit
+        if bar is None or not cand:
+            return False
+        return len(cand["text"]) >= bar.min_text_len and cand["headings"] >= bar.min_headings
+
+    def _clears_bar(self, outcome: dict) -> bool:
+        # The quality bar only looks at text and headings, so no html fallback is needed here.
+        return self._meets_quality_bar(self._candidate(outcome, ""))
+
+    def _settled(self, outcomes: Iterable[dict], planned: List[str]) -> bool:
+        """
+        Whether the tiers run so far settle the URL: one cleared the bar and the page HTML is in
+        hand. Reader tiers return text only (SEO head, schema and links come from HTML), so they
+        settle a URL only once an HTML tier has returned HTML or every planned HTML tier has run.
+        """
+        outcomes = list(outcomes)
+        if not any(self._clears_bar(o) for o in outcomes):
+            return False
+        if any(o["tier"] in FETCH_HTML_TIERS and o.get("html") for o in outcomes):
+            return True
+        ran = {o["tier"] for o in outcomes}
+        return all(t in ran for t in planned if t in FETCH_HTML_TIERS)
 
+    def _select(self, outcomes: List[dict]) -> FetchResult:
+        """Best candidate over outcomes in tier order; reader tiers borrow the latest HTML seen before them."""
         html_fallback = ""
+        candidates: List[dict] = []
         last_status = None
-        candidates = []
-
-        def add_candidate(source: str, status: int, html_doc: str, text_doc: str, min_len: int):
-            txt = self.clean(text_doc or "")
-            if not txt:
-                return
-            if self.looks_blocked(txt):
-                return
-            if len(txt) < min_len:
-                return
-            candidates.append({
-                "source": source,
-                "status": status,
-                "html": html_doc or "",
-                "text": txt,
-            })
-
-        # 1) direct HTML
-        code, html = self._http_get(url)
-        last_status = code or last_status
-        if code == 200 and html:
-            text = self._extract_article_text_from_html(html)
-            add_candidate("direct", code, html, text, min_len=320)
-            html_fallback = html or html_fallback
-
-        # 2) JS-rendered HTML
-        ok, html2 = self._fetch_playwright_html(url)
-        if ok and html2:
-            text2 = self._extract_article_text_from_html(html2)
-            add_candidate("playwright", 200, html2, text2, min_len=320)
-            html_fallback = html2 or html_fallback
-
-        # 3) Jina reader
-        jurl = self._jina_url(url)
-        code3, txt3 = self._http_get(jurl)
-        last_status = code3 or last_status
-        if code3 == 200 and txt3:
-            text3 = self.clean(txt3)
-            add_candidate("jina", code3, html_fallback, text3, min_len=300)
-
-        # 4) Textise
-        turl = self._textise_url(url)
-        code4, html4 = self._http_get(turl)
-        last_status = code4 or last_status
-        if code4 == 200 and html4:
-            soup = BeautifulSoup(html4, "html.parser")
-            text4 = self.clean(soup.get_text(" "))
-            html_out = html4 or html_fallback
-            add_candidate("textise", code4, html_out, text4, min_len=260)
+        for o in outcomes:
+            if o["tier"] in ("direct", "playwright") and o.get("html"):
+                html_fallback = o["html"]
+            cand = self._candidate(o, html_fallback)
+            if cand:
+                candidates.append(cand)
+            if o["tier"] != "playwright":
+                last_status = o["status"] or last_status
 
         if candidates:
             source_priority = {"playwright": 4, "direct": 3, "jina": 2, "textise": 1}
@@ -917,13 +2067,58 @@ class FetchAgent:
 
         return FetchResult(False, None, last_status, "", "", "blocked_or_no_content")
 
+    def resolve(self, url: str, cache_mode: str = "use") -> FetchResult:
+        url = (url or "").strip()
+        if not url:
+            return FetchResult(False, None, None, "", "", "empty_url")
 
-agent = FetchAgent(
-    default_headers=DEFAULT_HEADERS,
-    ignore_tags=IGNORE_TAGS,
-    clean_fn=clean,
-    looks_blocked_fn=looks_blocked,
-)
+        with trace_span("fetch", "fetch", url=url) as span:
+            if self.known_unfetchable(url):
+                span.update(ok=False, reason="domain_unfetchable")
+                return FetchResult(False, None, None, "", "", "domain_unfetchable")
+            tiers = self.plan_tiers(url)
+            span["tiers"] = ",".join(tiers)
+            first, rest = tiers[0], tiers[1:]
+            outcomes = [self._run_tier(first, url, cache_mode=cache_mode)]
+            if not self._settled(outcomes, tiers):
+                if self.parallel_tiers and len(rest) > 1:
+                    # copy_context: tier spans land in this run's trace.
+                    pending = {
+                        get_fetch_executor().submit(contextvars.copy_context().run, self._run_tier, tier, url, None, cache_mode)
+                        for tier in rest
+                    }
+                    # Stop waiting once the tiers back so far settle the URL; the stragglers finish
+                    # on the shared threads (and still fill the fetch cache).
+                    while pending:
+                        done, pending = wait_futures(pending, return_when=FIRST_COMPLETED)
+                        outcomes.extend(fut.result() for fut in done)
+                        if self._settled(outcomes, tiers):
+                            break
+                else:
+                    for tier in rest:
+                        outcomes.append(self._run_tier(tier, url, cache_mode=cache_mode))
+                        if self._settled(outcomes, tiers):
+                            break
+            # Tier order, not run order, decides which HTML a reader tier borrows.
+            fr = self._select(sorted(outcomes, key=lambda o: FETCH_TIERS.index(o["tier"])))
+            self.record_resolve(url, fr, outcomes)
+            span.update(source=fr.source, status=fr.status, ok=fr.ok)
+            return fr
+
+
+@st.cache_resource(show_spinner=False)
+def get_fetch_agent() -> FetchAgent:
+    """Process-wide agent, built on the first fetch instead of on every script rerun."""
+    return FetchAgent(
+        default_headers=DEFAULT_HEADERS,
+        ignore_tags=IGNORE_TAGS,
+        clean_fn=clean,
+        looks_blocked_fn=looks_blocked,
+        browser_pool=get_browser_pool() if PLAYWRIGHT_OK else None,
+        cache=get_fetch_cache(),
+        session=get_http_session(),
+        profiles=get_fetch_profiles(),
+    )
 
 
 def _safe_key(prefix: str, url: str) -> str:
@@ -931,14 +2126,250 @@ def _safe_key(prefix: str, url: str) -> str:
     return f"{prefix}__{h}"
 
 
-def resolve_all_or_require_manual(agent: FetchAgent, urls: List[str], st_key_prefix: str) -> Dict[str, FetchResult]:
+FETCH_MAX_CONCURRENCY = 6
+FETCH_PER_DOMAIN_CONCURRENCY = 1
+FETCH_PER_DOMAIN_DELAY = 0.25
+
+
+class DomainThrottle:
+    """
+    Per-domain politeness for concurrent fetching:
+    - at most `per_domain` in-flight resolves per host
+    - consecutive starts on the same host are spaced by `delay` seconds
+    """
+
+    def __init__(self, per_domain: int = FETCH_PER_DOMAIN_CONCURRENCY, delay: float = FETCH_PER_DOMAIN_DELAY):
+        self.per_domain = max(int(per_domain), 1)
+        self.delay = max(float(delay), 0.0)
+        self._lock = threading.Lock()
+        self._slots: Dict[str, threading.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @contextmanager
+    def slot(self, url: str):
+        dom = domain_of(url) or url
+        with self._lock:
+            sem = self._slots.setdefault(dom, threading.Semaphore(self.per_domain))
+        sem.acquire()
+        try:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(dom, 0.0))
+                self._next_start[dom] = start + self.delay
+            if start > now:
+                time.sleep(start - now)
+            yield
+        finally:
+            sem.release()
+
+
+class AsyncDomainThrottle:
+    """DomainThrottle for one event loop: same per-host limits, awaiting instead of sleeping."""
+
+    def __init__(self, per_domain: int = FETCH_PER_DOMAIN_CONCURRENCY, delay: float = FETCH_PER_DOMAIN_DELAY):
+        self.per_domain = max(int(per_domain), 1)
+        self.delay = max(float(delay), 0.0)
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        dom = domain_of(url) or url
+        sem = self._slots.setdefault(dom, asyncio.Semaphore(self.per_domain))
+        async with sem:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(dom, 0.0))
+            self._next_start[dom] = start + self.delay
+            if start > now:
+                await asyncio.sleep(start - now)
+            yield
+
+
+def _deadline_result() -> FetchResult:
+    return FetchResult(False, None, None, "", "", "deadline_exceeded")
+
+
+# Longest close() waits for tier work abandoned at a deadline (it is deadline-bound itself,
+# so this only caps a call that ignores its deadline).
+FETCH_STRAGGLER_WAIT = 10.0
+
+
+@st.cache_resource(show_spinner=False)
+def get_fetch_executor() -> ThreadPoolExecutor:
+    """Process-wide threads for blocking tier work, shared by every fetch run."""
+    return ThreadPoolExecutor(max_workers=FETCH_MAX_CONCURRENCY * len(FETCH_TIERS), thread_name_prefix="fetch-tier")
+
+
+class AsyncFetchAgent:
+    """
+    asyncio front end for FetchAgent with deadline budgets:
+    - each URL gets `url_budget` seconds; every tier may use its FETCH_TIER_BUDGET_SHARE of it
+    - the first planned tier (direct, unless the domain's profile says otherwise) runs first;
+      otherwise the remaining tiers race and, once one clears the quality bar, the rest are cancelled
+    - resolve_many bounds a whole run by `run_budget`; URLs unresolved at the deadline come
+      back as "deadline_exceeded"
+    All tasks are awaited (or cancelled) before a call returns. Blocking tier work (pooled
+    session, browser pool, parsing) runs on `executor` (a bounded pool of its own when none is
+    given); those calls carry the same deadline, so an abandoned tier stops on its own shortly
+    after, and close() waits for that.
+    """
+
+    def __init__(
+        self,
+        agent: FetchAgent,
+        url_budget: float = FETCH_URL_BUDGET,
+        run_budget: float = FETCH_RUN_BUDGET,
+        max_concurrency: int = FETCH_MAX_CONCURRENCY,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        self.agent = agent
+        self.url_budget = float(url_budget)
+        self.run_budget = float(run_budget or 0)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._owns_executor = executor is None
+        self._executor = executor if executor is not None else ThreadPoolExecutor(
+            max_workers=self.max_concurrency * len(FETCH_TIERS), thread_name_prefix="fetch-tier"
+        )
+        self._in_flight: set = set()  # tier work started by this agent and not finished yet
+        # Done callbacks run on the fetch-tier threads, so the set is only touched under this lock.
+        self._in_flight_lock = threading.Lock()
+
+    def _work_done(self, cf: Future) -> None:
+        with self._in_flight_lock:
+            self._in_flight.discard(cf)
+
+    def close(self) -> None:
+        """Wait for tier work this agent abandoned at a deadline; shut down an owned executor."""
+        with self._in_flight_lock:
+            pending = list(self._in_flight)
+        if pending:
+            wait_futures(pending, timeout=FETCH_STRAGGLER_WAIT)
+        if self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _tier(self, tier: str, url: str, deadline: float, cache_mode: str = "use") -> dict:
+        tier_deadline = min(deadline, time.monotonic() + self.url_budget * FETCH_TIER_BUDGET_SHARE.get(tier, 1.0))
+        cf = self._executor.submit(
+            contextvars.copy_context().run, self.agent._run_tier, tier, url, tier_deadline, cache_mode
+        )
+        with self._in_flight_lock:
+            self._in_flight.add(cf)
+        cf.add_done_callback(self._work_done)
+        work = asyncio.wrap_future(cf)  # cancelling it drops tier work that has not started yet
+        try:
+            return await asyncio.wait_for(work, timeout=max(0.0, tier_deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            return {"tier": tier, "status": None, "html": "", "text": "", "headings": 0}
+
+    async def resolve(self, url: str, deadline: Optional[float] = None, cache_mode: str = "use") -> FetchResult:
+        url = (url or "").strip()
+        if not url:
+            return FetchResult(False, None, None, "", "", "empty_url")
+        with trace_span("fetch", "fetch", url=url) as span:
+            if self.agent.known_unfetchable(url):
+                span.update(ok=False, reason="domain_unfetchable")
+                return FetchResult(False, None, None, "", "", "domain_unfetchable")
+            res = await self._resolve(url, deadline, cache_mode)
+            span.update(source=res.source, status=res.status, ok=res.ok, reason=res.reason)
+            return res
+
+    async def _resolve(self, url: str, deadline: Optional[float], cache_mode: str = "use") -> FetchResult:
+        url_deadline = time.monotonic() + self.url_budget
+        deadline = url_deadline if deadline is None else min(deadline, url_deadline)
+
+        tiers = self.agent.plan_tiers(url)
+        first, rest = tiers[0], tiers[1:]
+        outcomes = {first: await self._tier(first, url, deadline, cache_mode)}
+        if rest and not self.agent._settled(outcomes.values(), tiers):
+            tasks = {asyncio.ensure_future(self._tier(tier, url, deadline, cache_mode)): tier for tier in rest}
+            try:
+                pending = set(tasks)
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        outcomes[tasks[task]] = task.result()
+                    if self.agent._settled(outcomes.values(), tiers):
+                        break
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        res = self.agent._select([outcomes[t] for t in FETCH_TIERS if t in outcomes])
+        if not res.ok and time.monotonic() >= deadline:
+            return _deadline_result()  # out of budget: says nothing about the domain
+        self.agent.record_resolve(url, res, list(outcomes.values()))
+        return res
+
+    async def resolve_many(
+        self, urls: List[str], run_budget: Optional[float] = None, on_done=None, cache_mode: str = "use"
+    ) -> Dict[str, FetchResult]:
+        """Resolve URLs concurrently (politely per domain) within one wall-clock budget; keeps input order."""
+        unique_urls = list(dict.fromkeys(urls))
+        budget = self.run_budget if run_budget is None else float(run_budget or 0)
+        run_deadline = time.monotonic() + budget if budget > 0 else None
+        throttle = AsyncDomainThrottle()
+        sem = asyncio.Semaphore(self.max_concurrency)
+        results: Dict[str, FetchResult] = {}
+
+        async def one(u: str):
+            async with sem, throttle.slot(u):
+                try:
+                    results[u] = await self.resolve(u, deadline=run_deadline, cache_mode=cache_mode)
+                except Exception:
+                    results[u] = FetchResult(False, None, None, "", "", "fetch_error")
+            if on_done is not None:
+                on_done(u, results[u])
+
+        tasks = [asyncio.ensure_future(one(u)) for u in unique_urls]
+        try:
+            if tasks:
+                timeout = None if run_deadline is None else max(0.0, run_deadline - time.monotonic())
+                await asyncio.wait(tasks, timeout=timeout)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        return {u: results.get(u) or _deadline_result() for u in unique_urls}
+
+    def resolve_many_sync(
+        self, urls: List[str], run_budget: Optional[float] = None, on_done=None, cache_mode: str = "use"
+    ) -> Dict[str, FetchResult]:
+        return asyncio.run(self.resolve_many(urls, run_budget=run_budget, on_done=on_done, cache_mode=cache_mode))
+
+
+def resolve_all_or_require_manual(
+    agent: FetchAgent,
+    urls: List[str],
+    st_key_prefix: str,
+    max_workers: int = FETCH_MAX_CONCURRENCY,
+    cache_mode: str = "use",
+) -> Dict[str, FetchResult]:
     _ = st_key_prefix  # kept for backward compatibility with existing call sites
-    results: Dict[str, FetchResult] = {}
+    unique_urls = list(dict.fromkeys(urls))
+    if not unique_urls:
+        return {}
+
+    total = len(unique_urls)
+    progress = st.progress(0.0, text=f"Fetching 0/{total}…") if total > 1 else None
+    done = 0
+
+    def on_done(u: str, fr: FetchResult) -> None:
+        nonlocal done
+        done += 1
+        if progress is not None:
+            progress.progress(done / total, text=f"Fetched {done}/{total}: {site_name(u)}")
+
+    # Per-URL and whole-run deadlines; the event loop runs on this (script) thread.
+    fetcher = AsyncFetchAgent(agent, max_concurrency=min(int(max_workers), total), executor=get_fetch_executor())
+    try:
+        results = fetcher.resolve_many_sync(unique_urls, on_done=on_done, cache_mode=cache_mode)
+    finally:
+        fetcher.close()
+    if progress is not None:
+        progress.empty()
 
-    for u in urls:
-        r = agent.resolve(u)
-        results[u] = r
-        time.sleep(0.25)
+    # Same keys and order as the input list, regardless of completion order.
     return results
 
 def split_fetch_results(urls: List[str], fr_map: Dict[str, FetchResult]) -> Tuple[List[str], List[str]]:
@@ -959,6 +2390,282 @@ def fetch_failure_label(fr: Optional[FetchResult]) -> str:
     if fr.status:
         return f"{reason} (HTTP {fr.status})"
     return reason
+
+
+# =====================================================
+# PARSED PAGE (PARSE ONCE, SHARE ACROSS ANALYZERS)
+# =====================================================
+class ParsedPage:
+    """
+    Parse-once view of a page's HTML shared by every analyzer.
+    - soup: the raw parsed document (read-only; never decompose it)
+    - pruned(): cached copies with boilerplate tags removed
+    - lazy views: content root, links, headings, JSON-LD blocks, meta tags, images
+    links / images / meta_tags / title / jsonld / heading_counts are read-only views returning
+    plain data; on the lxml view backend the tag/attribute ones (all but heading_counts) come
+    straight from an lxml tree, without BeautifulSoup. `parser` is the soup's backend,
+    `backend` the views'.
+    """
+
+    def __init__(self, html: str, parser: Optional[str] = None, backend: Optional[str] = None):
+        self.html = html or ""
+        self.parser = parser or HTML_PARSER
+        self.backend = backend or HTML_VIEW_BACKEND
+        self._soup: Optional[bs4.BeautifulSoup] = None
+        self._views: Dict[object, object] = {}
+        # Batch jobs share pages across threads; copying a soup re-enters its tree builder.
+        self._lock = threading.RLock()
+
+    def __bool__(self) -> bool:
+        return bool(self.html)
+
+    def _view(self, key, build):
+        if key not in self._views:
+            with self._lock:
+                if key not in self._views:
+                    self._views[key] = build()
+        return self._views[key]
+
+    @property
+    def soup(self) -> bs4.BeautifulSoup:
+        if self._soup is None:
+            with self._lock:
+                if self._soup is None:
+                    with trace_span("parse.soup", "parse", parser=self.parser, bytes=len(self.html)):
+                        self._soup = bs4.BeautifulSoup(self.html, self.parser)
+        return self._soup
+
+    @property
+    def doc(self):
+        """lxml document behind the read-only views (None on the html.parser view backend)."""
+        def build():
+            if self.backend != "lxml" or not LXML_OK or not self.html.strip():
+                return None
+            try:
+                with trace_span("parse.lxml", "parse", parser="lxml", bytes=len(self.html)):
+                    return lxml_html.document_fromstring(
+                        self.html.encode("utf-8"), parser=lxml_html.HTMLParser(encoding="utf-8")
+                    )
+            except Exception:
+                return None
+        return self._view("doc", build)
+
+    def _attr_dicts(self, tag: str, need: Optional[str] = None) -> List[dict]:
+        if self.doc is not None:
+            return [dict(el.attrib) for el in self.doc.iter(tag) if need is None or el.get(need) is not None]
+        kwargs = {need: True} if need else {}
+        return [dict(t.attrs) for t in self.soup.find_all(tag, **kwargs)]
+
+    def pruned(self, drop_lists: bool = False, drop_noncontent: bool = False) -> bs4.BeautifulSoup:
+        def build():
+            soup = copy.copy(self.soup)
+            tags = list(IGNORE_TAGS) + (list(LIST_TAGS) if drop_lists else [])
+            for t in soup.find_all(tags):
+                t.decompose()
+            if drop_noncontent:
+                _remove_noncontent_elements(soup)
+            return soup
+        return self._view(("pruned", drop_lists, drop_noncontent), build)
+
+    @property
+    def content_root(self):
+        return self._view("content_root", lambda: _find_content_root(self.pruned(drop_noncontent=True)))
+
+    @property
+    def text_root(self):
+        return self._view(
+            "text_root",
+            lambda: _find_content_root(self.pruned(drop_lists=True, drop_noncontent=True)),
+        )
+
+    @property
+    def links(self) -> List[dict]:
+        return self._view("links", lambda: self._attr_dicts("a", need="href"))
+
+    @property
+    def headings(self) -> list:
+        return self._view("headings", lambda: self.soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6"]))
+
+    @property
+    def heading_counts(self) -> Dict[str, int]:
+        """h1-h6 counts outside IGNORE_TAGS (same scope as pruned())."""
+        # Which IGNORE_TAGS element a heading sits in depends on how the parser nests
+        # misnested markup, so this view always reads the soup.
+        def build():
+            counts = {f"h{i}": 0 for i in range(1, 7)}
+            for t in self.pruned().find_all(list(counts)):
+                counts[t.name] += 1
+            return counts
+        return self._view("heading_counts", build)
+
+    @property
+    def first_h1(self):
+        return self._view("first_h1", lambda: self.soup.find("h1"))
+
+    @property
+    def title(self) -> str:
+        def build():
+            if self.doc is not None:
+                t = next(self.doc.iter("title"), None)
+                return clean(t.text_content()) if t is not None else ""
+            t = self.soup.find("title")
+            return clean(t.get_text(" ")) if t else ""
+        return self._view("title", build)
+
+    @property
+    def images(self) -> List[dict]:
+        return self._view("images", lambda: self._attr_dicts("img"))
+
+    @property
+    def meta_tags(self) -> List[dict]:
+        return self._view("meta_tags", lambda: self._attr_dicts("meta"))
+
+    def find_meta(self, attr: str, match) -> Optional[dict]:
+        # Same semantics as soup.find("meta", attrs={attr: match}) for str / compiled-regex matches.
+        for tag in self.meta_tags:
+            val = tag.get(attr)
+            if not isinstance(val, str):
+                continue
+            if isinstance(match, str):
+                if val == match:
+                    return tag
+            elif match.search(val):
+                return tag
+        return None
+
+    @property
+    def jsonld(self) -> list:
+        def build():
+            if self.doc is not None:
+                raws = [
+                    s.text or "" for s in self.doc.iter("script")
+                    if re.search(r"ld\+json", s.get("type") or "", re.I)
+                ]
+            else:
+                raws = [
+                    s.string or s.get_text(" ") or ""
+                    for s in self.soup.find_all("script", attrs={"type": re.compile(r"ld\+json", re.I)})
+                ]
+            blocks = []
+            for raw in raws:
+                raw = raw.strip()
+                if not raw:
+                    continue
+                try:
+                    blocks.append(json.loads(raw))
+                except Exception:
+                    continue
+            return blocks
+        return self._view("jsonld", build)
+
+    @property
+    def schema(self) -> "JsonLdGraph":
+        return self._view("schema", lambda: JsonLdGraph(self.jsonld))
+
+
+class JsonLdGraph:
+    """
+    Every JSON-LD block of a page, decoded once (by ParsedPage.jsonld) and walked once.
+    - nodes: every dict in the blocks, depth-first pre-order (the order the analyzers walk)
+    - by_type: nodes indexed by lowercased @type (falling back to "type")
+    - typed accessors for schema types, FAQ question nodes, dates and author/publisher
+    """
+
+    def __init__(self, blocks: list):
+        self.blocks = blocks
+        self.nodes: List[dict] = []
+        self.node_types: List[List[str]] = []
+        self.by_type: Dict[str, List[dict]] = {}
+        self.schema_types = set()
+        stack = list(reversed(blocks))
+        while stack:
+            x = stack.pop()
+            if isinstance(x, dict):
+                t = x.get("@type") or x.get("type")
+                if isinstance(t, list):
+                    lowered = [str(z).lower() for z in t]
+                    self.schema_types.update(str(z) for z in t)
+                elif isinstance(t, str):
+                    lowered = [t.lower()]
+                    if t:
+                        self.schema_types.add(t)
+                else:
+                    lowered = []
+                    if t:
+                        self.schema_types.add(str(t))
+                self.nodes.append(x)
+                self.node_types.append(lowered)
+                for z in lowered:
+                    self.by_type.setdefault(z, []).append(x)
+                stack.extend(reversed(list(x.values())))
+            elif isinstance(x, list):
+                stack.extend(reversed(x))
+        self._cache: Dict[str, object] = {}
+
+    def has_type(self, schema_type: str) -> bool:
+        return bool(self.by_type.get(schema_type.lower()))
+
+    def question_nodes(self) -> List[dict]:
+        """Nodes typed Question (or any type ending in "question"), in document order."""
+        if "questions" not in self._cache:
+            self._cache["questions"] = [
+                x for x, types in zip(self.nodes, self.node_types)
+                if any("question" == z or z.endswith("question") for z in types)
+            ]
+        return self._cache["questions"]
+
+    @property
+    def dates(self) -> List[Tuple[str, str]]:
+        """(value, "modified"|"published") for Article/WebPage date fields, in document order."""
+        if "dates" not in self._cache:
+            out: List[Tuple[str, str]] = []
+            for data in self.blocks:
+                _collect_jsonld_dates(data, out)
+            self._cache["dates"] = out
+        return self._cache["dates"]
+
+    def first_name(self, key: str) -> str:
+        """Name of the first `key` entity (e.g. author, publisher) across blocks."""
+        ck = "name:" + key
+        if ck not in self._cache:
+            name = ""
+            for data in self.blocks:
+                name = _jsonld_find_name(data, key)
+                if name:
+                    break
+            self._cache[ck] = name
+        return self._cache[ck]
+
+    @property
+    def author(self) -> str:
+        return self.first_name("author")
+
+    @property
+    def publisher(self) -> str:
+        return self.first_name("publisher")
+
+
+PageLike = Union[str, ParsedPage]
+
+
+def as_parsed_page(doc: Optional[PageLike]) -> ParsedPage:
+    if isinstance(doc, ParsedPage):
+        return doc
+    return ParsedPage(doc or "")
+
+
+def get_page_from_fetchresult(fr: Optional[FetchResult]) -> ParsedPage:
+    if fr is None:
+        return ParsedPage("")
+    # Cached on the instance (not a dataclass field) so repr/asdict stay unchanged.
+    page = fr.__dict__.get("_parsed_page")
+    # Streamlit redefines classes on every rerun; entries cached by an earlier run are rebuilt.
+    if not isinstance(page, ParsedPage) or page.html != (fr.html or ""):
+        page = ParsedPage(fr.html or "")
+        fr.__dict__["_parsed_page"] = page
+    return page
+
+
 # =====================================================
 # HEADING TREE + FILTERS
 # =====================================================
@@ -1003,12 +2710,24 @@ HEADER_MATCH_MIN_SCORE = 0.69
 SIMILAR_HEADER_MATCH_FALLBACK = 0.62
 MAX_CONTENT_GAP_ITEMS = 4
 
-def norm_header(h: str) -> str:
+# Headers and FAQ questions repeat across pages and reruns, so their normal forms are memoized;
+# section and article bodies also pass through norm_header but rarely repeat and are large.
+NORM_HEADER_CACHE_MAX_LEN = 200
+
+def _norm_header(h: str) -> str:
     h = clean(h).lower()
     h = re.sub(r"[^a-z0-9\s]", "", h)
     h = re.sub(r"\s+", " ", h).strip()
     return h
 
+_norm_header_cached = lru_cache(maxsize=8192)(_norm_header)
+
+def norm_header(h: str) -> str:
+    if isinstance(h, str) and len(h) <= NORM_HEADER_CACHE_MAX_LEN:
+        return _norm_header_cached(h)
+    return _norm_header(h)
+
+@lru_cache(maxsize=32768)
 def _stem_token(tok: str) -> str:
     t = clean(tok).lower()
     if len(t) > 5 and t.endswith("ies"):
@@ -1057,28 +2776,41 @@ HEADER_OPPOSITE_GROUPS = [
     )
 ]
 
+# Alias lookups, compiled once at import from the alias dictionaries above.
+# Earlier groups win when a stem appears in more than one group.
+def _compile_alias_tables():
+    canonical: Dict[str, str] = {}
+    topic_bucket: Dict[str, frozenset] = {}
+    for key, vals in TOPIC_TOKEN_ALIASES.items():
+        bucket = frozenset({_stem_token(key)} | {_stem_token(v) for v in vals})
+        for stem in bucket:
+            canonical.setdefault(stem, _stem_token(key))
+            topic_bucket.setdefault(stem, bucket)
+    subtopic_bucket: Dict[str, frozenset] = {}
+    for key, vals in SUBTOPIC_TOKEN_ALIASES.items():
+        bucket = frozenset({_stem_token(key)} | {_stem_token(v) for v in vals})
+        for stem in bucket:
+            subtopic_bucket.setdefault(stem, bucket)
+    aliases = {
+        stem: frozenset({stem} | topic_bucket.get(stem, frozenset()) | subtopic_bucket.get(stem, frozenset()))
+        for stem in set(topic_bucket) | set(subtopic_bucket)
+    }
+    opposite = tuple(
+        (frozenset(_stem_token(w) for w in pos), frozenset(_stem_token(w) for w in neg))
+        for pos, neg in HEADER_OPPOSITE_GROUPS
+    )
+    return canonical, aliases, opposite
+
+
+_TOPIC_CANONICAL, _TOKEN_ALIAS_SETS, _OPPOSITE_GROUP_STEMS = _compile_alias_tables()
+
 def _canonical_topic_token(tok: str) -> str:
     stem = _stem_token(tok)
-    for key, vals in TOPIC_TOKEN_ALIASES.items():
-        bucket = {_stem_token(key)} | {_stem_token(v) for v in vals}
-        if stem in bucket:
-            return _stem_token(key)
-    return stem
+    return _TOPIC_CANONICAL.get(stem, stem)
 
-def _token_aliases(tok: str) -> set:
+def _token_aliases(tok: str) -> frozenset:
     stem = _stem_token(tok)
-    aliases = {stem}
-    for key, vals in TOPIC_TOKEN_ALIASES.items():
-        bucket = {_stem_token(key)} | {_stem_token(v) for v in vals}
-        if stem in bucket:
-            aliases |= bucket
-            break
-    for key, vals in SUBTOPIC_TOKEN_ALIASES.items():
-        bucket = {_stem_token(key)} | {_stem_token(v) for v in vals}
-        if stem in bucket:
-            aliases |= bucket
-            break
-    return aliases
+    return _TOKEN_ALIAS_SETS.get(stem) or frozenset((stem,))
 
 def _header_has_any_marker(text: str, words: set) -> bool:
     toks = set(_tokenize_norm_words(text or ""))
@@ -1108,42 +2840,71 @@ def _faq_core_tokens(text: str) -> List[str]:
         out.append(tok)
     return out
 
-def _subtopic_covered_in_text(subtopic: str, bayut_text: str) -> bool:
-    b_text = clean(bayut_text or "")
-    if not b_text:
+class CoverageIndex:
+    """
+    A Bayut text prepared once for the coverage predicates below.
+    - text / norm: cleaned and norm_header()-normalized text (phrase checks are substring tests on `norm`)
+    - tokens: stemmed token set
+    - expanded: tokens plus every vocabulary stem whose alias set meets them, so
+      "does the text contain any alias of tok" is a single membership test
+    """
+
+    def __init__(self, text: str):
+        self.text = clean(text or "")
+        self.norm = norm_header(self.text)
+        self.tokens = frozenset(_tokenize_norm_words(self.text))
+        self.expanded = self.tokens | {
+            stem for stem, aliases in _TOKEN_ALIAS_SETS.items() if not aliases.isdisjoint(self.tokens)
+        }
+
+    def __bool__(self) -> bool:
+        return bool(self.text)
+
+    def token_hit(self, tok: str) -> bool:
+        # Equivalent to bool(self.tokens & _token_aliases(tok)).
+        return _stem_token(tok) in self.expanded
+
+
+CoverageText = Union[str, CoverageIndex]
+
+
+def as_coverage_index(text: Optional[CoverageText]) -> CoverageIndex:
+    if isinstance(text, CoverageIndex):
+        return text
+    return CoverageIndex(text or "")
+
+
+def _subtopic_covered_in_text(subtopic: str, bayut_text: CoverageText) -> bool:
+    cov = as_coverage_index(bayut_text)
+    if not cov:
         return False
 
     sub_n = norm_header(subtopic)
-    text_n = norm_header(b_text)
-    if sub_n and sub_n in text_n:
+    if sub_n and sub_n in cov.norm:
         return True
 
     sub_tokens = _header_core_tokens(subtopic)
     if not sub_tokens:
         return False
 
-    text_tokens = set(_tokenize_norm_words(b_text))
-    if not text_tokens:
+    if not cov.tokens:
         return False
 
-    def token_hit(tok: str) -> bool:
-        return bool(text_tokens & _token_aliases(tok))
-
-    hits = sum(1 for tok in sub_tokens if token_hit(tok))
+    hits = sum(1 for tok in sub_tokens if cov.token_hit(tok))
     if len(sub_tokens) <= 2:
         return hits >= 1
     return hits >= 2
 
-def _topic_coverage_ratio(topic: str, text: str) -> float:
+def _topic_coverage_ratio(topic: str, text: CoverageText) -> float:
     topic_tokens = _header_core_tokens(topic)
     if not topic_tokens:
         return 0.0
-    text_tokens = set(_tokenize_norm_words(text or ""))
-    if not text_tokens:
+    cov = as_coverage_index(text)
+    if not cov.tokens:
         return 0.0
     hits = 0
     for tok in topic_tokens:
-        if text_tokens & _token_aliases(tok):
+        if cov.token_hit(tok):
             hits += 1
     return hits / max(len(topic_tokens), 1)
 
@@ -1160,8 +2921,8 @@ def _is_low_signal_subtopic(header: str) -> bool:
 
 def _topic_is_covered(
     topic: str,
-    bayut_sections: List[dict],
-    bayut_text: str,
+    bayut_sections: Union[List[dict], "HeaderIndex"],
+    bayut_text: CoverageText,
     min_header_score: float = 0.73,
     min_text_coverage: float = 0.90,
 ) -> bool:
@@ -1169,21 +2930,16 @@ def _topic_is_covered(
     if not t:
         return True
 
-    best_header = 0.0
-    for sec in bayut_sections or []:
-        h = clean(sec.get("header", ""))
-        if not h:
-            continue
-        best_header = max(best_header, header_similarity(t, h))
-    if best_header >= min_header_score:
+    index = bayut_sections if isinstance(bayut_sections, HeaderIndex) else HeaderIndex(bayut_sections or [])
+    if index.any_at_least(t, min_header_score):
         return True
 
-    text_n = norm_header(bayut_text or "")
+    cov = as_coverage_index(bayut_text)
     topic_n = norm_header(t)
-    if topic_n and len(topic_n) >= 14 and topic_n in text_n:
+    if topic_n and len(topic_n) >= 14 and topic_n in cov.norm:
         return True
 
-    coverage = _topic_coverage_ratio(t, bayut_text)
+    coverage = _topic_coverage_ratio(t, cov)
     toks = _header_core_tokens(t)
     if not toks:
         return False
@@ -1204,6 +2960,17 @@ def _coverage_corpus(fr: FetchResult, nodes: List[dict]) -> str:
             parts.append(c)
     return clean(" ".join(parts))
 
+def get_coverage_index(fr: FetchResult, nodes: List[dict]) -> CoverageIndex:
+    """CoverageIndex of _coverage_corpus(fr, nodes), cached on the FetchResult so every competitor reuses it."""
+    corpus = _coverage_corpus(fr, nodes)
+    if fr is None:
+        return CoverageIndex(corpus)
+    cov = fr.__dict__.get("_coverage_index")
+    if not isinstance(cov, CoverageIndex) or cov.text != corpus:
+        cov = CoverageIndex(corpus)
+        fr.__dict__["_coverage_index"] = cov
+    return cov
+
 def header_is_faq(header: str) -> bool:
     nh = norm_header(header)
     if not nh:
@@ -1242,16 +3009,23 @@ def level_of(tag_name: str) -> int:
     except Exception:
         return 9
 
-def build_tree_from_html(html: str) -> List[dict]:
-    soup = BeautifulSoup(html, "html.parser")
-    for t in soup.find_all(list(IGNORE_TAGS)):
-        t.decompose()
+TREE_HEADING_TAGS = ("h1", "h2", "h3", "h4")
+
+def build_tree_from_html(html: PageLike) -> List[dict]:
+    """
+    One pass over the document in order. Every open section collects the p/li that follow it.
+    A section closes at the next h1-h4 anywhere after its heading, unless that heading is
+    identical to the section's own heading.
+    """
+    soup = as_parsed_page(html).pruned()
 
     root = soup.find("article") or soup
-    headings = root.find_all(["h1", "h2", "h3", "h4"])
+    in_root = {id(h) for h in root.find_all(list(TREE_HEADING_TAGS))}
 
     nodes: List[dict] = []
     stack: List[dict] = []
+    sections: List[Tuple[dict, list]] = []
+    open_sections: List[tuple] = []
 
     def pop_to_level(lvl: int):
         while stack and stack[-1]["level"] >= lvl:
@@ -1264,41 +3038,63 @@ def build_tree_from_html(html: str) -> List[dict]:
             nodes.append(node)
         stack.append(node)
 
-    for h in headings:
-        header = clean(h.get_text(" "))
-        if not header or len(header) < 3:
-            continue
-        if is_noise_header(header):
-            continue
+    for el in soup.find_all(True):
+        name = el.name
+        if name in TREE_HEADING_TAGS:
+            if open_sections:
+                open_sections = [sec for sec in open_sections if el == sec[0]]
+            if id(el) not in in_root:
+                continue
+
+            header = clean(el.get_text(" "))
+            if not header or len(header) < 3:
+                continue
+            if is_noise_header(header):
+                continue
 
-        lvl = level_of(h.name)
-        pop_to_level(lvl)
+            lvl = level_of(name)
+            pop_to_level(lvl)
 
-        node = {"level": lvl, "header": header, "content": "", "children": []}
-        add_node(node)
+            node = {"level": lvl, "header": header, "content": "", "children": []}
+            add_node(node)
 
-        content_parts = []
-        for sib in h.find_all_next():
-            if sib == h:
-                continue
-            if getattr(sib, "name", None) in ["h1", "h2", "h3", "h4"]:
-                break
-            if getattr(sib, "name", None) in ["p", "li"]:
-                txt = clean(sib.get_text(" "))
-                if txt:
-                    content_parts.append(txt)
+            parts: List[str] = []
+            sections.append((node, parts))
+            open_sections.append((el, parts))
+        elif name in ("p", "li") and open_sections:
+            txt = clean(el.get_text(" "))
+            if txt:
+                for _, parts in open_sections:
+                    parts.append(txt)
 
-        node["content"] = clean(" ".join(content_parts))
+    for node, parts in sections:
+        node["content"] = clean(" ".join(parts))
 
     return nodes
 
-def build_tree_from_reader_text(text: str) -> List[dict]:
-    lines = [l.rstrip() for l in (text or "").splitlines()]
+# str.splitlines() boundaries, matched lazily so a large paste is never split in one go.
+_SPLITLINES_RE = re.compile(r"\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+_NEWLINE_RE = re.compile(r"\n")
+_MD_HEADING_RE = re.compile(r"^(#{1,4})\s+(.*)$")
+
+def iter_text_lines(text: str, breaks: re.Pattern = _SPLITLINES_RE) -> Iterator[str]:
+    """Lines of `text` one at a time; the default breaks match str.splitlines()."""
+    pos = 0
+    for m in breaks.finditer(text):
+        yield text[pos:m.start()]
+        pos = m.end()
+    if pos < len(text):
+        yield text[pos:]
+
+def build_tree_from_reader_text(text: Union[str, Iterable[str]]) -> List[dict]:
+    """Markdown-style (#..####) headings; `text` may be a string or an iterable of lines."""
+    lines = iter_text_lines(text or "") if isinstance(text, str) or text is None else text
     nodes: List[dict] = []
     stack: List[dict] = []
+    sections: List[Tuple[dict, List[str]]] = []
 
     def md_level(line: str):
-        m = re.match(r"^(#{1,4})\s+(.*)$", line.strip())
+        m = _MD_HEADING_RE.match(line)
         if not m:
             return None
         lvl = len(m.group(1))
@@ -1316,7 +3112,7 @@ def build_tree_from_reader_text(text: str) -> List[dict]:
             nodes.append(node)
         stack.append(node)
 
-    current = None
+    parts: Optional[List[str]] = None
     for line in lines:
         s = line.strip()
         if not s:
@@ -1326,28 +3122,28 @@ def build_tree_from_reader_text(text: str) -> List[dict]:
         if ml:
             lvl, header = ml
             if is_noise_header(header):
-                current = None
+                parts = None
                 continue
 
             pop_to_level(lvl)
             node = {"level": lvl, "header": header, "content": "", "children": []}
             add_node(node)
-            current = node
-        else:
-            if current:
-                current["content"] += " " + s
+            parts = []
+            sections.append((node, parts))
+        elif parts is not None:
+            parts.append(s)
 
-    def walk(n: dict) -> dict:
-        n["content"] = clean(n["content"])
-        n["children"] = [walk(c) for c in n["children"]]
-        return n
+    for node, node_parts in sections:
+        node["content"] = clean(" ".join(node_parts))
 
-    return [walk(n) for n in nodes]
+    return nodes
 
-def build_tree_from_plain_text_heuristic(text: str) -> List[dict]:
-    raw = (text or "").replace("\r", "")
-    lines = [clean(l) for l in raw.split("\n")]
-    lines = [l for l in lines if l]
+def build_tree_from_plain_text_heuristic(text: Union[str, Iterable[str]]) -> List[dict]:
+    """Flat H2 sections from title-case lines; `text` may be a string or an iterable of lines."""
+    if isinstance(text, str) or text is None:
+        lines = (l.replace("\r", "") for l in iter_text_lines(text or "", _NEWLINE_RE))
+    else:
+        lines = (l.replace("\r", "") for l in text)
 
     def looks_like_heading(line: str) -> bool:
         if len(line) < 5 or len(line) > 80:
@@ -1364,35 +3160,49 @@ def build_tree_from_plain_text_heuristic(text: str) -> List[dict]:
         return (caps_ratio >= 0.6) or (allcaps_ratio >= 0.5)
 
     nodes: List[dict] = []
-    current = None
-
-    for line in lines:
+    sections: List[Tuple[dict, List[str]]] = []
+    parts: Optional[List[str]] = None
+
+    def open_section(header: str) -> List[str]:
+        node = {"level": 2, "header": header, "content": "", "children": []}
+        nodes.append(node)
+        sections.append((node, []))
+        return sections[-1][1]
+
+    for raw_line in lines:
+        line = clean(raw_line)
+        if not line:
+            continue
         if looks_like_heading(line):
-            current = {"level": 2, "header": line, "content": "", "children": []}
-            nodes.append(current)
+            parts = open_section(line)
         else:
-            if current is None:
-                current = {"level": 2, "header": "Overview", "content": "", "children": []}
-                nodes.append(current)
-            current["content"] = clean(current["content"] + " " + line)
+            if parts is None:
+                parts = open_section("Overview")
+            parts.append(line)
+
+    for node, node_parts in sections:
+        node["content"] = clean(" ".join(node_parts))
 
     return nodes
 
-def get_tree_from_fetchresult(fr: FetchResult) -> dict:
+def get_tree_from_fetchresult(fr: FetchResult, url: str = "") -> dict:
+    """Heading tree of a fetched page (`url` only labels the trace span)."""
     if not fr.ok:
         return {"ok": False, "source": None, "nodes": [], "status": fr.status}
 
     txt = fr.text or ""
     maybe_html = ("<html" in txt.lower()) or ("<article" in txt.lower()) or ("<h1" in txt.lower()) or ("<h2" in txt.lower())
 
-    if fr.html:
-        nodes = build_tree_from_html(fr.html)
-    elif fr.source == "manual" and maybe_html:
-        nodes = build_tree_from_html(txt)
-    else:
-        nodes = build_tree_from_reader_text(txt)
-        if not nodes:
-            nodes = build_tree_from_plain_text_heuristic(txt)
+    with trace_span("tree", "parse", url=url or None, source=fr.source) as span:
+        if fr.html:
+            nodes = build_tree_from_html(get_page_from_fetchresult(fr))
+        elif fr.source == "manual" and maybe_html:
+            nodes = build_tree_from_html(txt)
+        else:
+            nodes = build_tree_from_reader_text(txt)
+            if not nodes:
+                nodes = build_tree_from_plain_text_heuristic(txt)
+        span["nodes"] = len(nodes)
 
     return {"ok": True, "source": fr.source, "nodes": nodes, "status": fr.status}
 
@@ -1401,7 +3211,7 @@ def ensure_headings_or_require_repaste(urls: List[str], fr_map: Dict[str, FetchR
     bad: List[str] = []
 
     for u in urls:
-        tr = get_tree_from_fetchresult(fr_map[u])
+        tr = get_tree_from_fetchresult(fr_map[u], u)
         tree_map[u] = tr
         if not tr.get("nodes"):
             bad.append(u)
@@ -1423,7 +3233,7 @@ def ensure_headings_or_require_repaste(urls: List[str], fr_map: Dict[str, FetchR
 
     still_bad = []
     for u in bad:
-        tr = get_tree_from_fetchresult(fr_map[u])
+        tr = get_tree_from_fetchresult(fr_map[u], u)
         tree_map[u] = tr
         if not tr.get("nodes"):
             still_bad.append(u)
@@ -1434,6 +3244,162 @@ def ensure_headings_or_require_repaste(urls: List[str], fr_map: Dict[str, FetchR
     return tree_map
 
 
+# =====================================================
+# RUN-SCOPED ARTIFACT STORE (INCREMENTAL RE-ANALYSIS)
+# =====================================================
+# Per-URL artifacts survive reruns within a session, so adding one competitor to a
+# list of seven fetches and analyzes only the new URL. Failed fetches are never stored.
+ARTIFACT_STORE_TTL = int(os.getenv("ARTIFACT_STORE_TTL", "3600"))  # seconds; 0 = no expiry
+
+@dataclass
+class UrlArtifacts:
+    fr: FetchResult
+    tree: dict
+    rev: int
+    stored_at: float
+    seo_rows: Dict[tuple, dict] = field(default_factory=dict)
+    cq_rows: Dict[tuple, dict] = field(default_factory=dict)
+    gap_rows: Dict[tuple, List[dict]] = field(default_factory=dict)
+
+class ArtifactStore:
+    """
+    Fetch result + heading tree per URL, plus derived rows keyed by the inputs that
+    produced them (focus keyword, Bayut page revision, same-domain peers). Replacing a
+    URL's fetch drops everything derived from it.
+    """
+    def __init__(self, ttl: int = ARTIFACT_STORE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[str, UrlArtifacts] = {}
+        self._next_rev = 0
+        self.hits = 0
+        self.misses = 0
+
+    def entry(self, url: str) -> Optional[UrlArtifacts]:
+        ent = self._entries.get(url)
+        if ent is not None and self.ttl and time.time() - ent.stored_at > self.ttl:
+            del self._entries[url]
+            return None
+        return ent
+
+    def fetch_result(self, url: str) -> Optional[FetchResult]:
+        ent = self.entry(url)
+        return ent.fr if ent is not None else None
+
+    def remember(self, url: str, fr: FetchResult, tree: dict) -> UrlArtifacts:
+        ent = self.entry(url)
+        if ent is not None and ent.fr is fr:
+            return ent
+        self._next_rev += 1
+        ent = UrlArtifacts(fr=fr, tree=tree, rev=self._next_rev, stored_at=time.time())
+        self._entries[url] = ent
+        return ent
+
+    def retain(self, urls: List[str]) -> None:
+        keep = set(urls)
+        for u in [u for u in self._entries if u not in keep]:
+            del self._entries[u]
+
+    def forget(self, urls: List[str]) -> None:
+        """Drop stored results (and everything derived from them) so the URLs are fetched again."""
+        for u in urls:
+            self._entries.pop(u, None)
+
+    def memo(self, url: str, table: str, key: tuple, build):
+        """Row(s) for `url` from `table` under `key`, building them on a miss."""
+        ent = self.entry(url)
+        if ent is None:
+            return build()
+        rows = getattr(ent, table)
+        if key in rows:
+            self.hits += 1
+            return rows[key]
+        self.misses += 1
+        rows[key] = build()
+        return rows[key]
+
+    def memo_many(self, table: str, keyed: List[Tuple[str, Optional[tuple]]], build_missing) -> list:
+        """
+        memo() for several (url, key) rows at once: build_missing(indexes) builds every miss
+        in one call (e.g. across the analysis pool). A None key is always built, never stored.
+        """
+        out: list = [None] * len(keyed)
+        missing: List[int] = []
+        for i, (url, key) in enumerate(keyed):
+            ent = self.entry(url) if key is not None else None
+            rows = getattr(ent, table) if ent is not None else {}
+            if key is not None and key in rows:
+                self.hits += 1
+                out[i] = rows[key]
+            else:
+                missing.append(i)
+        for i, value in zip(missing, build_missing(missing) if missing else []):
+            url, key = keyed[i]
+            ent = self.entry(url) if key is not None else None
+            if ent is not None:
+                self.misses += 1
+                getattr(ent, table)[key] = value
+            out[i] = value
+        return out
+
+    def rev(self, url: str) -> Optional[int]:
+        ent = self.entry(url)
+        return ent.rev if ent is not None else None
+
+    @property
+    def stats(self) -> dict:
+        return {"urls": len(self._entries), "row_hits": self.hits, "row_misses": self.misses}
+
+def _same_fetch(a: FetchResult, b: FetchResult) -> bool:
+    return (a.ok, a.source, a.html, a.text) == (b.ok, b.source, b.html, b.text)
+
+@traced("stage", "fetch")
+def resolve_with_store(
+    store: ArtifactStore,
+    agent: FetchAgent,
+    urls: List[str],
+    st_key_prefix: str,
+    refresh: Iterable[str] = (),
+    cache_mode: str = "use",
+) -> Dict[str, FetchResult]:
+    """
+    resolve_all_or_require_manual, fetching only URLs without a stored result.
+    URLs in `refresh` are always fetched again, revalidating fetch-cache entries; when the
+    page comes back unchanged the stored result (and the rows derived from it) is kept.
+    """
+    unique_urls = list(dict.fromkeys(urls))
+    refresh = [u for u in unique_urls if u in set(refresh)]
+    stored = {u: store.fetch_result(u) for u in unique_urls}
+    missing = [u for u in unique_urls if stored[u] is None and u not in refresh]
+    fetched = resolve_all_or_require_manual(agent, missing, st_key_prefix=st_key_prefix, cache_mode=cache_mode) if missing else {}
+    if refresh:
+        fetched.update(resolve_all_or_require_manual(
+            agent, refresh, st_key_prefix=st_key_prefix, cache_mode="bypass" if cache_mode == "bypass" else "revalidate"
+        ))
+        for u in refresh:
+            if stored[u] is not None and _same_fetch(stored[u], fetched[u]):
+                fetched[u] = stored[u]
+    return {u: fetched.get(u) or stored[u] for u in unique_urls}
+
+@traced("stage", "trees")
+def ensure_headings_with_store(
+    store: ArtifactStore, urls: List[str], fr_map: Dict[str, FetchResult], st_key_prefix: str
+) -> Dict[str, dict]:
+    """ensure_headings_or_require_repaste for new fetches; stored trees are reused as-is."""
+    tree_map: Dict[str, dict] = {}
+    pending: List[str] = []
+    for u in urls:
+        ent = store.entry(u)
+        if ent is not None and ent.fr is fr_map[u]:
+            tree_map[u] = ent.tree
+        else:
+            pending.append(u)
+    if pending:
+        tree_map.update(ensure_headings_or_require_repaste(pending, fr_map, st_key_prefix=st_key_prefix))
+        for u in pending:
+            store.remember(u, fr_map[u], tree_map[u])
+    return {u: tree_map[u] for u in urls}
+
+
 # =====================================================
 # HELPERS
 # =====================================================
@@ -1557,86 +3523,26 @@ def normalize_question(q: str) -> str:
     q = re.sub(r"^\s*[-•]\s*", "", q)
     return q.strip()
 
-def _has_faq_schema(html: str) -> bool:
+def _has_faq_schema(html: PageLike) -> bool:
     if not html:
         return False
     try:
-        soup = BeautifulSoup(html, "html.parser")
-        scripts = soup.find_all("script", attrs={"type": re.compile(r"ld\+json", re.I)})
-        for s in scripts:
-            raw = (s.string or s.get_text(" ") or "").strip()
-            if not raw:
-                continue
-            try:
-                j = json.loads(raw)
-            except Exception:
-                continue
-
-            def walk(x):
-                if isinstance(x, dict):
-                    t = x.get("@type") or x.get("type")
-                    if isinstance(t, str) and t.lower() == "faqpage":
-                        return True
-                    if isinstance(t, list) and any(str(z).lower() == "faqpage" for z in t):
-                        return True
-                    for v in x.values():
-                        if walk(v):
-                            return True
-                elif isinstance(x, list):
-                    for v in x:
-                        if walk(v):
-                            return True
-                return False
-
-            if walk(j):
-                return True
+        return as_parsed_page(html).schema.has_type("faqpage")
     except Exception:
         return False
-    return False
 
-def _faq_questions_from_schema(html: str) -> List[str]:
+def _faq_questions_from_schema(html: PageLike) -> List[str]:
     if not html:
         return []
     qs: List[str] = []
     try:
-        soup = BeautifulSoup(html, "html.parser")
-        scripts = soup.find_all("script", attrs={"type": re.compile(r"ld\+json", re.I)})
-        for s in scripts:
-            raw = (s.string or s.get_text(" ") or "").strip()
-            if not raw:
-                continue
-            try:
-                j = json.loads(raw)
-            except Exception:
-                continue
-
-            def add_q(q: str):
-                qn = normalize_question(q)
+        for x in as_parsed_page(html).schema.question_nodes():
+            name = x.get("name") or x.get("text") or ""
+            if name:
+                qn = normalize_question(name)
                 if not qn or len(qn) < 6 or len(qn) > 180:
-                    return
+                    continue
                 qs.append(qn)
-
-            def walk(x):
-                if isinstance(x, dict):
-                    t = x.get("@type") or x.get("type")
-                    t_list = []
-                    if isinstance(t, list):
-                        t_list = [str(z).lower() for z in t]
-                    elif isinstance(t, str):
-                        t_list = [t.lower()]
-
-                    if any("question" == z or z.endswith("question") for z in t_list):
-                        name = x.get("name") or x.get("text") or ""
-                        if name:
-                            add_q(name)
-
-                    for v in x.values():
-                        walk(v)
-                elif isinstance(x, list):
-                    for v in x:
-                        walk(v)
-
-            walk(j)
     except Exception:
         return []
 
@@ -1650,15 +3556,14 @@ def _faq_questions_from_schema(html: str) -> List[str]:
         out.append(q)
     return out
 
-def _faq_questions_from_html(html: str) -> List[str]:
+def _faq_questions_from_html(html: PageLike) -> List[str]:
     if not html:
         return []
-    soup = BeautifulSoup(html, "html.parser")
-    for t in soup.find_all(list(IGNORE_TAGS)):
-        t.decompose()
+    page = as_parsed_page(html)
+    soup = page.pruned()
 
     qs: List[str] = []
-    qs.extend(_faq_questions_from_schema(html))
+    qs.extend(_faq_questions_from_schema(page))
 
     candidates = []
     for tag in soup.find_all(True):
@@ -1696,55 +3601,25 @@ def _faq_questions_from_html(html: str) -> List[str]:
         out.append(q)
     return out
 
-def _faq_pairs_from_schema(html: str) -> List[dict]:
+def _faq_pairs_from_schema(html: PageLike) -> List[dict]:
     if not html:
         return []
     out: List[dict] = []
     try:
-        soup = BeautifulSoup(html, "html.parser")
-        scripts = soup.find_all("script", attrs={"type": re.compile(r"ld\+json", re.I)})
-        for s in scripts:
-            raw = (s.string or s.get_text(" ") or "").strip()
-            if not raw:
-                continue
-            try:
-                j = json.loads(raw)
-            except Exception:
-                continue
-
-            def _add_pair(q: str, a: str = ""):
+        for x in as_parsed_page(html).schema.question_nodes():
+            q = x.get("name") or x.get("text") or ""
+            a = ""
+            ans_obj = x.get("acceptedAnswer") or x.get("answer") or {}
+            if isinstance(ans_obj, dict):
+                a = ans_obj.get("text") or ans_obj.get("name") or ""
+            elif isinstance(ans_obj, str):
+                a = ans_obj
+            if q:
                 qn = normalize_question(q)
                 an = clean(re.sub(r"<[^>]+>", " ", str(a or "")))
                 if not qn or len(qn) < 6 or len(qn) > 180:
-                    return
+                    continue
                 out.append({"question": qn, "answer": an})
-
-            def _walk(x):
-                if isinstance(x, dict):
-                    t = x.get("@type") or x.get("type")
-                    t_list = []
-                    if isinstance(t, list):
-                        t_list = [str(z).lower() for z in t]
-                    elif isinstance(t, str):
-                        t_list = [t.lower()]
-
-                    if any("question" == z or z.endswith("question") for z in t_list):
-                        q = x.get("name") or x.get("text") or ""
-                        a = ""
-                        ans_obj = x.get("acceptedAnswer") or x.get("answer") or {}
-                        if isinstance(ans_obj, dict):
-                            a = ans_obj.get("text") or ans_obj.get("name") or ""
-                        elif isinstance(ans_obj, str):
-                            a = ans_obj
-                        if q:
-                            _add_pair(q, a)
-                    for v in x.values():
-                        _walk(v)
-                elif isinstance(x, list):
-                    for v in x:
-                        _walk(v)
-
-            _walk(j)
     except Exception:
         return []
 
@@ -1761,15 +3636,14 @@ def _faq_pairs_from_schema(html: str) -> List[dict]:
             dedup[k] = p
     return list(dedup.values())
 
-def _faq_pairs_from_html(html: str) -> List[dict]:
+def _faq_pairs_from_html(html: PageLike) -> List[dict]:
     if not html:
         return []
-    soup = BeautifulSoup(html, "html.parser")
-    for t in soup.find_all(list(IGNORE_TAGS)):
-        t.decompose()
+    page = as_parsed_page(html)
+    soup = page.pruned()
 
     pairs: List[dict] = []
-    pairs.extend(_faq_pairs_from_schema(html))
+    pairs.extend(_faq_pairs_from_schema(page))
 
     candidates = []
     for tag in soup.find_all(True):
@@ -1872,9 +3746,10 @@ def extract_questions_from_node(node: dict) -> List[str]:
 
 def page_has_real_faq(fr: FetchResult, nodes: List[dict]) -> bool:
     if fr and fr.html:
-        if _has_faq_schema(fr.html):
+        page = get_page_from_fetchresult(fr)
+        if _has_faq_schema(page):
             return True
-        if len(_faq_questions_from_html(fr.html)) >= 2:
+        if len(_faq_questions_from_html(page)) >= 2:
             return True
 
     faq_nodes = _faq_heading_nodes(nodes)
@@ -1893,7 +3768,7 @@ def page_has_real_faq(fr: FetchResult, nodes: List[dict]) -> bool:
 def extract_faq_questions(fr: FetchResult, nodes: List[dict]) -> List[str]:
     qs: List[str] = []
     if fr and fr.html:
-        qs.extend(_faq_questions_from_html(fr.html))
+        qs.extend(_faq_questions_from_html(get_page_from_fetchresult(fr)))
     for fn in _faq_heading_nodes(nodes):
         qs.extend(extract_questions_from_node(fn))
 
@@ -1921,7 +3796,7 @@ def _faq_pairs_from_nodes(nodes: List[dict]) -> List[dict]:
 def extract_faq_pairs(fr: FetchResult, nodes: List[dict]) -> List[dict]:
     pairs: List[dict] = []
     if fr and fr.html:
-        pairs.extend(_faq_pairs_from_html(fr.html))
+        pairs.extend(_faq_pairs_from_html(get_page_from_fetchresult(fr)))
     pairs.extend(_faq_pairs_from_nodes(nodes))
 
     # Backfill questions without answers from question-only extraction.
@@ -1971,7 +3846,7 @@ def faq_topic_from_question(q: str) -> str:
         return ""
     return topic[:1].upper() + topic[1:]
 
-def faq_topic_covered_in_text(q: str, bayut_text: str) -> bool:
+def faq_topic_covered_in_text(q: str, bayut_text: CoverageText) -> bool:
     topic = faq_topic_from_question(q)
     if not topic:
         return False
@@ -1983,19 +3858,19 @@ def faq_topic_covered_in_text(q: str, bayut_text: str) -> bool:
         return cov >= 1.0
     return cov >= MISSING_FAQ_MIN_TEXT_COVERAGE
 
-def faq_question_covered_in_text(q: str, bayut_text: str) -> bool:
+def faq_question_covered_in_text(q: str, bayut_text: CoverageText) -> bool:
     qn = normalize_question(q)
     if not qn:
         return False
+    cov = as_coverage_index(bayut_text)
     qn_norm = norm_header(qn)
-    b_norm = norm_header(bayut_text or "")
-    if qn_norm and len(qn_norm) >= 16 and qn_norm in b_norm:
+    if qn_norm and len(qn_norm) >= 16 and qn_norm in cov.norm:
         return True
 
     q_tokens = set(_faq_core_tokens(qn))
     if not q_tokens:
         return False
-    b_tokens = set(_tokenize_norm_words(bayut_text or ""))
+    b_tokens = cov.tokens
     if not b_tokens:
         return False
 
@@ -2059,7 +3934,122 @@ def faq_questions_equivalent(a: str, b: str) -> bool:
         if overlap >= 2 and jacc >= 0.67:
             return True
 
-    return SequenceMatcher(None, a_n, b_n).ratio() >= 0.90
+    return SequenceMatcher(None, a_n, b_n).ratio() >= 0.90
+
+@dataclass
+class FaqQuestionKey:
+    """Everything faq_questions_equivalent derives from one question, computed once."""
+    q: str
+    norm: str
+    topic: str
+    tokens: frozenset
+
+
+def faq_question_key(question: str) -> Optional[FaqQuestionKey]:
+    q = normalize_question(question)
+    if not q:
+        return None
+    return FaqQuestionKey(q, norm_header(q), norm_header(faq_topic_from_question(q)), frozenset(_faq_core_tokens(q)))
+
+
+class FaqMatcher:
+    """
+    Bayut FAQ questions prepared once for batch matching.
+    matches(q) == any(faq_questions_equivalent(q, b) for b in questions), but each rule only
+    visits candidates that could satisfy it: exact norms via a set, topic similarity via a
+    HeaderIndex, token-overlap rules via posting lists, and the final SequenceMatcher check
+    only where its length / character-count bounds still allow 0.90.
+    """
+
+    def __init__(self, questions: List[str]):
+        self.keys = [k for k in (faq_question_key(q) for q in questions if clean(q)) if k is not None]
+        self._norms = {k.norm for k in self.keys}
+        self._long_norms = [k.norm for k in self.keys if len(k.norm) >= 12]
+        self._topics = sorted({k.topic for k in self.keys if k.topic})
+        self._topic_index = HeaderIndex([{"header": t} for t in self._topics])
+        self._char_counts = [Counter(k.norm) for k in self.keys]
+        self._postings: Dict[str, List[int]] = {}
+        for i, k in enumerate(self.keys):
+            for tok in k.tokens:
+                self._postings.setdefault(tok, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def matches(self, question: str) -> bool:
+        k = faq_question_key(question)
+        if k is None or not self.keys:
+            return False
+
+        a_n = k.norm
+        if a_n in self._norms:
+            return True
+        if len(a_n) >= 12 and any(a_n in b_n or b_n in a_n for b_n in self._long_norms):
+            return True
+
+        if k.topic and self._topics:
+            a_topic = k.topic
+            for b_topic in self._topics:
+                if a_topic == b_topic:
+                    return True
+                if (a_topic in b_topic or b_topic in a_topic) and min(len(a_topic), len(b_topic)) >= 10:
+                    return True
+            if self._topic_index.any_at_least(a_topic, 0.82):
+                return True
+
+        if k.tokens:
+            seen = set()
+            for tok in k.tokens:
+                for i in self._postings.get(tok, ()):
+                    if i in seen:
+                        continue
+                    seen.add(i)
+                    b_tokens = self.keys[i].tokens
+                    overlap = len(k.tokens & b_tokens)
+                    small = min(len(k.tokens), len(b_tokens))
+                    if small >= 2 and overlap / max(small, 1) >= 0.8:
+                        return True
+                    jacc = overlap / max(len(k.tokens | b_tokens), 1)
+                    if overlap >= 2 and jacc >= 0.67:
+                        return True
+
+        # SequenceMatcher.ratio() <= quick_ratio() <= real_quick_ratio(); skip pairs the bounds rule out.
+        a_chars = Counter(a_n)
+        for b, b_chars in zip(self.keys, self._char_counts):
+            length = len(a_n) + len(b.norm)
+            if 2.0 * min(len(a_n), len(b.norm)) / length < 0.90:
+                continue
+            if 2.0 * sum(min(n, b_chars[c]) for c, n in a_chars.items()) / length < 0.90:
+                continue
+            if SequenceMatcher(None, a_n, b.norm).ratio() >= 0.90:
+                return True
+        return False
+
+
+def _valid_faq_question(q: str) -> bool:
+    qn = normalize_question(q)
+    if not qn or len(qn) <= 5:
+        return False
+    if not _looks_like_question(qn):
+        return False
+    qn_low = qn.lower()
+    if re.search(r"\blooking to (rent|buy)\b|\brequest a call\b|\bcontact us\b", qn_low):
+        return False
+    return True
+
+
+def get_bayut_faq_matcher(bayut_fr: FetchResult, bayut_nodes: List[dict]) -> FaqMatcher:
+    """FaqMatcher over the Bayut page's real FAQ questions, cached on the FetchResult for every competitor."""
+    cached = bayut_fr.__dict__.get("_faq_matcher") if bayut_fr is not None else None
+    if cached is not None and cached[0] is bayut_nodes and isinstance(cached[1], FaqMatcher):
+        return cached[1]
+    pairs = extract_faq_pairs(bayut_fr, bayut_nodes) if page_has_real_faq(bayut_fr, bayut_nodes) else []
+    questions = [clean(p.get("question", "")) for p in pairs]
+    matcher = FaqMatcher([q for q in questions if _valid_faq_question(q)])
+    if bayut_fr is not None:
+        bayut_fr.__dict__["_faq_matcher"] = (bayut_nodes, matcher)
+    return matcher
+
 
 def faq_questions_related(a: str, b: str) -> bool:
     if faq_questions_equivalent(a, b):
@@ -2130,27 +4120,15 @@ def missing_faqs_row(
     comp_fr: FetchResult,
     comp_url: str
 ) -> Optional[dict]:
-    def _valid_faq_q(q: str) -> bool:
-        qn = normalize_question(q)
-        if not qn or len(qn) <= 5:
-            return False
-        if not _looks_like_question(qn):
-            return False
-        qn_low = qn.lower()
-        if re.search(r"\blooking to (rent|buy)\b|\brequest a call\b|\bcontact us\b", qn_low):
-            return False
-        return True
-
     if not page_has_real_faq(comp_fr, comp_nodes):
         return None
 
     comp_pairs = extract_faq_pairs(comp_fr, comp_nodes)
-    comp_pairs = [p for p in comp_pairs if _valid_faq_q(clean(p.get("question", "")))]
+    comp_pairs = [p for p in comp_pairs if _valid_faq_question(clean(p.get("question", "")))]
     if not comp_pairs:
         return None
 
-    bayut_pairs = extract_faq_pairs(bayut_fr, bayut_nodes) if page_has_real_faq(bayut_fr, bayut_nodes) else []
-    bayut_pairs = [p for p in bayut_pairs if _valid_faq_q(clean(p.get("question", "")))]
+    bayut_faqs = get_bayut_faq_matcher(bayut_fr, bayut_nodes)
 
     missing_qs = []
 
@@ -2158,16 +4136,7 @@ def missing_faqs_row(
         q = clean(cp.get("question", ""))
         if not q:
             continue
-
-        matched = False
-        for bp in bayut_pairs:
-            bq = clean(bp.get("question", ""))
-            if not bq:
-                continue
-            if faq_questions_equivalent(q, bq):
-                matched = True
-                break
-        if matched:
+        if bayut_faqs.matches(q):
             continue
 
         missing_qs.append(q)
@@ -2278,27 +4247,41 @@ def section_nodes(nodes: List[dict], levels=(2,3)) -> List[dict]:
         out.append(s)
     return out
 
-def header_similarity(a: str, b: str) -> float:
-    a_n = norm_header(a)
-    b_n = norm_header(b)
-    if not a_n or not b_n:
+@dataclass
+class HeaderFeatures:
+    """One side of header_similarity, computed once per header."""
+    norm: str
+    words: frozenset
+    core: frozenset
+    core_joined: str
+    polarity: Tuple[Tuple[bool, bool], ...]
+
+
+def header_features(text: str) -> HeaderFeatures:
+    n = norm_header(text)
+    core = frozenset(_header_core_tokens(text))
+    toks = set(_tokenize_norm_words(text or ""))
+    polarity = tuple((bool(toks & pos), bool(toks & neg)) for pos, neg in _OPPOSITE_GROUP_STEMS)
+    return HeaderFeatures(n, frozenset(n.split()), core, " ".join(sorted(core)), polarity)
+
+
+def _similarity_from_features(fa: HeaderFeatures, fb: HeaderFeatures) -> float:
+    if not fa.norm or not fb.norm:
         return 0.0
 
-    a_set = set(a_n.split())
-    b_set = set(b_n.split())
+    a_set, b_set = fa.words, fb.words
     jacc = len(a_set & b_set) / max(len(a_set | b_set), 1) if a_set and b_set else 0.0
-    seq = SequenceMatcher(None, a_n, b_n).ratio()
+    seq = SequenceMatcher(None, fa.norm, fb.norm).ratio()
     base = (0.55 * seq) + (0.45 * jacc)
 
     # Extra semantic tolerance for cosmetic variants:
     # "The Light Village" ~ "About Sharjah Light Village".
-    a_core = set(_header_core_tokens(a))
-    b_core = set(_header_core_tokens(b))
+    a_core, b_core = fa.core, fb.core
     if not a_core or not b_core:
         return base
 
     core_jacc = len(a_core & b_core) / max(len(a_core | b_core), 1)
-    core_seq = SequenceMatcher(None, " ".join(sorted(a_core)), " ".join(sorted(b_core))).ratio()
+    core_seq = SequenceMatcher(None, fa.core_joined, fb.core_joined).ratio()
     core_score = (0.60 * core_seq) + (0.40 * core_jacc)
 
     subset_bonus = 0.0
@@ -2310,33 +4293,120 @@ def header_similarity(a: str, b: str) -> float:
 
     # Prevent opposite-polarity headers from being treated as equivalent
     # (e.g., "Advantages" vs "Disadvantages").
-    for pos_words, neg_words in HEADER_OPPOSITE_GROUPS:
-        a_pos = _header_has_any_marker(a, pos_words)
-        a_neg = _header_has_any_marker(a, neg_words)
-        b_pos = _header_has_any_marker(b, pos_words)
-        b_neg = _header_has_any_marker(b, neg_words)
+    for (a_pos, a_neg), (b_pos, b_neg) in zip(fa.polarity, fb.polarity):
         if (a_pos and b_neg) or (a_neg and b_pos):
             score *= 0.58
             break
 
     return score
 
-def find_best_bayut_match(comp_header: str, bayut_sections: List[dict], min_score: float = HEADER_MATCH_MIN_SCORE) -> Optional[dict]:
-    best = None
-    best_score = 0.0
-    for b in bayut_sections:
-        sc = header_similarity(comp_header, b["header"])
-        if sc > best_score:
-            best_score = sc
-            best = b
-    if best and best_score >= min_score:
-        return {"bayut_section": best, "score": best_score}
-    if not best:
+
+def _similarity_upper_bound(fa: HeaderFeatures, fb: HeaderFeatures) -> float:
+    """Cheap bound >= _similarity_from_features: SequenceMatcher ratios are capped by 2*min(len)/sum(len)."""
+    if not fa.norm or not fb.norm:
+        return 0.0
+    a_set, b_set = fa.words, fb.words
+    jacc = len(a_set & b_set) / max(len(a_set | b_set), 1) if a_set and b_set else 0.0
+    la, lb = len(fa.norm), len(fb.norm)
+    bound = (0.55 * (2.0 * min(la, lb) / (la + lb))) + (0.45 * jacc)
+    if fa.core and fb.core:
+        core_jacc = len(fa.core & fb.core) / max(len(fa.core | fb.core), 1)
+        lca, lcb = len(fa.core_joined), len(fb.core_joined)
+        core_seq = 2.0 * min(lca, lcb) / (lca + lcb) if (lca + lcb) else 1.0
+        bound = max(bound, (0.60 * core_seq) + (0.40 * core_jacc))
+        smallest = min(len(fa.core), len(fb.core))
+        if 2 <= smallest <= 3 and (fa.core.issubset(fb.core) or fb.core.issubset(fa.core)):
+            bound = max(bound, 0.84)
+    return bound + 1e-9
+
+
+# Without a shared word or core token, jacc = core_jacc = 0 and no subset bonus,
+# so the score is at most max(0.55, 0.60) * 1.0.
+_NO_OVERLAP_MAX_SCORE = 0.60 + 1e-9
+
+
+def header_similarity(a: str, b: str) -> float:
+    return _similarity_from_features(header_features(a), header_features(b))
+
+
+class HeaderIndex:
+    """
+    Bayut section headers prepared once for repeated matching against competitor headers.
+    - features (normalized header, word/core token sets, polarity) precomputed per section
+    - inverted index on words and core tokens: above a 0.60 floor, only sections sharing a
+      token with the query can qualify
+    - candidates are visited by descending score upper bound, so SequenceMatcher only runs
+      where it could still change the answer
+    Results are identical to scoring every section with header_similarity.
+    """
+
+    def __init__(self, sections: List[dict]):
+        self.sections = list(sections or [])
+        self.features = [header_features(s.get("header", "")) for s in self.sections]
+        self._postings: Dict[tuple, List[int]] = {}
+        for i, f in enumerate(self.features):
+            for w in f.words:
+                self._postings.setdefault(("w", w), []).append(i)
+            for c in f.core:
+                self._postings.setdefault(("c", c), []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.sections)
+
+    def _bounded_candidates(self, fq: HeaderFeatures, floor: float) -> List[Tuple[float, int]]:
+        if floor > _NO_OVERLAP_MAX_SCORE:
+            idx = set()
+            for w in fq.words:
+                idx.update(self._postings.get(("w", w), ()))
+            for c in fq.core:
+                idx.update(self._postings.get(("c", c), ()))
+        else:
+            idx = range(len(self.features))
+        out = []
+        for i in idx:
+            ub = _similarity_upper_bound(fq, self.features[i])
+            if ub >= floor:
+                out.append((ub, i))
+        out.sort(key=lambda x: (-x[0], x[1]))
+        return out
+
+    def best(self, header: str, floor: float = 0.0) -> Tuple[Optional[int], float]:
+        """(index, score) of the first highest-scoring section, ignoring sections that cannot reach `floor`."""
+        fq = header_features(header)
+        best_i, best_score = None, 0.0
+        for ub, i in self._bounded_candidates(fq, floor):
+            if ub < best_score:
+                break
+            sc = _similarity_from_features(fq, self.features[i])
+            if sc > best_score or (sc == best_score and best_i is not None and i < best_i):
+                best_i, best_score = i, sc
+        return best_i, best_score
+
+    def any_at_least(self, header: str, threshold: float) -> bool:
+        fq = header_features(header)
+        for _, i in self._bounded_candidates(fq, threshold):
+            if _similarity_from_features(fq, self.features[i]) >= threshold:
+                return True
+        return False
+
+
+def find_best_bayut_match(
+    comp_header: str,
+    bayut_sections: Union[List[dict], HeaderIndex],
+    min_score: float = HEADER_MATCH_MIN_SCORE,
+) -> Optional[dict]:
+    index = bayut_sections if isinstance(bayut_sections, HeaderIndex) else HeaderIndex(bayut_sections)
+    # Anything below both thresholds can only lead to None, so it need not be scored.
+    i, best_score = index.best(comp_header, floor=min(min_score, SIMILAR_HEADER_MATCH_FALLBACK))
+    if i is None:
         return None
+    best = index.sections[i]
+    if best_score >= min_score:
+        return {"bayut_section": best, "score": best_score}
 
     # Smart fallback: allow semantic token overlap when wording differs.
     comp_core = set(_header_core_tokens(comp_header))
-    best_core = set(_header_core_tokens(best.get("header", "")))
+    best_core = set(index.features[i].core)
     if comp_core and best_core:
         overlap = len(comp_core & best_core) / max(min(len(comp_core), len(best_core)), 1)
         if overlap >= 0.67 and best_score >= SIMILAR_HEADER_MATCH_FALLBACK:
@@ -2578,8 +4648,8 @@ def _important_point_covered(point_label: str, text: str) -> bool:
 def _missing_content_points(
     comp_header: str,
     comp_text: str,
-    bayut_text: str,
-    bayut_global_text: str,
+    bayut_text: CoverageText,
+    bayut_global_text: CoverageText,
     comp_children: Optional[List[str]] = None,
     bayut_children: Optional[List[str]] = None,
     limit: int = MAX_CONTENT_GAP_ITEMS,
@@ -2590,8 +4660,8 @@ def _missing_content_points(
 
     out: List[str] = []
     seen = set()
-    bayut_local = clean(bayut_text or "")
-    bayut_global = clean(bayut_global_text or "")
+    bayut_local = as_coverage_index(bayut_text)
+    bayut_global = as_coverage_index(bayut_global_text)
     bayut_child_objs = [{"header": h} for h in (bayut_children or []) if clean(h)]
 
     for point in comp_points:
@@ -2753,7 +4823,10 @@ def update_mode_rows_header_first(
 
     bayut_children_map = children_map(bayut_child_sections)
     comp_children_map = children_map(comp_children_all)
-    bayut_global_text = _coverage_corpus(bayut_fr, bayut_nodes)
+    bayut_coverage = get_coverage_index(bayut_fr, bayut_nodes)
+    bayut_h2_index = HeaderIndex(bayut_h2)
+    bayut_children_index = HeaderIndex(bayut_child_sections + bayut_h2)
+    bayut_sections_index = HeaderIndex(bayut_h2 + bayut_child_sections)
 
     for cs in comp_h2:
         comp_header = cs.get("header", "")
@@ -2765,12 +4838,12 @@ def update_mode_rows_header_first(
         ]
         comp_text = combined_h2_content(comp_header, comp_h2, comp_children_map) or cs.get("content", "")
 
-        m = find_best_bayut_match(comp_header, bayut_h2, min_score=HEADER_MATCH_MIN_SCORE)
+        m = find_best_bayut_match(comp_header, bayut_h2_index, min_score=HEADER_MATCH_MIN_SCORE)
         if not m:
             if HIGH_PRECISION_MODE and _topic_is_covered(
                 comp_header,
-                bayut_h2 + bayut_child_sections,
-                bayut_global_text,
+                bayut_sections_index,
+                bayut_coverage,
                 min_header_score=HEADER_MATCH_MIN_SCORE,
                 min_text_coverage=MISSING_HEADER_MIN_TEXT_COVERAGE,
             ):
@@ -2789,7 +4862,7 @@ def update_mode_rows_header_first(
             comp_header,
             comp_text,
             bayut_text,
-            bayut_global_text,
+            bayut_coverage,
             comp_children=comp_children,
             bayut_children=bayut_child_headers,
             limit=MAX_CONTENT_GAP_ITEMS,
@@ -2817,13 +4890,13 @@ def update_mode_rows_header_first(
         parent = cs.get("parent_h2") or ""
         if parent and norm_header(parent) in comp_h2_norms:
             continue
-        m = find_best_bayut_match(ch, bayut_child_sections + bayut_h2, min_score=HEADER_MATCH_MIN_SCORE)
+        m = find_best_bayut_match(ch, bayut_children_index, min_score=HEADER_MATCH_MIN_SCORE)
         if m:
             continue
         if HIGH_PRECISION_MODE and _topic_is_covered(
             ch,
-            bayut_child_sections + bayut_h2,
-            bayut_global_text,
+            bayut_children_index,
+            bayut_coverage,
             min_header_score=HEADER_MATCH_MIN_SCORE,
             min_text_coverage=MISSING_SUBTOPIC_MIN_TEXT_COVERAGE,
         ):
@@ -2890,6 +4963,7 @@ DATAFORSEO_LOCATION_NAME = _env_or_secret("DATAFORSEO_LOCATION_NAME", "United Ar
 DATAFORSEO_LANGUAGE_CODE = _env_or_secret("DATAFORSEO_LANGUAGE_CODE", "en")
 DATAFORSEO_SE_DOMAIN = _env_or_secret("DATAFORSEO_SE_DOMAIN", "google.ae")
 DATAFORSEO_DEPTH = int(_env_or_secret("DATAFORSEO_DEPTH", 50))
+DATAFORSEO_API_BASE = (_env_or_secret("DATAFORSEO_API_BASE", "https://api.dataforseo.com") or "").rstrip("/")
 
 def url_slug(url: str) -> str:
     try:
@@ -2898,38 +4972,32 @@ def url_slug(url: str) -> str:
     except Exception:
         return "/"
 
-def extract_head_seo(html: str) -> Tuple[str, str]:
+def extract_head_seo(html: PageLike) -> Tuple[str, str]:
     if not html:
         return ("Not available", "Not available")
-    soup = BeautifulSoup(html, "html.parser")
+    page = as_parsed_page(html)
 
-    title = ""
-    t = soup.find("title")
-    if t:
-        title = clean(t.get_text(" "))
+    title = page.title
 
     desc = ""
-    md = soup.find("meta", attrs={"name": re.compile("^description$", re.I)})
+    md = page.find_meta("name", re.compile("^description$", re.I))
     if md and md.get("content"):
         desc = clean(md.get("content"))
 
     return (title or "Not available", desc or "Not available")
 
-def is_mobile_friendly(html: str) -> str:
+def is_mobile_friendly(html: PageLike) -> str:
     if not html:
         return "No"
-    soup = BeautifulSoup(html, "html.parser")
-    meta = soup.find("meta", attrs={"name": re.compile("^viewport$", re.I)})
+    meta = as_parsed_page(html).find_meta("name", re.compile("^viewport$", re.I))
     if meta and meta.get("content"):
         return "Yes"
     return "No"
 
-def extract_media_used(html: str) -> str:
+def extract_media_used(html: PageLike) -> str:
     if not html:
         return "Not available"
-    soup = BeautifulSoup(html, "html.parser")
-    for t in soup.find_all(list(IGNORE_TAGS)):
-        t.decompose()
+    soup = as_parsed_page(html).pruned()
     root = soup.find("article") or soup
 
     imgs = len(root.find_all("img"))
@@ -3013,14 +5081,14 @@ def _safe_tag_attr(el, key: str):
         return None
     return None
 
-def _remove_noncontent_elements(soup: BeautifulSoup) -> None:
+def _remove_noncontent_elements(soup: bs4.BeautifulSoup) -> None:
     for el in soup.find_all(True):
         cls = " ".join(_safe_tag_attr(el, "class") or []).lower()
         el_id = (_safe_tag_attr(el, "id") or "").lower()
         if any(tok in cls or tok in el_id for tok in NONCONTENT_TOKENS):
             el.decompose()
 
-def _find_content_root(soup: BeautifulSoup):
+def _find_content_root(soup: bs4.BeautifulSoup):
     candidates = []
     for tag in soup.find_all(attrs={"itemprop": re.compile(r"articleBody", re.I)}):
         candidates.append(tag)
@@ -3064,14 +5132,10 @@ def _looks_like_heading_line(line: str) -> bool:
         return True
     return False
 
-def content_text_from_html(html: str, include_headings: bool = False) -> str:
+def content_text_from_html(html: PageLike, include_headings: bool = False) -> str:
     if not html:
         return ""
-    soup = BeautifulSoup(html, "html.parser")
-    for t in soup.find_all(list(IGNORE_TAGS) + list(LIST_TAGS)):
-        t.decompose()
-    _remove_noncontent_elements(soup)
-    root = _find_content_root(soup)
+    root = as_parsed_page(html).text_root
     chunks = []
     tags = ["p"]
     if include_headings:
@@ -3186,38 +5250,38 @@ def domain_of(url: str) -> str:
     except Exception:
         return ""
 
-def _extract_canonical_and_robots(html: str) -> Tuple[str, str]:
+def _extract_canonical_and_robots(html: PageLike) -> Tuple[str, str]:
     if not html:
         return ("Not available", "Not available")
 
-    soup = BeautifulSoup(html, "html.parser")
+    page = as_parsed_page(html)
 
     canonical = ""
-    can = soup.find("link", attrs={"rel": "canonical"})
+    can = page.soup.find("link", attrs={"rel": "canonical"})
     if can and can.get("href"):
         canonical = clean(can.get("href"))
 
     robots = ""
-    mr = soup.find("meta", attrs={"name": re.compile("^robots$", re.I)})
+    mr = page.find_meta("name", re.compile("^robots$", re.I))
     if mr and mr.get("content"):
         robots = clean(mr.get("content"))
 
     return (canonical or "Not available", robots or "Not available")
 
-def _extract_lang(html: str) -> str:
+def _extract_lang(html: PageLike) -> str:
     if not html:
         return "Not available"
-    soup = BeautifulSoup(html, "html.parser")
-    html_tag = soup.find("html")
+    page = as_parsed_page(html)
+    html_tag = page.soup.find("html")
     if html_tag and html_tag.get("lang"):
         return clean(html_tag.get("lang"))
-    meta = soup.find("meta", attrs={"http-equiv": re.compile("content-language", re.I)})
+    meta = page.find_meta("http-equiv", re.compile("content-language", re.I))
     if meta and meta.get("content"):
         return clean(meta.get("content"))
-    meta = soup.find("meta", attrs={"name": re.compile("^language$", re.I)})
+    meta = page.find_meta("name", re.compile("^language$", re.I))
     if meta and meta.get("content"):
         return clean(meta.get("content"))
-    meta = soup.find("meta", attrs={"property": re.compile("og:locale", re.I)})
+    meta = page.find_meta("property", re.compile("og:locale", re.I))
     if meta and meta.get("content"):
         return clean(meta.get("content"))
     return "Not available"
@@ -3248,17 +5312,18 @@ def _jsonld_find_name(data, key: str) -> str:
                 return out
     return ""
 
-def _extract_author_publisher(html: str) -> Tuple[str, str]:
+def _extract_author_publisher(html: PageLike) -> Tuple[str, str]:
     if not html:
         return ("Not available", "Not available")
-    soup = BeautifulSoup(html, "html.parser")
+    page = as_parsed_page(html)
+    soup = page.soup
     author = ""
     publisher = ""
-    a = soup.find("meta", attrs={"name": re.compile("^author$", re.I)})
+    a = page.find_meta("name", re.compile("^author$", re.I))
     if a and a.get("content"):
         author = clean(a.get("content"))
     if not author:
-        a = soup.find("meta", attrs={"property": re.compile("article:author", re.I)})
+        a = page.find_meta("property", re.compile("article:author", re.I))
         if a and a.get("content"):
             author = clean(a.get("content"))
     if not author:
@@ -3266,11 +5331,11 @@ def _extract_author_publisher(html: str) -> Tuple[str, str]:
         if a and a.get("content"):
             author = clean(a.get("content"))
 
-    p = soup.find("meta", attrs={"name": re.compile("^publisher$", re.I)})
+    p = page.find_meta("name", re.compile("^publisher$", re.I))
     if p and p.get("content"):
         publisher = clean(p.get("content"))
     if not publisher:
-        p = soup.find("meta", attrs={"property": re.compile("article:publisher", re.I)})
+        p = page.find_meta("property", re.compile("article:publisher", re.I))
         if p and p.get("content"):
             publisher = clean(p.get("content"))
     if not publisher:
@@ -3278,60 +5343,41 @@ def _extract_author_publisher(html: str) -> Tuple[str, str]:
         if p and p.get("content"):
             publisher = clean(p.get("content"))
 
-    scripts = soup.find_all("script", attrs={"type": re.compile(r"ld\+json", re.I)})
-    for s in scripts:
-        raw = (s.string or s.get_text(" ") or "").strip()
-        if not raw:
-            continue
-        try:
-            data = json.loads(raw)
-        except Exception:
-            continue
-        if not author:
-            author = _jsonld_find_name(data, "author")
-        if not publisher:
-            publisher = _jsonld_find_name(data, "publisher")
-        if author and publisher:
-            break
+    if not author:
+        author = page.schema.author
+    if not publisher:
+        publisher = page.schema.publisher
 
     return (author or "Not available", publisher or "Not available")
 
-def _count_images(html: str) -> int:
+def _count_images(html: PageLike) -> int:
     if not html:
         return 0
-    soup = BeautifulSoup(html, "html.parser")
-    return len(soup.find_all("img"))
+    return len(as_parsed_page(html).images)
 
-def _count_headers(html: str) -> str:
+def _count_headers(html: PageLike) -> str:
     if not html:
         return "H1:0 / H2:0 / H3:0 / Total:0"
-    soup = BeautifulSoup(html, "html.parser")
-    for t in soup.find_all(list(IGNORE_TAGS)):
-        t.decompose()
-    h1 = len(soup.find_all("h1"))
-    h2 = len(soup.find_all("h2"))
-    h3 = len(soup.find_all("h3"))
+    counts = as_parsed_page(html).heading_counts
+    h1, h2, h3 = counts["h1"], counts["h2"], counts["h3"]
     total = h1 + h2 + h3
     return f"H1:{h1} / H2:{h2} / H3:{h3} / Total:{total}"
 
-def _heading_counts(nodes: List[dict], html: str) -> Dict[int, int]:
+def _heading_counts(nodes: List[dict], html: PageLike) -> Dict[int, int]:
+    page = as_parsed_page(html)
+    html = page.html
     counts = {i: 0 for i in range(1, 7)}
     used = False
     h1_exists = False
     if html and "<h1" in html.lower():
         try:
-            soup_full = BeautifulSoup(html, "html.parser")
-            h1_tag = soup_full.find("h1")
+            h1_tag = page.first_h1
             if h1_tag and clean(h1_tag.get_text(" ")):
                 h1_exists = True
         except Exception:
             h1_exists = False
     if html and "<h" in html.lower():
-        soup = BeautifulSoup(html, "html.parser")
-        for t in soup.find_all(list(IGNORE_TAGS)):
-            t.decompose()
-        _remove_noncontent_elements(soup)
-        root = _find_content_root(soup)
+        root = page.content_root
         for tag in root.find_all(["h1", "h2", "h3", "h4", "h5", "h6"]):
             counts[int(tag.name[1])] += 1
         used = True
@@ -3351,22 +5397,19 @@ def _heading_counts(nodes: List[dict], html: str) -> Dict[int, int]:
         counts[1] = 1
     return counts
 
-def _heading_structure_label(nodes: List[dict], html: str) -> str:
+def _heading_structure_label(nodes: List[dict], html: PageLike) -> str:
+    page = as_parsed_page(html)
+    html = page.html
     levels: List[int] = []
     h1_fallback = False
     html_levels: List[int] = []
     if html and "<h" in html.lower():
-        soup = BeautifulSoup(html, "html.parser")
-        for t in soup.find_all(list(IGNORE_TAGS)):
-            t.decompose()
-        _remove_noncontent_elements(soup)
-        root = _find_content_root(soup)
+        root = page.content_root
         for tag in root.find_all(["h1", "h2", "h3", "h4", "h5", "h6"]):
             html_levels.append(int(tag.name[1]))
         if 1 not in html_levels:
             try:
-                soup_full = BeautifulSoup(html, "html.parser")
-                h1_tag = soup_full.find("h1")
+                h1_tag = page.first_h1
                 if h1_tag and clean(h1_tag.get_text(" ")):
                     h1_fallback = True
             except Exception:
@@ -3391,7 +5434,7 @@ def _heading_structure_label(nodes: List[dict], html: str) -> str:
     if levels and 1 not in levels and h1_fallback:
         levels = [1] + levels
 
-    counts = _heading_counts(nodes, html)
+    counts = _heading_counts(nodes, page)
     if sum(counts.values()) == 0 and nodes:
         for x in flatten(nodes):
             lvl = x.get("level")
@@ -3411,15 +5454,11 @@ def _heading_structure_label(nodes: List[dict], html: str) -> str:
 
 from urllib.parse import urljoin
 
-def _count_external_links(html: str, page_url: str) -> int:
+def _count_external_links(html: PageLike, page_url: str) -> int:
     if not html:
         return 0
 
-    soup = BeautifulSoup(html, "html.parser")
-    for t in soup.find_all(list(IGNORE_TAGS)):
-        t.decompose()
-    _remove_noncontent_elements(soup)
-    root = _find_content_root(soup)
+    root = as_parsed_page(html).content_root
 
     external = 0
     base_dom = domain_of(page_url)
@@ -3445,49 +5484,24 @@ def _count_external_links(html: str, page_url: str) -> int:
 
     return external
 
-def _schema_present(html: str) -> str:
+def _schema_present(html: PageLike) -> str:
     if not html:
         return "None detected"
-    soup = BeautifulSoup(html, "html.parser")
-    scripts = soup.find_all("script", attrs={"type": re.compile(r"ld\+json", re.I)})
-    types = set()
-    for s in scripts:
-        raw = (s.string or "").strip()
-        if not raw:
-            continue
-        try:
-            j = json.loads(raw)
-        except Exception:
-            continue
-
-        def walk(x):
-            if isinstance(x, dict):
-                t = x.get("@type") or x.get("type")
-                if t:
-                    if isinstance(t, list):
-                        for z in t:
-                            types.add(str(z))
-                    else:
-                        types.add(str(t))
-                for v in x.values():
-                    walk(v)
-            elif isinstance(x, list):
-                for v in x:
-                    walk(v)
-        walk(j)
+    types = as_parsed_page(html).schema.schema_types
     return ", ".join(sorted(types)) if types else "None detected"
 
 def seo_row_for_page_extended(label: str, url: str, fr: FetchResult, nodes: List[dict], manual_fkw: str = "") -> dict:
-    seo_title, meta_desc = extract_head_seo(fr.html or "")
+    page = get_page_from_fetchresult(fr)
+    seo_title, meta_desc = extract_head_seo(page)
     slug = url_slug(url) if url and url != "Not applicable" else "Not applicable"
     h_blob = headings_blob(nodes)
-    h_counts = _heading_structure_label(nodes, fr.html or fr.text or "")
+    h_counts = _heading_structure_label(nodes, page if fr.html else (fr.text or ""))
     fkw = pick_fkw_only(seo_title, get_first_h1(nodes), h_blob, fr.text or "", manual_fkw=manual_fkw)
     kw_usage = kw_usage_summary(seo_title, get_first_h1(nodes), h_blob, fr.text or "", fkw)
-    outbound_links_count = _count_external_links(fr.html or "", url or "")
-    media = extract_media_used(fr.html or "")
-    schema = _schema_present(fr.html or "")
-    mobile_friendly = is_mobile_friendly(fr.html or "")
+    outbound_links_count = _count_external_links(page, url or "")
+    media = extract_media_used(page)
+    schema = _schema_present(page)
+    mobile_friendly = is_mobile_friendly(page)
 
     return {
         "Page": label,
@@ -3505,6 +5519,25 @@ def seo_row_for_page_extended(label: str, url: str, fr: FetchResult, nodes: List
         "__url": url,
     }
 
+def _seo_row_stored(store: Optional[ArtifactStore], label: str, url: str, fr: FetchResult, nodes: List[dict], manual_fkw: str) -> dict:
+    def build() -> dict:
+        return seo_row_for_page_extended(label, url, fr, nodes, manual_fkw=manual_fkw)
+    if store is None:
+        return build()
+    return dict(store.memo(url, "seo_rows", (label, manual_fkw), build))
+
+def _seo_rows_stored(store: Optional[ArtifactStore], pages: List[Tuple[str, str, FetchResult, List[dict]]], manual_fkw: str) -> List[dict]:
+    """_seo_row_stored for (label, url, fr, nodes) pages; misses are built on the analysis pool."""
+    def build(indexes: List[int]) -> List[dict]:
+        return run_page_tasks(_seo_row_task, [
+            (pages[i][0], PagePayload.of(pages[i][1], pages[i][2], pages[i][3]), manual_fkw) for i in indexes
+        ])
+    if store is None:
+        return build(list(range(len(pages))))
+    rows = store.memo_many("seo_rows", [(url, (label, manual_fkw)) for label, url, _, _ in pages], build)
+    return [dict(r) for r in rows]
+
+@traced("stage")
 def build_seo_analysis_update(
     bayut_url: str,
     bayut_fr: FetchResult,
@@ -3512,14 +5545,13 @@ def build_seo_analysis_update(
     competitors: List[str],
     comp_fr_map: Dict[str, FetchResult],
     comp_tree_map: Dict[str, dict],
-    manual_fkw: str = ""
+    manual_fkw: str = "",
+    store: Optional[ArtifactStore] = None
 ) -> pd.DataFrame:
-    rows = []
-    rows.append(seo_row_for_page_extended("Bayut", bayut_url, bayut_fr, bayut_nodes, manual_fkw=manual_fkw))
+    pages = [("Bayut", bayut_url, bayut_fr, bayut_nodes)]
     for cu in competitors:
-        fr = comp_fr_map.get(cu)
-        nodes = (comp_tree_map.get(cu) or {}).get("nodes", [])
-        rows.append(seo_row_for_page_extended(site_name(cu), cu, fr, nodes, manual_fkw=manual_fkw))
+        pages.append((site_name(cu), cu, comp_fr_map.get(cu), (comp_tree_map.get(cu) or {}).get("nodes", [])))
+    rows = _seo_rows_stored(store, pages, manual_fkw)
     df = pd.DataFrame(rows)
     cols = [
         "Page","UAE Rank (Mobile)","Mobile Friendly","SEO Title","Meta Description","URL Slug",
@@ -3532,18 +5564,17 @@ def build_seo_analysis_update(
             df[c] = ""
     return df[cols]
 
+@traced("stage")
 def build_seo_analysis_newpost(
     new_title: str,
     competitors: List[str],
     comp_fr_map: Dict[str, FetchResult],
     comp_tree_map: Dict[str, dict],
-    manual_fkw: str = ""
+    manual_fkw: str = "",
+    store: Optional[ArtifactStore] = None
 ) -> pd.DataFrame:
-    rows = []
-    for cu in competitors:
-        fr = comp_fr_map.get(cu)
-        nodes = (comp_tree_map.get(cu) or {}).get("nodes", [])
-        rows.append(seo_row_for_page_extended(site_name(cu), cu, fr, nodes, manual_fkw=manual_fkw))
+    pages = [(site_name(cu), cu, comp_fr_map.get(cu), (comp_tree_map.get(cu) or {}).get("nodes", [])) for cu in competitors]
+    rows = _seo_rows_stored(store, pages, manual_fkw)
     df = pd.DataFrame(rows)
     cols = [
         "Page","UAE Rank (Mobile)","Mobile Friendly","SEO Title","Meta Description","URL Slug",
@@ -3556,6 +5587,198 @@ def build_seo_analysis_newpost(
             df[c] = ""
     return df[cols]
 
+# =====================================================
+# SERP RESPONSE CACHE (PERSISTENT, SHARED ACROSS SESSIONS)
+# =====================================================
+# Paid SERP calls are cached in SQLite so restarts, sessions and processes sharing the
+# file reuse them. SERP_CACHE_PATH="" keeps the cache in memory for this process only.
+# SERP_CACHE_MODE: "live" (default), or "replay" to serve cached responses regardless of
+# age and never call a provider (offline runs / tests).
+SERP_CACHE_PATH = os.getenv(
+    "SERP_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "serp_cache.sqlite"),
+)
+SERP_CACHE_TTL = int(os.getenv("SERP_CACHE_TTL", str(6 * 3600)))
+SERP_CACHE_MAX_BYTES = int(os.getenv("SERP_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+SERP_CACHE_MODE = os.getenv("SERP_CACHE_MODE", "live").strip().lower()
+
+
+def normalize_serp_query(query: str) -> str:
+    """Case/whitespace-insensitive cache key for a search query."""
+    return " ".join(unicodedata.normalize("NFKC", query or "").lower().split())
+
+
+class SerpCache:
+    """
+    Persistent SERP response cache (SQLite).
+    - keyed by (provider, normalized query, device, location)
+    - responses stored as zlib-compressed JSON; error responses are never stored
+    - entries older than `ttl` are misses (except in replay mode)
+    - least-recently-used entries are evicted once responses exceed `max_bytes`
+    """
+
+    def __init__(self, path: str, ttl: int = SERP_CACHE_TTL, max_bytes: int = SERP_CACHE_MAX_BYTES,
+                 mode: str = SERP_CACHE_MODE):
+        self.path = path
+        self.ttl = int(ttl)
+        self.max_bytes = int(max_bytes)
+        self.replay = mode == "replay"
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "writes": 0, "evicted": 0}
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS serp ("
+                " provider TEXT NOT NULL, query TEXT NOT NULL, device TEXT NOT NULL, location TEXT NOT NULL,"
+                " data BLOB, size INTEGER, fetched_at REAL, accessed_at REAL,"
+                " PRIMARY KEY (provider, query, device, location))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS serp_accessed ON serp(accessed_at)")
+            self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM serp").fetchone()[0]
+
+    def get(self, provider: str, query: str, device: str, location: str) -> Optional[dict]:
+        key = (provider, normalize_serp_query(query), device, location)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data, fetched_at FROM serp WHERE provider = ? AND query = ? AND device = ? AND location = ?", key
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            if not self.replay and time.time() - (row[1] or 0) >= self.ttl:
+                self.stats["expired"] += 1
+                return None
+            self.stats["hits"] += 1
+            with self._db:
+                self._db.execute(
+                    "UPDATE serp SET accessed_at = ? WHERE provider = ? AND query = ? AND device = ? AND location = ?",
+                    (time.time(),) + key,
+                )
+        return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+
+    def put(self, provider: str, query: str, device: str, location: str, data: dict):
+        if not isinstance(data, dict) or data.get("_error"):
+            return
+        blob = zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"), 6)
+        key = (provider, normalize_serp_query(query), device, location)
+        now = time.time()
+        with self._lock, self._db:
+            old = self._db.execute(
+                "SELECT size FROM serp WHERE provider = ? AND query = ? AND device = ? AND location = ?", key
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO serp (provider, query, device, location, data, size, fetched_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                key + (blob, len(blob), now, now),
+            )
+            self._bytes += len(blob) - (old[0] if old else 0)
+            self.stats["writes"] += 1
+            self._evict()
+
+    def _evict(self):
+        if self._bytes <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        while self._bytes > target:
+            rows = self._db.execute(
+                "SELECT provider, query, device, location, size FROM serp ORDER BY accessed_at ASC LIMIT 32"
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            for row in rows:  # oldest first, and no more than it takes to reach the target
+                victims.append(row[:4])
+                self._bytes -= row[4]
+                if self._bytes <= target:
+                    break
+            self._db.executemany(
+                "DELETE FROM serp WHERE provider = ? AND query = ? AND device = ? AND location = ?", victims
+            )
+            self.stats["evicted"] += len(victims)
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM serp")
+            self._bytes = 0
+
+
+@st.cache_resource(show_spinner=False)
+def get_serp_cache() -> SerpCache:
+    try:
+        return SerpCache(SERP_CACHE_PATH or ":memory:")
+    except Exception:
+        return SerpCache(":memory:")
+
+
+def serp_cached_call(provider: str, query: str, device: str, location: str, fetch) -> dict:
+    """Serve a SERP response from the cache, calling `fetch()` (the paid API) only on a miss."""
+    cache = get_serp_cache()
+    with trace_span(f"serp.{provider}", "serp", query=query, device=device) as span:
+        data = cache.get(provider, query, device, location)
+        if data is not None:
+            span["cache"] = "hit"
+            return data
+        if cache.replay:
+            span.update(cache="replay_miss", error="serp_replay_miss")
+            return {"_error": "serp_replay_miss"}
+        span["cache"] = "miss"
+        data = fetch()
+        if isinstance(data, dict) and data.get("_error"):
+            span["error"] = data["_error"]
+        cache.put(provider, query, device, location, data)
+        return data
+
+
+class SerpCostLedger:
+    """Paid SERP requests made by this process, one row per call (cache hits cost nothing and are not recorded)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.entries: List[dict] = []
+
+    def record(self, provider: str, mode: str, query: str, device: str, cost, seconds: float,
+               status: str = "ok", task_id: str = "") -> None:
+        row = {
+            "Provider": provider, "Mode": mode, "Query": query, "Device": device,
+            "Cost (USD)": float(cost) if isinstance(cost, (int, float)) else None,
+            "Seconds": round(float(seconds), 2), "Status": status, "Task ID": task_id,
+        }
+        with self._lock:
+            self.entries.append(row)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def report(self, since: int = 0) -> pd.DataFrame:
+        cols = ["Provider", "Mode", "Query", "Device", "Cost (USD)", "Seconds", "Status", "Task ID"]
+        with self._lock:
+            rows = list(self.entries[since:])
+        return pd.DataFrame(rows, columns=cols)
+
+    def totals(self, since: int = 0) -> dict:
+        with self._lock:
+            rows = list(self.entries[since:])
+        out: Dict[str, dict] = {}
+        for r in rows:
+            t = out.setdefault(f"{r['Provider']}/{r['Mode']}", {"calls": 0, "cost": 0.0})
+            t["calls"] += 1
+            t["cost"] = round(t["cost"] + (r["Cost (USD)"] or 0.0), 6)
+        return out
+
+
+@st.cache_resource(show_spinner=False)
+def get_serp_cost_ledger() -> SerpCostLedger:
+    return SerpCostLedger()
+
+
+def _dataforseo_location_key() -> str:
+    loc = DATAFORSEO_LOCATION_CODE or DATAFORSEO_LOCATION_NAME or ""
+    return f"{loc}|{DATAFORSEO_LANGUAGE_CODE}|{DATAFORSEO_SE_DOMAIN}|{DATAFORSEO_DEPTH}"
+
+
 def _dataforseo_task_payload(query: str, device: str) -> dict:
     payload = {
         "keyword": query,
@@ -3575,16 +5798,20 @@ def _dataforseo_task_payload(query: str, device: str) -> dict:
         payload["location_name"] = DATAFORSEO_LOCATION_NAME
     return payload
 
-@st.cache_data(show_spinner=False, ttl=1800)
 def dataforseo_serp_cached(query: str, device: str = "mobile") -> dict:
     if not query:
         return {"_error": "missing_query"}
+    return serp_cached_call("dataforseo", query, device, _dataforseo_location_key(),
+                            lambda: _dataforseo_serp_live(query, device))
+
+def _dataforseo_serp_live(query: str, device: str) -> dict:
     if not DATAFORSEO_LOGIN or not DATAFORSEO_PASSWORD:
         return {"_error": "missing_dataforseo_credentials"}
     payload = [_dataforseo_task_payload(query, device)]
+    t0 = time.monotonic()
     try:
-        r = requests.post(
-            "https://api.dataforseo.com/v3/serp/google/organic/live/advanced",
+        r = get_http_session().post(
+            f"{DATAFORSEO_API_BASE}/v3/serp/google/organic/live/advanced",
             json=payload,
             auth=(DATAFORSEO_LOGIN, DATAFORSEO_PASSWORD),
             timeout=40,
@@ -3597,6 +5824,8 @@ def dataforseo_serp_cached(query: str, device: str = "mobile") -> dict:
 
     if isinstance(data, dict) and data.get("status_code") not in (20000, None):
         return {"_error": data.get("status_message", "dataforseo_error")}
+    if isinstance(data, dict):
+        get_serp_cost_ledger().record("dataforseo", "live", query, device, data.get("cost"), time.monotonic() - t0)
     return data
 
 def _dataforseo_rank_map(data: dict) -> Dict[str, int]:
@@ -3622,7 +5851,9 @@ def _dataforseo_rank_map(data: dict) -> Dict[str, int]:
                     rank_map[norm] = int(rank)
     return rank_map
 
-def enrich_seo_df_with_rank_and_ai(seo_df: pd.DataFrame, manual_query: str = "") -> Tuple[pd.DataFrame, pd.DataFrame]:
+@traced("stage")
+def enrich_seo_df_with_rank_and_ai(seo_df: pd.DataFrame, manual_query: str = "",
+                                   serp: Optional[SerpPlanner] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
     ai_df = pd.DataFrame(columns=["Note"])
     if seo_df is None or seo_df.empty:
         return seo_df, ai_df
@@ -3635,7 +5866,7 @@ def enrich_seo_df_with_rank_and_ai(seo_df: pd.DataFrame, manual_query: str = "")
                 break
 
     if query:
-        data = dataforseo_serp_cached(query, device="mobile")
+        data = _serp_fetch(serp, "dataforseo", query, "mobile")
         if isinstance(data, dict) and data.get("_error"):
             seo_df = seo_df.copy()
             seo_df["UAE Rank (Mobile)"] = f"Not available ({data.get('_error')})"
@@ -3659,6 +5890,162 @@ def enrich_seo_df_with_rank_and_ai(seo_df: pd.DataFrame, manual_query: str = "")
     return seo_df, ai_df
 
 
+# =====================================================
+# DATAFORSEO STANDARD QUEUE (BULK SERP)
+# =====================================================
+# The live endpoint answers one keyword per request at the highest price. The standard
+# queue takes up to 100 keywords per task_post call at the queue rate; finished tasks are
+# listed by tasks_ready and collected with task_get. Collected responses have the live
+# shape and are written to the SERP cache, so the rank column and AI visibility table
+# read them as ordinary cache hits.
+DATAFORSEO_TASK_BATCH = 100  # tasks per task_post call (API limit)
+DATAFORSEO_TASK_PRIORITY = int(os.getenv("DATAFORSEO_TASK_PRIORITY", "1"))  # 1 normal, 2 high
+DATAFORSEO_POLL_INTERVAL = float(os.getenv("DATAFORSEO_POLL_INTERVAL", "10"))
+DATAFORSEO_TASK_TIMEOUT = float(os.getenv("DATAFORSEO_TASK_TIMEOUT", "1800"))
+
+class DataForSeoTaskClient:
+    """
+    Bulk SERP client for the standard API (task_post / tasks_ready / task_get/advanced).
+    - (query, device) pairs already in the SERP cache are not posted
+    - the rest are posted in batches of DATAFORSEO_TASK_BATCH, tagged so each task maps back
+    - tasks_ready is polled until every task is collected or `timeout` passes
+    - each task's cost (billed at task_post) is recorded in the SERP cost ledger
+    """
+
+    def __init__(self, login: Optional[str] = None, password: Optional[str] = None, base_url: Optional[str] = None,
+                 session=None, priority: int = DATAFORSEO_TASK_PRIORITY, poll_interval: float = DATAFORSEO_POLL_INTERVAL,
+                 timeout: float = DATAFORSEO_TASK_TIMEOUT, cache: Optional[SerpCache] = None,
+                 ledger: Optional[SerpCostLedger] = None):
+        self.login = login or DATAFORSEO_LOGIN
+        self.password = password or DATAFORSEO_PASSWORD
+        self.base_url = (base_url or DATAFORSEO_API_BASE).rstrip("/")
+        self.session = session if session is not None else get_http_session()
+        self.priority = int(priority)
+        self.poll_interval = max(0.0, float(poll_interval))
+        self.timeout = float(timeout)
+        self.cache = cache if cache is not None else get_serp_cache()
+        self.ledger = ledger if ledger is not None else get_serp_cost_ledger()
+        self.stats = {"cached": 0, "posted": 0, "post_calls": 0, "polls": 0, "collected": 0, "failed": 0}
+
+    def _call(self, method: str, path: str, payload=None) -> dict:
+        with trace_span(f"serp.dataforseo.{path.split('/')[0]}", "serp", tasks=len(payload) if payload else None):
+            r = self.session.request(
+                method, f"{self.base_url}/v3/serp/google/organic/{path}",
+                json=payload, auth=(self.login, self.password), timeout=60,
+            )
+            if r.status_code != 200:
+                raise RuntimeError(f"dataforseo_http_{r.status_code}")
+            data = r.json()
+            if not isinstance(data, dict) or data.get("status_code") != 20000:
+                raise RuntimeError((data or {}).get("status_message") or "dataforseo_error")
+            return data
+
+    def run(self, requests_: List[Tuple[str, str]], log=None) -> Dict[Tuple[str, str], dict]:
+        """SERP responses keyed by (normalized query, device); failures are {"_error": ...} like the live call."""
+        location = _dataforseo_location_key()
+        results: Dict[Tuple[str, str], dict] = {}
+        todo: Dict[Tuple[str, str], str] = {}
+        for query, device in requests_:
+            query = clean(query or "")
+            key = (normalize_serp_query(query), device)
+            if not query or key in results or key in todo:
+                continue
+            cached = self.cache.get("dataforseo", query, device, location)
+            if cached is not None:
+                results[key] = cached
+                self.stats["cached"] += 1
+            elif self.cache.replay:
+                results[key] = {"_error": "serp_replay_miss"}
+            else:
+                todo[key] = query
+        if not todo:
+            return results
+        if not self.login or not self.password:
+            results.update({key: {"_error": "missing_dataforseo_credentials"} for key in todo})
+            return results
+
+        pending = self._post(list(todo.items()), results)
+        if log and pending:
+            log(f"SERP standard queue: {len(pending)} tasks posted, waiting for results")
+        deadline = time.monotonic() + self.timeout
+        while pending:
+            try:
+                data = self._call("GET", "tasks_ready")
+                ready = [res.get("id") for task in data.get("tasks") or [] for res in task.get("result") or []]
+            except Exception:
+                ready = []
+            self.stats["polls"] += 1
+            for task_id in ready:
+                if task_id in pending:
+                    self._collect(task_id, pending.pop(task_id), results, location)
+            remaining = deadline - time.monotonic()
+            if not pending or remaining <= 0:
+                break
+            time.sleep(min(self.poll_interval, remaining))
+
+        for task_id, (key, query, cost, posted) in pending.items():
+            results[key] = {"_error": "dataforseo_task_timeout"}
+            self.stats["failed"] += 1
+            self.ledger.record("dataforseo", "standard", query, key[1], cost, time.monotonic() - posted,
+                               status="timeout", task_id=task_id)
+        return results
+
+    def _post(self, items: List[Tuple[Tuple[str, str], str]], results: dict) -> Dict[str, tuple]:
+        """Post tasks in batches; returns task id -> (key, query, cost, posted_at)."""
+        pending: Dict[str, tuple] = {}
+        for start in range(0, len(items), DATAFORSEO_TASK_BATCH):
+            chunk = {str(start + i): item for i, item in enumerate(items[start:start + DATAFORSEO_TASK_BATCH])}
+            payload = [
+                dict(_dataforseo_task_payload(query, key[1]), priority=self.priority, tag=tag)
+                for tag, (key, query) in chunk.items()
+            ]
+            posted = time.monotonic()
+            try:
+                data = self._call("POST", "task_post", payload)
+            except Exception as e:
+                for key, _ in chunk.values():
+                    results[key] = {"_error": str(e)}
+                    self.stats["failed"] += 1
+                continue
+            self.stats["post_calls"] += 1
+            for task in data.get("tasks") or []:
+                item = chunk.pop(str((task.get("data") or {}).get("tag", "")), None)
+                if item is None:
+                    continue
+                key, query = item
+                if task.get("status_code") == 20100 and task.get("id"):
+                    pending[task["id"]] = (key, query, task.get("cost"), posted)
+                    self.stats["posted"] += 1
+                    continue
+                results[key] = {"_error": task.get("status_message") or "dataforseo_task_error"}
+                self.stats["failed"] += 1
+                self.ledger.record("dataforseo", "standard", query, key[1], task.get("cost"), 0.0,
+                                   status=f"error {task.get('status_code')}", task_id=task.get("id") or "")
+            for key, _ in chunk.values():
+                results[key] = {"_error": "dataforseo_task_missing"}
+                self.stats["failed"] += 1
+        return pending
+
+    def _collect(self, task_id: str, entry: tuple, results: dict, location: str) -> None:
+        key, query, cost, posted = entry
+        try:
+            data = self._call("GET", f"task_get/advanced/{task_id}")
+            task = (data.get("tasks") or [{}])[0]
+            status = task.get("status_code")
+            error = None if status == 20000 else (task.get("status_message") or "dataforseo_task_error")
+        except Exception as e:
+            data, status, error = None, None, str(e)
+        if error is None:
+            self.cache.put("dataforseo", query, key[1], location, data)
+            results[key] = data
+            self.stats["collected"] += 1
+        else:
+            results[key] = {"_error": error}
+            self.stats["failed"] += 1
+        self.ledger.record("dataforseo", "standard", query, key[1], cost, time.monotonic() - posted,
+                           status="ok" if error is None else f"error {status or ''}".strip(), task_id=task_id)
+
+
 # =====================================================
 # AI VISIBILITY (AIO) TABLE
 # =====================================================
@@ -3863,8 +6250,12 @@ def _aio_tip_cell(status: str, tips: List[str]) -> str:
         "</details>"
     )
 
-@st.cache_data(show_spinner=False, ttl=1800)
+SERPAPI_LOCATION_KEY = "google.ae|ae|en|20"
+
 def serpapi_serp_cached(query: str, device: str) -> dict:
+    return serp_cached_call("serpapi", query, device, SERPAPI_LOCATION_KEY, lambda: _serpapi_serp_live(query, device))
+
+def _serpapi_serp_live(query: str, device: str) -> dict:
     if not SERPAPI_API_KEY:
         return {"_error": "missing_serpapi_key"}
     params = {
@@ -3877,21 +6268,84 @@ def serpapi_serp_cached(query: str, device: str) -> dict:
         "num": 20,
         "device": device,
     }
+    t0 = time.monotonic()
     try:
-        r = requests.get("https://serpapi.com/search.json", params=params, timeout=35)
+        r = get_http_session().get("https://serpapi.com/search.json", params=params, timeout=35)
         if r.status_code != 200:
             return {"_error": f"serpapi_http_{r.status_code}", "_text": r.text[:400]}
-        return r.json()
+        data = r.json()
     except Exception as e:
         return {"_error": str(e)}
+    # SerpApi bills in plan credits (one per search), not per-request USD.
+    get_serp_cost_ledger().record("serpapi", "live", query, device, None, time.monotonic() - t0)
+    return data
 
-def build_ai_visibility_table(query: str, target_url: str, competitors: List[str], device: str = "mobile") -> pd.DataFrame:
+SERP_PLAN_CONCURRENCY = 4
+
+@st.cache_resource(show_spinner=False)
+def get_serp_executor() -> ThreadPoolExecutor:
+    """Shared by every run's planner, so a run never leaves idle threads behind."""
+    return ThreadPoolExecutor(max_workers=SERP_PLAN_CONCURRENCY, thread_name_prefix="serp")
+
+class SerpPlanner:
+    """
+    Run-level SERP planner. Consumers (rank column, AI visibility table) name the queries a
+    run needs as soon as they are known; identical requests (provider, normalized query,
+    device) collapse into one call, issued in the background while the run keeps fetching
+    pages. get() hands every consumer the same shared result.
+    """
+
+    def __init__(self, executor: Optional[ThreadPoolExecutor] = None):
+        self._pool = executor if executor is not None else get_serp_executor()
+        self._lock = threading.Lock()
+        self._futures: Dict[tuple, Future] = {}
+        self.stats = {"requested": 0, "issued": 0}
+
+    def prefetch(self, provider: str, query: str, device: str = "mobile") -> Future:
+        key = (provider, normalize_serp_query(query), device)
+        fetch = dataforseo_serp_cached if provider == "dataforseo" else serpapi_serp_cached
+        with self._lock:
+            self.stats["requested"] += 1
+            fut = self._futures.get(key)
+            if fut is None:
+                fut = self._pool.submit(contextvars.copy_context().run, fetch, query, device)
+                self._futures[key] = fut
+                self.stats["issued"] += 1
+            return fut
+
+    def get(self, provider: str, query: str, device: str = "mobile") -> dict:
+        return self.prefetch(provider, query, device).result()
+
+    def plan_rank_query(self, query: str) -> None:
+        """What enrich_seo_df_with_rank_and_ai will request."""
+        if clean(query) and DATAFORSEO_LOGIN and DATAFORSEO_PASSWORD:
+            self.prefetch("dataforseo", clean(query), "mobile")
+
+    def plan_ai_query(self, query: str, device: str = "mobile") -> None:
+        """What build_ai_visibility_table will request."""
+        if not query:
+            return
+        if DATAFORSEO_LOGIN and DATAFORSEO_PASSWORD:
+            self.prefetch("dataforseo", query, device)
+        elif SERPAPI_API_KEY:
+            self.prefetch("serpapi", query, device)
+
+def _serp_fetch(serp: Optional[SerpPlanner], provider: str, query: str, device: str) -> dict:
+    if serp is not None:
+        return serp.get(provider, query, device)
+    if provider == "dataforseo":
+        return dataforseo_serp_cached(query, device=device)
+    return serpapi_serp_cached(query, device=device)
+
+@traced("stage")
+def build_ai_visibility_table(query: str, target_url: str, competitors: List[str], device: str = "mobile",
+                              serp: Optional[SerpPlanner] = None) -> pd.DataFrame:
     cols = ["Target URL Cited in AIO","Cited Domains","# AIO Citations","Top Competitor Domains","SERP Features Present","People Also Ask questions"]
     if not query:
         return pd.DataFrame([{c: "Not available" for c in cols}], columns=cols)
 
     if DATAFORSEO_LOGIN and DATAFORSEO_PASSWORD:
-        data = dataforseo_serp_cached(query, device=device)
+        data = _serp_fetch(serp, "dataforseo", query, device)
         if isinstance(data, dict) and data.get("_error"):
             return pd.DataFrame([{c: f"Not available ({data.get('_error')})" for c in cols}], columns=cols)
 
@@ -3951,7 +6405,7 @@ def build_ai_visibility_table(query: str, target_url: str, competitors: List[str
     if not SERPAPI_API_KEY:
         return pd.DataFrame([{c: "Not available (no DataForSEO credentials)" for c in cols}], columns=cols)
 
-    data = serpapi_serp_cached(query, device=device)
+    data = _serp_fetch(serp, "serpapi", query, device)
     if not data or (isinstance(data, dict) and data.get("_error")):
         return pd.DataFrame([{c: "Not available" for c in cols}], columns=cols)
 
@@ -4014,7 +6468,7 @@ def build_ai_visibility_table(query: str, target_url: str, competitors: List[str
 @st.cache_data(show_spinner=False, ttl=86400)
 def _head_last_modified(url: str) -> str:
     try:
-        r = requests.head(url, headers=DEFAULT_HEADERS, allow_redirects=True, timeout=18)
+        r = get_http_session().head(url, headers=DEFAULT_HEADERS, allow_redirects=True, timeout=18)
         return r.headers.get("Last-Modified", "") or ""
     except Exception:
         return ""
@@ -4118,12 +6572,13 @@ def _extract_labeled_date_candidates_from_text(text: str, first_only: bool = Fal
                 break
     return out
 
-def _extract_labeled_date_candidates(html: str) -> List[Tuple[str, str]]:
+def _extract_labeled_date_candidates(html: PageLike) -> List[Tuple[str, str]]:
     if not html:
         return []
-    soup = BeautifulSoup(html, "html.parser")
+    page = as_parsed_page(html)
+    soup = page.soup
     scopes = []
-    h1 = soup.find("h1")
+    h1 = page.first_h1
     if h1:
         scopes.extend([h1.parent, getattr(h1.parent, "parent", None), getattr(getattr(h1.parent, "parent", None), "parent", None)])
     main = soup.find("article") or soup.find("main")
@@ -4170,9 +6625,11 @@ def _pick_best_date_candidate(candidates: List[Tuple[str, str]]) -> str:
         return max(modified, key=lambda x: x[0])[1]
     return max(parsed, key=lambda x: x[0])[1]
 
-def _extract_last_modified_candidates_from_html(html: str) -> List[Tuple[str, str]]:
+def _extract_last_modified_candidates_from_html(html: PageLike) -> List[Tuple[str, str]]:
     if not html:
         return []
+    page = as_parsed_page(html)
+    html = page.html
     candidates: List[Tuple[str, str]] = []
     primary = _extract_primary_date_candidate(html)
     if primary:
@@ -4183,21 +6640,21 @@ def _extract_last_modified_candidates_from_html(html: str) -> List[Tuple[str, st
         candidates.append((m.group(1), "published"))
     for m in re.finditer(r'"dateCreated"\s*:\s*"([^"]+)"', html, re.I):
         candidates.append((m.group(1), "published"))
-    soup = BeautifulSoup(html, "html.parser")
-    candidates.extend(_extract_labeled_date_candidates(html))
+    soup = page.soup
+    candidates.extend(_extract_labeled_date_candidates(page))
 
     meta_candidates = [
-        ("meta", {"property": "article:modified_time"}, "content", "modified"),
-        ("meta", {"property": "og:updated_time"}, "content", "modified"),
-        ("meta", {"property": "article:published_time"}, "content", "published"),
-        ("meta", {"name": "lastmod"}, "content", "modified"),
-        ("meta", {"name": "last-modified"}, "content", "modified"),
-        ("meta", {"name": "date"}, "content", "published"),
-        ("meta", {"itemprop": "dateModified"}, "content", "modified"),
-        ("meta", {"itemprop": "datePublished"}, "content", "published"),
+        ("property", "article:modified_time", "content", "modified"),
+        ("property", "og:updated_time", "content", "modified"),
+        ("property", "article:published_time", "content", "published"),
+        ("name", "lastmod", "content", "modified"),
+        ("name", "last-modified", "content", "modified"),
+        ("name", "date", "content", "published"),
+        ("itemprop", "dateModified", "content", "modified"),
+        ("itemprop", "datePublished", "content", "published"),
     ]
-    for tag, attrs, key, kind in meta_candidates:
-        t = soup.find(tag, attrs=attrs)
+    for attr, value, key, kind in meta_candidates:
+        t = page.find_meta(attr, value)
         if t and t.get(key):
             v = clean(t.get(key))
             if v:
@@ -4212,23 +6669,14 @@ def _extract_last_modified_candidates_from_html(html: str) -> List[Tuple[str, st
         kind = "modified" if "updated" in cls or itemprop == "datemodified" else "published"
         candidates.append((v, kind))
 
-    scripts = soup.find_all("script", attrs={"type": re.compile(r"ld\+json", re.I)})
-    for s in scripts:
-        raw = (s.string or s.get_text(" ") or "").strip()
-        if not raw:
-            continue
-        try:
-            data = json.loads(raw)
-        except Exception:
-            continue
-        _collect_jsonld_dates(data, candidates)
+    candidates.extend(page.schema.dates)
 
     return candidates
 
-def _extract_last_modified_from_html(html: str) -> str:
+def _extract_last_modified_from_html(html: PageLike) -> str:
     return _pick_best_date_candidate(_extract_last_modified_candidates_from_html(html))
 
-def get_last_modified(url: str, html: str, text: str = "") -> str:
+def get_last_modified(url: str, html: PageLike, text: str = "") -> str:
     candidates: List[Tuple[str, str]] = []
     if html:
         candidates.extend(_extract_last_modified_candidates_from_html(html))
@@ -4268,11 +6716,10 @@ def _has_brief_summary(nodes: List[dict], text: str) -> str:
         return "Yes"
     return "No"
 
-def _count_source_links(html: str) -> int:
+def _count_source_links(html: PageLike) -> int:
     if not html:
         return 0
-    soup = BeautifulSoup(html, "html.parser")
-    links = soup.find_all("a", href=True)
+    links = as_parsed_page(html).links
     cnt = 0
     for a in links:
         href = a.get("href") or ""
@@ -4305,14 +6752,11 @@ PROPERTY_KEYWORDS = {
     "community","neighborhood","neighbourhood","district","suburb","area",
 }
 
-def _intent_tokens_from_html(html: str, page_url: str) -> List[str]:
-    soup = BeautifulSoup(html, "html.parser")
-    h1 = soup.find("h1")
+def _intent_tokens_from_html(html: PageLike, page_url: str) -> List[str]:
+    page = as_parsed_page(html)
+    h1 = page.first_h1
     h1_text = clean(h1.get_text(" ")) if h1 else ""
-    title = ""
-    title_tag = soup.find("title")
-    if title_tag:
-        title = clean(title_tag.get_text(" "))
+    title = page.title
     slug = urlparse(page_url).path.strip("/").split("/")[-1]
     raw = " ".join([h1_text, title, slug.replace("-", " ")])
     tokens = []
@@ -4331,20 +6775,17 @@ def _looks_like_area_phrase(text: str) -> bool:
         text,
     ))
 
-def _is_property_related(html: str, page_url: str) -> bool:
+def _is_property_related(html: PageLike, page_url: str) -> bool:
     slug = urlparse(page_url).path.strip("/").replace("-", " ").lower()
     if any(x in slug for x in ["for-sale", "for-rent", "/s/"]):
         return True
-    soup = BeautifulSoup(html, "html.parser")
-    h1 = soup.find("h1")
+    page = as_parsed_page(html)
+    h1 = page.first_h1
     h1_text = clean(h1.get_text(" ")) if h1 else ""
-    title = ""
-    title_tag = soup.find("title")
-    if title_tag:
-        title = clean(title_tag.get_text(" "))
+    title = page.title
     if _looks_like_area_phrase(" ".join([h1_text, title])):
         return True
-    tokens = set(_intent_tokens_from_html(html, page_url))
+    tokens = set(_intent_tokens_from_html(page, page_url))
     return any(t in PROPERTY_KEYWORDS for t in tokens)
 
 def _is_lpv_or_ltp_link(href: str, base_dom: str) -> Tuple[bool, bool]:
@@ -4369,12 +6810,11 @@ def _is_lpv_or_ltp_link(href: str, base_dom: str) -> Tuple[bool, bool]:
     ltp = path.startswith("/s/")
     return (lpv, ltp)
 
-def _internal_linking_quality(html: str, page_url: str, word_count: int) -> str:
+def _internal_linking_quality(html: PageLike, page_url: str, word_count: int) -> str:
     if not html:
         return "Not available"
-    soup = BeautifulSoup(html, "html.parser")
-    for t in soup.find_all(list(IGNORE_TAGS)):
-        t.decompose()
+    page = as_parsed_page(html)
+    soup = page.pruned()
     root = soup.find("article") or soup.find("main") or soup
     links = root.find_all("a", href=True)
     base_dom = domain_of(page_url)
@@ -4384,8 +6824,8 @@ def _internal_linking_quality(html: str, page_url: str, word_count: int) -> str:
     intent_support = 0
     lpv_count = 0
     ltp_count = 0
-    is_property = _is_property_related(html, page_url)
-    intent_tokens = _intent_tokens_from_html(html, page_url)
+    is_property = _is_property_related(page, page_url)
+    intent_tokens = _intent_tokens_from_html(page, page_url)
     for a in links:
         href = (a.get("href") or "").strip()
         if not href:
@@ -4558,6 +6998,7 @@ def _misspelling_and_wrong_words(text: str) -> str:
     if not words:
         return "Not available"
     issues = set()
+    zipf_frequency = _zipf_frequency() if WORDFREQ_OK else None
     for w in words[:4000]:
         if w.isupper() or w[0].isupper():
             continue
@@ -4568,7 +7009,7 @@ def _misspelling_and_wrong_words(text: str) -> str:
             continue
         if w in SPELLCHECK_ALLOWLIST:
             continue
-        if WORDFREQ_OK:
+        if zipf_frequency is not None:
             if zipf_frequency(w, "en") <= 0:
                 issues.add(w)
         else:
@@ -4589,11 +7030,10 @@ def _misspelling_and_wrong_words(text: str) -> str:
 
 CREDIBLE_KEYWORDS = ["gov", "edu", "who.int", "un.org", "worldbank", "statista", "imf", "oecd", "bbc", "nytimes", "guardian", "reuters", "wsj", "ft"]
 
-def _credible_sources_count(html: str, page_url: str) -> int:
+def _credible_sources_count(html: PageLike, page_url: str) -> int:
     if not html:
         return 0
-    soup = BeautifulSoup(html, "html.parser")
-    links = soup.find_all("a", href=True)
+    links = as_parsed_page(html).links
     seen = set()
     base_dom = domain_of(page_url)
     for a in links:
@@ -4609,11 +7049,10 @@ def _credible_sources_count(html: str, page_url: str) -> int:
             seen.add(dom)
     return len(seen)
 
-def _styling_layout_label(html: str) -> str:
+def _styling_layout_label(html: PageLike) -> str:
     if not html:
         return "Not available"
-    soup = BeautifulSoup(html, "html.parser")
-    root = _find_content_root(soup)
+    root = _find_content_root(as_parsed_page(html).soup)
     score = 0
     signals = []
 
@@ -4801,7 +7240,7 @@ def _styling_layout_label(html: str) -> str:
         return f"{label} ({', '.join(signals)})"
     return label
 
-def _references_section_present(nodes: List[dict], html: str) -> str:
+def _references_section_present(nodes: List[dict], html: PageLike) -> str:
     # Rule: a real references section must appear near the end of article
     # and include source URLs listed under a references-like heading.
     allowed_labels = {
@@ -4873,7 +7312,7 @@ def _references_section_present(nodes: List[dict], html: str) -> str:
     if not html:
         return "No"
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = as_parsed_page(html).soup
     root = soup.find("article") or soup.find("main") or soup.body or soup
     headings = root.find_all(list(heading_tags))
     total_headings = len(headings)
@@ -5126,12 +7565,85 @@ def _domain_topic_cannibalization_label(
         return "Medium risk (≈1 other page)"
     return "Low risk"
 
+def _content_quality_row(
+    page: str,
+    page_url: str,
+    seo_fkw: str,
+    fr: Optional[FetchResult],
+    nodes: List[dict],
+    domain_nodes_map: Dict[str, Dict[str, List[dict]]],
+    manual_query: str,
+    manual_query_secondary: str,
+) -> dict:
+    parsed = get_page_from_fetchresult(fr)
+    html = parsed.html
+    text = (fr.text if fr else "") or ""
+    content_text = content_text_from_html(parsed, include_headings=False) if html else ""
+    if not content_text:
+        content_text = content_text_from_plaintext(text, include_headings=False)
+    if word_count_from_text(content_text) < 120 and text:
+        fallback_text = content_text_from_plaintext_lenient(text)
+        if word_count_from_text(fallback_text) > word_count_from_text(content_text):
+            content_text = fallback_text
+    if word_count_from_text(content_text) < 120 and text:
+        content_text = clean(text)
+    wc_text = content_text_from_html(parsed, include_headings=True) if html else ""
+    if not wc_text:
+        wc_text = content_text_from_plaintext(text, include_headings=True)
+
+    wc_body = word_count_from_text(content_text)
+    lm = get_last_modified(page_url, parsed, text)
+
+    fkw = clean(manual_query) if clean(manual_query) else seo_fkw
+    fkw_secondary = clean(manual_query_secondary) if clean(manual_query_secondary) else ""
+    rep_s = compute_kw_repetition(content_text, fkw) if fkw and fkw != "Not available" else "0"
+    try:
+        rep_i = int(rep_s)
+    except Exception:
+        rep_i = 0
+
+    is_bayut = page.strip().lower() == "bayut" or domain_of(page_url).endswith("bayut.com")
+    topic_cann = _domain_topic_cannibalization_label(page_url, domain_nodes_map)
+    kw_stuff = _kw_stuffing_label(wc_body, rep_i)
+    if fkw_secondary and fkw_secondary != fkw:
+        rep2_s = compute_kw_repetition(content_text, fkw_secondary)
+        try:
+            rep2_i = int(rep2_s)
+            kw_stuff_secondary = _kw_stuffing_label(wc_body, rep2_i)
+        except Exception:
+            kw_stuff_secondary = "Not available"
+        kw_stuff = f"Primary: {kw_stuff} | Secondary: {kw_stuff_secondary}"
+
+    faqs = "Yes" if (fr and page_has_real_faq(fr, nodes)) else "No"
+    refs = _references_section_present(nodes, parsed)
+    internal_quality = _internal_linking_quality(parsed, page_url, wc_body)
+    misspell = _misspelling_and_wrong_words(content_text if content_text else text) if is_bayut else "-"
+    latest_score = _latest_information_label(lm, text)
+    outdated = _outdated_misleading_cell(lm, text)
+    styling = _styling_layout_label(parsed)
+
+    return {
+        "Page": page,
+        "Last Updated / Modified": lm,
+        "Topic Cannibalization": topic_cann,
+        "Keyword Stuffing": kw_stuff,
+        "FAQs": faqs,
+        "References Section": refs,
+        "Internal linking": internal_quality,
+        "Misspelling & Wrong Words": misspell,
+        "Latest Information Score": latest_score,
+        "Outdated / Misleading Info": outdated,
+        "Styling / Layout": styling,
+    }
+
+@traced("stage")
 def build_content_quality_table_from_seo(
     seo_df: pd.DataFrame,
     fr_map_by_url: Dict[str, FetchResult],
     tree_map_by_url: Dict[str, dict],
     manual_query: str = "",
-    manual_query_secondary: str = ""
+    manual_query_secondary: str = "",
+    store: Optional[ArtifactStore] = None
 ) -> pd.DataFrame:
     if seo_df is None or seo_df.empty:
         return pd.DataFrame()
@@ -5155,7 +7667,8 @@ def build_content_quality_table_from_seo(
             continue
         domain_nodes_map.setdefault(dom, {})[url] = nodes
 
-    rows = []
+    rows: List[Optional[dict]] = []
+    tasks: List[Tuple[int, str, Optional[tuple], tuple]] = []  # (row index, url, memo key, task args)
     for _, r in seo_df.iterrows():
         page = str(r.get("Page", "")).strip()
         page_url = str(r.get("__url", "")).strip()
@@ -5168,68 +7681,189 @@ def build_content_quality_table_from_seo(
         fr = fr_map_by_url.get(page_url)
         tr = tree_map_by_url.get(page_url) or {}
         nodes = tr.get("nodes", []) if isinstance(tr, dict) else []
+        seo_fkw = str(r.get("__fkw", ""))
+
+        # Topic cannibalization compares against same-domain pages, so they are part of the key.
+        dom = domain_of(page_url)
+        peers = domain_nodes_map.get(dom) or {}
+        peer_revs = tuple(sorted((u, store.rev(u)) for u in peers)) if store is not None else ()
+        key = None
+        if store is not None and not any(rev is None for _, rev in peer_revs):
+            key = (page, seo_fkw, manual_query, manual_query_secondary, peer_revs)
+        args = (page, seo_fkw, PagePayload.of(page_url, fr, nodes), {dom: peers} if peers else {},
+                manual_query, manual_query_secondary)
+        rows.append(None)
+        tasks.append((len(rows) - 1, page_url, key, args))
+
+    def build(indexes: List[int]) -> List[dict]:
+        return run_page_tasks(_content_quality_task, [tasks[i][3] for i in indexes])
+
+    if store is None:
+        built = build(list(range(len(tasks))))
+    else:
+        built = [dict(r) for r in store.memo_many("cq_rows", [(t[1], t[2]) for t in tasks], build)]
+    for (row_index, _, _, _), row in zip(tasks, built):
+        rows[row_index] = row
+
+    return pd.DataFrame(rows, columns=cols)
+
+
+# =====================================================
+# ANALYSIS WORKER POOL (PER-PAGE CPU WORK)
+# =====================================================
+# SEO rows, content-quality rows and header-gap rows are pure-Python parsing/regex work per
+# page. With enough pages they fan out to a pool of worker processes (one per core by
+# default); results come back in submission order. Small batches, ANALYSIS_WORKERS=1, or a
+# pool that cannot start run in-process exactly as before.
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "0"))  # 0 = one per CPU core; 1 = in-process
+ANALYSIS_MIN_TASKS = int(os.getenv("ANALYSIS_MIN_TASKS", "4"))  # fewer tasks run in-process
+_WORKER_PAGE_CACHE_SIZE = 32
+
+@dataclass
+class PagePayload:
+    """
+    Picklable snapshot of one page for the analysis pool: FetchResult fields + heading tree.
+    In-process calls keep the live FetchResult (and its cached parse); pickling drops it.
+    """
+    url: str
+    nodes: List[dict]
+    fr_fields: Optional[tuple] = None
+    fr: Optional[FetchResult] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def of(cls, url: str, fr: Optional[FetchResult], nodes: Optional[List[dict]]) -> PagePayload:
+        fields_ = None if fr is None else (fr.ok, fr.source, fr.status, fr.html, fr.text, fr.reason)
+        return cls(url=url, nodes=nodes or [], fr_fields=fields_, fr=fr)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["fr"] = None
+        return state
+
+    def resolve(self) -> Tuple[Optional[FetchResult], List[dict]]:
+        """(FetchResult, nodes); in a worker, pages seen before (e.g. Bayut) reuse their parse."""
+        if self.fr is not None or self.fr_fields is None:
+            return self.fr, self.nodes
+        html, text = self.fr_fields[3] or "", self.fr_fields[4] or ""
+        key = (self.url, hashlib.sha1(f"{html}\0{text}".encode("utf-8", "surrogatepass")).hexdigest())
+        cached = _WORKER_PAGES.get(key)
+        if cached is not None and cached[1] == self.nodes:
+            return cached
+        if len(_WORKER_PAGES) >= _WORKER_PAGE_CACHE_SIZE:
+            _WORKER_PAGES.pop(next(iter(_WORKER_PAGES)))
+        _WORKER_PAGES[key] = (FetchResult(*self.fr_fields), self.nodes)
+        return _WORKER_PAGES[key]
+
+_WORKER_PAGES: Dict[tuple, Tuple[FetchResult, List[dict]]] = {}
+
+def analysis_worker_count() -> int:
+    return ANALYSIS_WORKERS if ANALYSIS_WORKERS > 0 else (os.cpu_count() or 1)
+
+def _app_mtime() -> float:
+    try:
+        return os.path.getmtime(os.path.abspath(__file__))
+    except OSError:
+        return 0.0
+
+@st.cache_resource(show_spinner=False)
+def get_analysis_pool(workers: int, app_mtime: float) -> Optional[ProcessPoolExecutor]:
+    """
+    Long-lived analysis workers, spawned rather than forked (the Streamlit server is
+    multi-threaded); each loads this file once as __mp_main__, UI body included (see the
+    note above PAGE CONFIG). Keyed on the file's mtime so an edited app gets fresh workers.
+    None when processes cannot be started.
+    """
+    try:
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    except Exception:
+        return None
 
-        html = (fr.html if fr else "") or ""
-        text = (fr.text if fr else "") or ""
-        content_text = content_text_from_html(html, include_headings=False) if html else ""
-        if not content_text:
-            content_text = content_text_from_plaintext(text, include_headings=False)
-        if word_count_from_text(content_text) < 120 and text:
-            fallback_text = content_text_from_plaintext_lenient(text)
-            if word_count_from_text(fallback_text) > word_count_from_text(content_text):
-                content_text = fallback_text
-        if word_count_from_text(content_text) < 120 and text:
-            content_text = clean(text)
-        wc_text = content_text_from_html(html, include_headings=True) if html else ""
-        if not wc_text:
-            wc_text = content_text_from_plaintext(text, include_headings=True)
-
-        wc_body = word_count_from_text(content_text)
-        lm = get_last_modified(page_url, html, text)
-
-        fkw = clean(manual_query) if clean(manual_query) else str(r.get("__fkw", ""))
-        fkw_secondary = clean(manual_query_secondary) if clean(manual_query_secondary) else ""
-        rep_s = compute_kw_repetition(content_text, fkw) if fkw and fkw != "Not available" else "0"
+def _task_span_name(fn) -> str:
+    return fn.__name__.strip("_").replace("_task", "")
+
+def _task_url(args: tuple) -> str:
+    return next((a.url for a in reversed(args) if isinstance(a, PagePayload) and a.url), "")
+
+def _run_traced_task(fn, args: tuple):
+    with trace_span(_task_span_name(fn), "analyze", url=_task_url(args) or None):
+        return fn(*args)
+
+def _timed_task(fn, *args):
+    """Worker side: (result, wall-clock start, seconds, pid), so the parent can trace pool work."""
+    started, t0 = time.time(), time.perf_counter()
+    return fn(*args), started, time.perf_counter() - t0, os.getpid()
+
+def run_page_tasks(fn, arg_lists: List[tuple]) -> list:
+    """[fn(*args) for args in arg_lists], fanned out over the analysis pool when worthwhile."""
+    arg_lists = list(arg_lists)
+    workers = analysis_worker_count()
+    if workers <= 1 or len(arg_lists) < max(2, ANALYSIS_MIN_TASKS):
+        return [_run_traced_task(fn, args) for args in arg_lists]
+    pool = get_analysis_pool(workers, _app_mtime())
+    if pool is not None:
+        trace = active_trace()
         try:
-            rep_i = int(rep_s)
-        except Exception:
-            rep_i = 0
+            futures = [pool.submit(_timed_task, fn, *args) for args in arg_lists]
+            results = [f.result() for f in futures]
+        except (BrokenProcessPool, pickle.PicklingError, OSError):
+            pool.shutdown(wait=False, cancel_futures=True)
+            get_analysis_pool.clear()
+        else:
+            if trace is not None:
+                for args, (_, started, secs, pid) in zip(arg_lists, results):
+                    start_ms = (started - trace.started_at) * 1000
+                    trace.add(_task_span_name(fn), "analyze", start_ms, start_ms + secs * 1000,
+                              {"url": _task_url(args) or None, "worker_pid": pid})
+            return [r[0] for r in results]
+    return [_run_traced_task(fn, args) for args in arg_lists]
+
+def _seo_row_task(label: str, page: PagePayload, manual_fkw: str) -> dict:
+    fr, nodes = page.resolve()
+    return seo_row_for_page_extended(label, page.url, fr, nodes, manual_fkw=manual_fkw)
+
+def _content_quality_task(page_label: str, seo_fkw: str, page: PagePayload,
+                          domain_nodes_map: Dict[str, Dict[str, List[dict]]],
+                          manual_query: str, manual_query_secondary: str) -> dict:
+    fr, nodes = page.resolve()
+    return _content_quality_row(
+        page_label, page.url, seo_fkw, fr, nodes, domain_nodes_map, manual_query, manual_query_secondary
+    )
 
-        is_bayut = page.strip().lower() == "bayut" or domain_of(page_url).endswith("bayut.com")
-        topic_cann = _domain_topic_cannibalization_label(page_url, domain_nodes_map)
-        kw_stuff = _kw_stuffing_label(wc_body, rep_i)
-        if fkw_secondary and fkw_secondary != fkw:
-            rep2_s = compute_kw_repetition(content_text, fkw_secondary)
-            try:
-                rep2_i = int(rep2_s)
-                kw_stuff_secondary = _kw_stuffing_label(wc_body, rep2_i)
-            except Exception:
-                kw_stuff_secondary = "Not available"
-            kw_stuff = f"Primary: {kw_stuff} | Secondary: {kw_stuff_secondary}"
-
-        faqs = "Yes" if (fr and page_has_real_faq(fr, nodes)) else "No"
-        refs = _references_section_present(nodes, html)
-        internal_quality = _internal_linking_quality(html, page_url, wc_body)
-        misspell = _misspelling_and_wrong_words(content_text if content_text else text) if is_bayut else "-"
-        latest_score = _latest_information_label(lm, text)
-        outdated = _outdated_misleading_cell(lm, text)
-        styling = _styling_layout_label(html)
-
-        rows.append({
-            "Page": page,
-            "Last Updated / Modified": lm,
-            "Topic Cannibalization": topic_cann,
-            "Keyword Stuffing": kw_stuff,
-            "FAQs": faqs,
-            "References Section": refs,
-            "Internal linking": internal_quality,
-            "Misspelling & Wrong Words": misspell,
-            "Latest Information Score": latest_score,
-            "Outdated / Misleading Info": outdated,
-            "Styling / Layout": styling,
-        })
+def _gap_rows_task(bayut: PagePayload, comp: PagePayload) -> List[dict]:
+    bayut_fr, bayut_nodes = bayut.resolve()
+    comp_fr, comp_nodes = comp.resolve()
+    return update_mode_rows_header_first(
+        bayut_nodes=bayut_nodes,
+        bayut_fr=bayut_fr,
+        comp_nodes=comp_nodes,
+        comp_fr=comp_fr,
+        comp_url=comp.url,
+    )
 
-    return pd.DataFrame(rows, columns=cols)
+@traced("stage")
+def build_update_gap_rows(
+    bayut_fr: FetchResult,
+    bayut_nodes: List[dict],
+    competitors: List[str],
+    comp_fr_map: Dict[str, FetchResult],
+    comp_tree_map: Dict[str, dict],
+    store: Optional[ArtifactStore] = None,
+    bayut_key: tuple = (),
+) -> List[dict]:
+    """Header-gap rows for every competitor, in competitor order (memoized per Bayut revision)."""
+    bayut = PagePayload.of("", bayut_fr, bayut_nodes)
+
+    def build(indexes: List[int]) -> List[List[dict]]:
+        return run_page_tasks(_gap_rows_task, [
+            (bayut, PagePayload.of(competitors[i], comp_fr_map[competitors[i]], comp_tree_map[competitors[i]]["nodes"]))
+            for i in indexes
+        ])
+
+    if store is None:
+        per_comp = build(list(range(len(competitors))))
+    else:
+        per_comp = store.memo_many("gap_rows", [(u, bayut_key) for u in competitors], build)
+    return [row for rows in per_comp for row in rows]
 
 
 # =====================================================
@@ -5394,6 +8028,408 @@ def section_header_pill(title: str):
     st.markdown(f"<div class='section-title'>{html_lib.escape(title)}</div>", unsafe_allow_html=True)
 
 
+# =====================================================
+# HEADLESS BATCH (python -m app batch jobs.jsonl)
+# =====================================================
+# One JSON object per line:
+#   {"id": "jvc-guide", "mode": "update", "bayut_url": "...", "competitors": ["...", "..."],
+#    "focus_keyword": "...", "secondary_keyword": "..."}
+#   {"id": "new-1", "mode": "new", "title": "...", "competitors": ["..."]}
+# "mode" defaults to "update" when bayut_url is set. Every table is written once for the
+# whole batch with a leading "Job" column.
+BATCH_FORMATS = ("csv", "parquet", "jsonl")
+BATCH_JOB_CONCURRENCY = 4
+
+class BatchJobError(Exception):
+    pass
+
+@dataclass
+class BatchJob:
+    job_id: str
+    mode: str
+    competitors: List[str]
+    bayut_url: str = ""
+    title: str = ""
+    focus_keyword: str = ""
+    secondary_keyword: str = ""
+
+def parse_batch_job(obj: dict, line_no: int) -> BatchJob:
+    if not isinstance(obj, dict):
+        raise BatchJobError(f"line {line_no}: expected a JSON object")
+    comps = obj.get("competitors") or []
+    if isinstance(comps, str):
+        comps = comps.splitlines()
+    comps = [clean(str(c)) for c in comps if clean(str(c))]
+    bayut_url = clean(str(obj.get("bayut_url") or ""))
+    mode = clean(str(obj.get("mode") or ("update" if bayut_url else "new"))).lower()
+    job = BatchJob(
+        job_id=clean(str(obj.get("id") or f"job-{line_no}")),
+        mode=mode,
+        competitors=comps,
+        bayut_url=bayut_url,
+        title=clean(str(obj.get("title") or "")),
+        focus_keyword=clean(str(obj.get("focus_keyword") or "")),
+        secondary_keyword=clean(str(obj.get("secondary_keyword") or "")),
+    )
+    if job.mode not in {"update", "new"}:
+        raise BatchJobError(f"line {line_no}: mode must be 'update' or 'new'")
+    if job.mode == "update" and not job.bayut_url:
+        raise BatchJobError(f"line {line_no}: update jobs need bayut_url")
+    if job.mode == "new" and not job.title:
+        raise BatchJobError(f"line {line_no}: new post jobs need title")
+    if not job.competitors:
+        raise BatchJobError(f"line {line_no}: add at least one competitor URL")
+    return job
+
+def load_batch_jobs(path: str) -> List[BatchJob]:
+    jobs: List[BatchJob] = []
+    with open(path, encoding="utf-8") as fh:
+        for line_no, line in enumerate(fh, start=1):
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            try:
+                obj = json.loads(line)
+            except ValueError as e:
+                raise BatchJobError(f"line {line_no}: invalid JSON ({e})")
+            jobs.append(parse_batch_job(obj, line_no))
+    return jobs
+
+class SharedFetcher:
+    """
+    Fetches shared by every job in a batch: each URL is resolved once (concurrent
+    requests for it wait on the same future) under one per-domain throttle, within
+    the per-URL budget and, when `run_budget` is set, a batch-wide deadline.
+    """
+    def __init__(self, agent: FetchAgent, max_workers: int = FETCH_MAX_CONCURRENCY, run_budget: float = 0):
+        self.async_agent = AsyncFetchAgent(agent, max_concurrency=max_workers)
+        self.deadline = time.monotonic() + run_budget if run_budget and run_budget > 0 else None
+        self.throttle = DomainThrottle()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(max_workers)))
+        self._lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+
+    def _resolve(self, url: str) -> FetchResult:
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return _deadline_result()
+        try:
+            with self.throttle.slot(url):
+                return asyncio.run(self.async_agent.resolve(url, deadline=self.deadline))
+        except Exception:
+            return FetchResult(False, None, None, "", "", "fetch_error")
+
+    def submit(self, url: str) -> Future:
+        with self._lock:
+            fut = self._futures.get(url)
+            if fut is None:
+                # A URL shared by several jobs is traced in the job that asked for it first.
+                fut = self._pool.submit(contextvars.copy_context().run, self._resolve, url)
+                self._futures[url] = fut
+            return fut
+
+    @traced("stage", "fetch")
+    def resolve_many(self, urls: List[str]) -> Dict[str, FetchResult]:
+        futures = {u: self.submit(u) for u in dict.fromkeys(urls)}
+        return {u: fut.result() for u, fut in futures.items()}
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        self.async_agent.close()
+
+@traced("stage", "trees")
+def _batch_competitors(competitors: List[str], fr_map: Dict[str, FetchResult]) -> Tuple[List[str], Dict[str, dict], List[str]]:
+    """Usable competitors, their trees, and skipped URLs (unfetchable or without headings)."""
+    usable, skipped = split_fetch_results(competitors, fr_map)
+    tree_map: Dict[str, dict] = {}
+    for u in list(usable):
+        tr = get_tree_from_fetchresult(fr_map[u], u)
+        if tr.get("nodes"):
+            tree_map[u] = tr
+        else:
+            usable.remove(u)
+            skipped.append(u)
+    if not usable:
+        raise BatchJobError("no competitor could be fetched with readable headings")
+    return usable, tree_map, skipped
+
+def run_update_job(job: BatchJob, fetcher: SharedFetcher, serp: Optional[SerpPlanner] = None) -> Tuple[Dict[str, pd.DataFrame], List[str]]:
+    serp = serp if serp is not None else SerpPlanner()
+    serp.plan_rank_query(job.focus_keyword)
+    for u in job.competitors:
+        fetcher.submit(u)
+    bayut_fr = fetcher.resolve_many([job.bayut_url])[job.bayut_url]
+    if not bayut_fr.ok:
+        raise BatchJobError(f"Bayut URL could not be fetched ({fetch_failure_label(bayut_fr)})")
+    bayut_nodes = get_tree_from_fetchresult(bayut_fr, job.bayut_url).get("nodes") or []
+    if not bayut_nodes:
+        raise BatchJobError("no headings could be extracted from the Bayut page")
+    query_for_ai = job.focus_keyword or get_first_h1(bayut_nodes)
+    serp.plan_ai_query(query_for_ai)
+    fr_map = fetcher.resolve_many([job.bayut_url] + job.competitors)
+    usable, comp_tree_map, skipped = _batch_competitors(job.competitors, fr_map)
+
+    gap_rows = build_update_gap_rows(bayut_fr, bayut_nodes, usable, fr_map, comp_tree_map)
+    gap_cols = ["Headers", "Description", "Source"]
+    gaps = pd.DataFrame(gap_rows)[gap_cols] if gap_rows else pd.DataFrame(columns=gap_cols)
+
+    seo = build_seo_analysis_update(
+        bayut_url=job.bayut_url,
+        bayut_fr=bayut_fr,
+        bayut_nodes=bayut_nodes,
+        competitors=usable,
+        comp_fr_map=fr_map,
+        comp_tree_map=comp_tree_map,
+        manual_fkw=job.focus_keyword,
+    )
+    seo, _ = enrich_seo_df_with_rank_and_ai(seo, manual_query=job.focus_keyword, serp=serp)
+    cq = build_content_quality_table_from_seo(
+        seo_df=seo,
+        fr_map_by_url={job.bayut_url: bayut_fr, **{u: fr_map[u] for u in usable}},
+        tree_map_by_url={job.bayut_url: {"nodes": bayut_nodes}, **comp_tree_map},
+        manual_query=job.focus_keyword,
+        manual_query_secondary=job.secondary_keyword,
+    )
+    ai_vis = build_ai_visibility_table(
+        query=query_for_ai,
+        target_url=job.bayut_url,
+        competitors=usable,
+        device="mobile",
+        serp=serp,
+    )
+    return {"gaps": gaps, "seo": seo, "content_quality": cq, "ai_visibility": ai_vis}, skipped
+
+def run_new_post_job(job: BatchJob, fetcher: SharedFetcher, serp: Optional[SerpPlanner] = None) -> Tuple[Dict[str, pd.DataFrame], List[str]]:
+    serp = serp if serp is not None else SerpPlanner()
+    serp.plan_rank_query(job.focus_keyword)
+    serp.plan_ai_query(job.focus_keyword or job.title)
+    fr_map = fetcher.resolve_many(job.competitors)
+    usable, comp_tree_map, skipped = _batch_competitors(job.competitors, fr_map)
+
+    rows = []
+    for cu in usable:
+        rows.extend(new_post_coverage_rows(comp_tree_map[cu]["nodes"], cu))
+    cov_cols = ["Headers covered", "Content covered", "Source"]
+    coverage = pd.DataFrame(rows)[cov_cols] if rows else pd.DataFrame(columns=cov_cols)
+
+    seo = build_seo_analysis_newpost(
+        new_title=job.title,
+        competitors=usable,
+        comp_fr_map=fr_map,
+        comp_tree_map=comp_tree_map,
+        manual_fkw=job.focus_keyword,
+    )
+    seo, _ = enrich_seo_df_with_rank_and_ai(seo, manual_query=job.focus_keyword, serp=serp)
+    cq = build_content_quality_table_from_seo(
+        seo_df=seo,
+        fr_map_by_url={u: fr_map[u] for u in usable},
+        tree_map_by_url=comp_tree_map,
+        manual_query=job.focus_keyword,
+        manual_query_secondary=job.secondary_keyword,
+    )
+    ai_vis = build_ai_visibility_table(
+        query=job.focus_keyword or job.title,
+        target_url="Not applicable",
+        competitors=usable,
+        device="mobile",
+        serp=serp,
+    )
+    return {"coverage": coverage, "seo": seo, "content_quality": cq, "ai_visibility": ai_vis}, skipped
+
+def batch_serp_requests(job: BatchJob, fetcher: SharedFetcher) -> List[Tuple[str, str]]:
+    """The (query, device) pairs a job's rank column and AI visibility table will request."""
+    def fkw_of(url: str, fr: FetchResult, nodes: List[dict]) -> str:
+        fkw = clean(str(seo_row_for_page_extended("", url, fr, nodes).get("__fkw", "")))
+        return "" if fkw.lower() == "not available" else fkw
+
+    def competitor_fkw() -> str:
+        fr_map = fetcher.resolve_many(job.competitors)
+        try:
+            usable, comp_tree_map, _ = _batch_competitors(job.competitors, fr_map)
+        except BatchJobError:
+            return ""
+        return next((f for f in (fkw_of(u, fr_map[u], comp_tree_map[u]["nodes"]) for u in usable) if f), "")
+
+    if job.mode == "update":
+        bayut_fr = fetcher.resolve_many([job.bayut_url])[job.bayut_url]
+        bayut_nodes = (get_tree_from_fetchresult(bayut_fr).get("nodes") or []) if bayut_fr.ok else []
+        if not bayut_nodes:
+            return []  # the job itself reports the failure
+        rank_query = job.focus_keyword or fkw_of(job.bayut_url, bayut_fr, bayut_nodes) or competitor_fkw()
+        ai_query = job.focus_keyword or get_first_h1(bayut_nodes)
+    else:
+        rank_query = job.focus_keyword or competitor_fkw()
+        ai_query = job.focus_keyword or job.title
+    return [(q, "mobile") for q in dict.fromkeys([rank_query, ai_query]) if clean(q or "")]
+
+def prefill_batch_serp(jobs: List[BatchJob], fetcher: SharedFetcher, job_workers: int = BATCH_JOB_CONCURRENCY,
+                       log=print) -> dict:
+    """
+    Queue every job's SERP requests on the DataForSEO standard API before the jobs run.
+    All page fetches start first so they overlap the queue wait; the jobs then find both
+    their pages and their SERP responses ready.
+    """
+    for job in jobs:
+        for u in ([job.bayut_url] if job.bayut_url else []) + job.competitors:
+            fetcher.submit(u)
+
+    def plan(job: BatchJob) -> List[Tuple[str, str]]:
+        try:
+            return batch_serp_requests(job, fetcher)
+        except Exception:
+            return []
+
+    with ThreadPoolExecutor(max_workers=max(1, int(job_workers))) as pool:
+        requests_ = [r for reqs in pool.map(plan, jobs) for r in reqs]
+    client = DataForSeoTaskClient()
+    t0 = time.monotonic()
+    client.run(requests_, log=log)
+    log(f"SERP standard queue: {client.stats} in {time.monotonic() - t0:.1f}s")
+    return client.stats
+
+_EXPORT_MARKUP_RE = re.compile(r"<(?:a|div|span|details|summary|ul|ol|li|strong|b|br|p)\b[^>]*>", re.I)
+_EXPORT_LINK_RE = re.compile(r"<a\b[^>]*?href=[\"']([^\"']*)[\"'][^>]*>.*?</a>", re.I | re.S)
+_EXPORT_HIDDEN_RE = re.compile(r"<(\w+)\b[^>]*aria-hidden=[\"']true[\"'][^>]*>.*?</\1>", re.I | re.S)
+_EXPORT_BLOCK_RE = re.compile(r"</?(?:div|p|ul|ol|details|summary)\b[^>]*>|<br\s*/?>", re.I)
+
+def export_cell_text(value):
+    """
+    A table cell as plain text for file exports: links become their URL, list items become
+    "- item" lines and other block markup becomes line breaks. Cells without markup pass through.
+    """
+    if not isinstance(value, str) or not _EXPORT_MARKUP_RE.search(value):
+        return value
+    s = _EXPORT_LINK_RE.sub(lambda m: m.group(1), _EXPORT_HIDDEN_RE.sub("", value))
+    s = re.sub(r"<li\b[^>]*>", "\n- ", s, flags=re.I)
+    s = re.sub(r"<[^>]+>", " ", _EXPORT_BLOCK_RE.sub("\n", s))
+    lines = (clean(html_lib.unescape(line)) for line in s.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+def _batch_export_frame(job_id: str, name: str, df: pd.DataFrame, seo: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """One job's table as exported: URL column, no internal columns, no UI markup in cells."""
+    df = df.copy()
+    if name == "content_quality" and seo is not None and "__url" in seo.columns and len(seo) == len(df):
+        df.insert(1, "URL", list(seo["__url"]))
+    if "__url" in df.columns:
+        df = df.rename(columns={"__url": "URL"})
+    df = df.drop(columns=[c for c in df.columns if c.startswith("__")])
+    for c in df.columns:
+        df[c] = df[c].map(export_cell_text)
+    df.insert(0, "Job", job_id)
+    return df
+
+def write_batch_table(df: pd.DataFrame, path_base: str, fmt: str) -> str:
+    path = f"{path_base}.{fmt}"
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "parquet":
+        df.astype(str).to_parquet(path, index=False)
+    else:
+        df.to_json(path, orient="records", lines=True, force_ascii=False)
+    return path
+
+def run_batch(jobs: List[BatchJob], out_dir: str, fmt: str = "csv", job_workers: int = BATCH_JOB_CONCURRENCY,
+              fetch_workers: int = FETCH_MAX_CONCURRENCY, run_budget: float = 0, serp_mode: str = "live",
+              trace_path: str = TRACE_EXPORT_PATH, log=print) -> List[dict]:
+    """
+    Run jobs concurrently; write one file per table, jobs.jsonl with per-job status and,
+    when any paid SERP call was made, serp_costs with one row per call.
+    serp_mode="standard" fills the SERP cache through the DataForSEO task queue first.
+    With `trace_path`, each job's trace is appended there as one OTLP/JSON line.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    fetcher = SharedFetcher(get_fetch_agent(), max_workers=fetch_workers, run_budget=run_budget)
+    serp = SerpPlanner()  # one planner for the batch: jobs sharing a keyword share its SERP calls
+    ledger = get_serp_cost_ledger()
+    ledger_start = len(ledger)
+    if serp_mode == "standard" and DATAFORSEO_LOGIN and DATAFORSEO_PASSWORD:
+        prefill_batch_serp(jobs, fetcher, job_workers=job_workers, log=log)
+    tables: Dict[str, List[pd.DataFrame]] = {}
+    statuses: Dict[str, dict] = {}
+
+    def run_one(job: BatchJob):
+        t0 = time.monotonic()
+        runner = run_update_job if job.mode == "update" else run_new_post_job
+        trace = start_run_trace(job.job_id, mode=job.mode, competitors=len(job.competitors))
+        try:
+            frames, skipped = runner(job, fetcher, serp)
+            return job, frames, {"status": "ok", "skipped": skipped}, time.monotonic() - t0
+        except BatchJobError as e:
+            return job, {}, {"status": "error", "error": str(e)}, time.monotonic() - t0
+        except Exception as e:
+            return job, {}, {"status": "error", "error": f"{type(e).__name__}: {e}"}, time.monotonic() - t0
+        finally:
+            finish_run_trace(trace, trace_path)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, int(job_workers))) as pool:
+            futures = [pool.submit(run_one, job) for job in jobs]
+            for done, fut in enumerate(as_completed(futures), start=1):
+                job, frames, status, secs = fut.result()
+                status.update({"job": job.job_id, "mode": job.mode, "seconds": round(secs, 2)})
+                statuses[job.job_id] = status
+                for name, df in frames.items():
+                    if df is not None and not df.empty:
+                        tables.setdefault(name, []).append(_batch_export_frame(job.job_id, name, df, frames.get("seo")))
+                log(f"[{done}/{len(jobs)}] {job.job_id}: {status['status']}"
+                    + (f" ({status['error']})" if status.get("error") else "") + f" in {secs:.1f}s")
+    finally:
+        fetcher.close()
+
+    # Output rows follow the job file order, not completion order.
+    order = {job.job_id: i for i, job in enumerate(jobs)}
+    for name, frames in tables.items():
+        frames.sort(key=lambda df: order.get(df["Job"].iat[0], 0))
+        log("wrote " + write_batch_table(pd.concat(frames, ignore_index=True), os.path.join(out_dir, name), fmt))
+    costs = ledger.report(since=ledger_start)
+    if not costs.empty:
+        log("wrote " + write_batch_table(costs, os.path.join(out_dir, "serp_costs"), fmt))
+        for name, total in ledger.totals(since=ledger_start).items():
+            log(f"SERP {name}: {total['calls']} calls, ${total['cost']:.4f}")
+    ordered = [statuses[job.job_id] for job in jobs if job.job_id in statuses]
+    with open(os.path.join(out_dir, "jobs.jsonl"), "w", encoding="utf-8") as fh:
+        for status in ordered:
+            fh.write(json.dumps(status, ensure_ascii=False) + "\n")
+    return ordered
+
+def batch_main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app batch", description="Run gap analyses headlessly from a JSONL job file.")
+    parser.add_argument("jobs", help="JSONL file, one job per line")
+    parser.add_argument("--out", default="batch_out", help="output directory (default: batch_out)")
+    parser.add_argument("--format", choices=BATCH_FORMATS, default="csv")
+    parser.add_argument("--jobs-concurrency", type=int, default=BATCH_JOB_CONCURRENCY, help="jobs run at once")
+    parser.add_argument("--fetch-concurrency", type=int, default=FETCH_MAX_CONCURRENCY, help="URL fetches in flight")
+    parser.add_argument("--run-budget", type=float, default=0, help="seconds after which no more URLs are fetched (0 = no limit)")
+    parser.add_argument("--serp-mode", choices=("live", "standard"), default="live",
+                        help="standard: queue DataForSEO requests in bulk before the jobs run (cheaper, minutes slower)")
+    parser.add_argument("--trace", default=TRACE_EXPORT_PATH, metavar="PATH",
+                        help="append each job's spans to PATH as OTLP/JSON lines (default: $TRACE_EXPORT_PATH)")
+    args = parser.parse_args(argv)
+
+    try:
+        jobs = load_batch_jobs(args.jobs)
+    except (OSError, BatchJobError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    ids = [job.job_id for job in jobs]
+    if len(set(ids)) != len(ids):
+        print("error: job ids must be unique", file=sys.stderr)
+        return 2
+
+    # Cached helpers log "no runtime" on every call outside `streamlit run`.
+    st.logger.set_log_level("error")
+    log = lambda msg: print(msg, file=sys.stderr)
+    statuses = run_batch(jobs, args.out, fmt=args.format, job_workers=args.jobs_concurrency,
+                         fetch_workers=args.fetch_concurrency, run_budget=args.run_budget,
+                         serp_mode=args.serp_mode, trace_path=args.trace, log=log)
+    failed = sum(1 for s in statuses if s["status"] != "ok")
+    log(f"{len(statuses) - failed}/{len(statuses)} jobs ok")
+    return 1 if failed else 0
+
+
+# Headless entry point: skip the UI below when run as `python -m app batch ...`.
+if __name__ == "__main__" and not st.runtime.exists() and sys.argv[1:2] == ["batch"]:
+    sys.exit(batch_main(sys.argv[2:]))
+
+
 # =====================================================
 # MODE SELECTOR (CENTERED BUTTONS)
 # =====================================================
@@ -5430,24 +8466,31 @@ mode_hint = (
 st.markdown(f"<div class='mode-hint'>{html_lib.escape(mode_hint)}</div>", unsafe_allow_html=True)
 
 show_internal_fetch = st.sidebar.checkbox("Admin: show internal fetch log", value=False)
+# A run cut short by st.stop() leaves its trace active on this thread; later reruns start untraced.
+_ACTIVE_TRACE.set(None)
 
 # session state
 for k, default in [
-    ("update_df", pd.DataFrame()),
+    ("update_df", None),
     ("update_fetch", []),
-    ("seo_update_df", pd.DataFrame()),
-    ("ai_update_df", pd.DataFrame()),
-    ("cq_update_df", pd.DataFrame()),
-    ("ai_vis_update_df", pd.DataFrame()),
-    ("new_df", pd.DataFrame()),
+    ("seo_update_df", None),
+    ("ai_update_df", None),
+    ("cq_update_df", None),
+    ("ai_vis_update_df", None),
+    ("new_df", None),
     ("new_fetch", []),
-    ("seo_new_df", pd.DataFrame()),
-    ("ai_new_df", pd.DataFrame()),
-    ("cq_new_df", pd.DataFrame()),
-    ("ai_vis_new_df", pd.DataFrame()),
+    ("seo_new_df", None),
+    ("ai_new_df", None),
+    ("cq_new_df", None),
+    ("ai_vis_new_df", None),
+    ("update_trace", None),
+    ("new_trace", None),
 ]:
     if k not in st.session_state:
         st.session_state[k] = default
+for k in ["update_artifacts", "new_artifacts"]:
+    if k not in st.session_state:
+        st.session_state[k] = ArtifactStore()
 
 
 # =====================================================
@@ -5480,6 +8523,11 @@ if st.session_state.mode == "update":
             placeholder="e.g., living in business bay",
             label_visibility="collapsed",
         )
+        force_refresh_update = st.checkbox(
+            "Force refresh",
+            value=False,
+            help="Fetch every page live, ignoring results kept from earlier runs and the fetch cache.",
+        )
         run = st.form_submit_button("Run Analysis", type="primary", use_container_width=True)
 
     competitors = [c.strip() for c in competitors_text.splitlines() if c.strip()]
@@ -5492,17 +8540,42 @@ if st.session_state.mode == "update":
             st.error("Add at least one competitor URL.")
             st.stop()
 
+        st.session_state.update_trace = start_run_trace("update", competitors=len(competitors))
+        store: ArtifactStore = st.session_state.update_artifacts
+        store.retain([bayut_url.strip()] + competitors)
+        cache_mode = "bypass" if force_refresh_update else "use"
+        if force_refresh_update:
+            store.forget([bayut_url.strip()] + competitors)
+        reused = {u for u in competitors if store.fetch_result(u) is not None}
+
+        # The Bayut page is the one being edited between runs, so it is always fetched again.
         with st.spinner("Fetching Bayut…"):
-            bayut_fr_map = resolve_all_or_require_manual(agent, [bayut_url.strip()], st_key_prefix="bayut")
+            bayut_fr_map = resolve_with_store(
+                store, get_fetch_agent(), [bayut_url.strip()], st_key_prefix="bayut",
+                refresh=[bayut_url.strip()], cache_mode=cache_mode,
+            )
         bayut_fr = bayut_fr_map[bayut_url.strip()]
         if not bayut_fr.ok:
             st.warning("Bayut URL appears protected/blocked and could not be fetched automatically.")
             st.stop()
-        bayut_tree_map = ensure_headings_or_require_repaste([bayut_url.strip()], bayut_fr_map, st_key_prefix="bayut_tree")
+        bayut_tree_map = ensure_headings_with_store(store, [bayut_url.strip()], bayut_fr_map, st_key_prefix="bayut_tree")
+        bayut_fr = bayut_fr_map[bayut_url.strip()]
         bayut_nodes = bayut_tree_map[bayut_url.strip()]["nodes"]
+        bayut_key = (bayut_url.strip(), store.rev(bayut_url.strip()))
+
+        # Start the run's SERP calls now so they overlap the competitor fetches.
+        serp = SerpPlanner()
+        bayut_fkw = str(_seo_row_stored(
+            store, "Bayut", bayut_url.strip(), bayut_fr, bayut_nodes, manual_fkw_update.strip()
+        ).get("__fkw", ""))
+        serp.plan_rank_query(manual_fkw_update.strip() or ("" if bayut_fkw.lower() == "not available" else bayut_fkw))
+        query_for_ai = manual_fkw_update.strip() or get_first_h1(bayut_nodes)
+        serp.plan_ai_query(query_for_ai)
 
         with st.spinner("Fetching competitors…"):
-            comp_fr_map = resolve_all_or_require_manual(agent, competitors, st_key_prefix="comp_update")
+            comp_fr_map = resolve_with_store(
+                store, get_fetch_agent(), competitors, st_key_prefix="comp_update", cache_mode=cache_mode
+            )
         usable_competitors, skipped_competitors = split_fetch_results(competitors, comp_fr_map)
         if skipped_competitors and usable_competitors:
             st.info(
@@ -5515,25 +8588,17 @@ if st.session_state.mode == "update":
             else:
                 st.warning("All competitor websites were protected/blocked or unreachable, so there is nothing to analyze.")
             st.stop()
-        comp_tree_map = ensure_headings_or_require_repaste(
-            usable_competitors, comp_fr_map, st_key_prefix="comp_update_tree"
+        comp_tree_map = ensure_headings_with_store(
+            store, usable_competitors, comp_fr_map, st_key_prefix="comp_update_tree"
         )
 
-        all_rows = []
         internal_fetch = []
-
         for comp_url in usable_competitors:
             src = comp_fr_map[comp_url].source
-            internal_fetch.append((comp_url, f"ok ({src})"))
-            comp_nodes = comp_tree_map[comp_url]["nodes"]
-
-            all_rows.extend(update_mode_rows_header_first(
-                bayut_nodes=bayut_nodes,
-                bayut_fr=bayut_fr,
-                comp_nodes=comp_nodes,
-                comp_fr=comp_fr_map[comp_url],
-                comp_url=comp_url,
-            ))
+            internal_fetch.append((comp_url, f"ok ({src}, reused)" if comp_url in reused else f"ok ({src})"))
+        all_rows = build_update_gap_rows(
+            bayut_fr, bayut_nodes, usable_competitors, comp_fr_map, comp_tree_map, store=store, bayut_key=bayut_key
+        )
         for comp_url in skipped_competitors:
             internal_fetch.append((comp_url, f"skipped ({fetch_failure_label(comp_fr_map.get(comp_url))})"))
 
@@ -5551,12 +8616,14 @@ if st.session_state.mode == "update":
             competitors=usable_competitors,
             comp_fr_map=comp_fr_map,
             comp_tree_map=comp_tree_map,
-            manual_fkw=manual_fkw_update.strip()
+            manual_fkw=manual_fkw_update.strip(),
+            store=store
         )
 
         st.session_state.seo_update_df, st.session_state.ai_update_df = enrich_seo_df_with_rank_and_ai(
             st.session_state.seo_update_df,
-            manual_query=manual_fkw_update.strip()
+            manual_query=manual_fkw_update.strip(),
+            serp=serp
         )
 
         st.session_state.cq_update_df = build_content_quality_table_from_seo(
@@ -5564,22 +8631,35 @@ if st.session_state.mode == "update":
             fr_map_by_url={bayut_url.strip(): bayut_fr, **{u: comp_fr_map[u] for u in usable_competitors}},
             tree_map_by_url={bayut_url.strip(): {"nodes": bayut_nodes}, **{u: comp_tree_map[u] for u in usable_competitors}},
             manual_query=manual_fkw_update.strip(),
-            manual_query_secondary=manual_fkw2_update.strip()
+            manual_query_secondary=manual_fkw2_update.strip(),
+            store=store
         )
 
-        query_for_ai = manual_fkw_update.strip() or get_first_h1(bayut_nodes)
         st.session_state.ai_vis_update_df = build_ai_visibility_table(
             query=query_for_ai,
             target_url=bayut_url.strip(),
             competitors=usable_competitors,
             device="mobile",
+            serp=serp,
         )
+        finish_run_trace(st.session_state.update_trace)
 
     if show_internal_fetch and st.session_state.update_fetch:
         st.sidebar.markdown("### Internal fetch log (Update Mode)")
         st.sidebar.write(f"Playwright enabled: {PLAYWRIGHT_OK}")
+        st.sidebar.write(f"HTML parser: {HTML_PARSER} (page views: {HTML_VIEW_BACKEND})")
+        agent = get_fetch_agent()
+        if agent.cache is not None:
+            st.sidebar.write("Fetch cache:", agent.cache.stats)
+        st.sidebar.write("SERP cache:", get_serp_cache().stats)
+        st.sidebar.write("SERP spend (this process):", get_serp_cost_ledger().totals())
+        st.sidebar.write("HTTP connections:", agent.session.pool_stats.snapshot())
+        st.sidebar.write("Reused artifacts:", st.session_state.update_artifacts.stats)
         for u, s in st.session_state.update_fetch:
             st.sidebar.write(u, "—", s)
+    if show_internal_fetch:
+        render_run_trace_sidebar(st.session_state.update_trace, key="update_trace")
+        render_fetch_profiles_sidebar(key="update_profiles")
 
     has_update_results = any(
         df is not None and not df.empty
@@ -5652,6 +8732,11 @@ else:
             placeholder="e.g., living in business bay",
             label_visibility="collapsed",
         )
+        force_refresh_new = st.checkbox(
+            "Force refresh",
+            value=False,
+            help="Fetch every page live, ignoring results kept from earlier runs and the fetch cache.",
+        )
         run = st.form_submit_button("Generate Coverage", type="primary", use_container_width=True)
 
     competitors = [c.strip() for c in competitors_text.splitlines() if c.strip()]
@@ -5664,8 +8749,24 @@ else:
             st.error("Add at least one competitor URL.")
             st.stop()
 
+        st.session_state.new_trace = start_run_trace("new_post", competitors=len(competitors))
+        store: ArtifactStore = st.session_state.new_artifacts
+        store.retain(competitors)
+        cache_mode = "bypass" if force_refresh_new else "use"
+        if force_refresh_new:
+            store.forget(competitors)
+        reused = {u for u in competitors if store.fetch_result(u) is not None}
+
+        # Start the run's SERP calls now so they overlap the competitor fetches.
+        serp = SerpPlanner()
+        serp.plan_rank_query(manual_fkw_new.strip())
+        query_for_ai = manual_fkw_new.strip() or new_title.strip()
+        serp.plan_ai_query(query_for_ai)
+
         with st.spinner("Fetching competitors…"):
-            comp_fr_map = resolve_all_or_require_manual(agent, competitors, st_key_prefix="comp_new")
+            comp_fr_map = resolve_with_store(
+                store, get_fetch_agent(), competitors, st_key_prefix="comp_new", cache_mode=cache_mode
+            )
         usable_competitors, skipped_competitors = split_fetch_results(competitors, comp_fr_map)
         if skipped_competitors and usable_competitors:
             st.info(
@@ -5678,8 +8779,8 @@ else:
             else:
                 st.warning("All competitor websites were protected/blocked or unreachable, so there is nothing to analyze.")
             st.stop()
-        comp_tree_map = ensure_headings_or_require_repaste(
-            usable_competitors, comp_fr_map, st_key_prefix="comp_new_tree"
+        comp_tree_map = ensure_headings_with_store(
+            store, usable_competitors, comp_fr_map, st_key_prefix="comp_new_tree"
         )
 
         rows = []
@@ -5687,9 +8788,9 @@ else:
 
         for comp_url in usable_competitors:
             src = comp_fr_map[comp_url].source
-            internal_fetch.append((comp_url, f"ok ({src})"))
+            internal_fetch.append((comp_url, f"ok ({src}, reused)" if comp_url in reused else f"ok ({src})"))
             comp_nodes = comp_tree_map[comp_url]["nodes"]
-            rows.extend(new_post_coverage_rows(comp_nodes, comp_url))
+            rows.extend(store.memo(comp_url, "gap_rows", ("new_post",), lambda: new_post_coverage_rows(comp_nodes, comp_url)))
         for comp_url in skipped_competitors:
             internal_fetch.append((comp_url, f"skipped ({fetch_failure_label(comp_fr_map.get(comp_url))})"))
 
@@ -5705,12 +8806,14 @@ else:
             competitors=usable_competitors,
             comp_fr_map=comp_fr_map,
             comp_tree_map=comp_tree_map,
-            manual_fkw=manual_fkw_new.strip()
+            manual_fkw=manual_fkw_new.strip(),
+            store=store
         )
 
         st.session_state.seo_new_df, st.session_state.ai_new_df = enrich_seo_df_with_rank_and_ai(
             st.session_state.seo_new_df,
-            manual_query=manual_fkw_new.strip()
+            manual_query=manual_fkw_new.strip(),
+            serp=serp
         )
 
         st.session_state.cq_new_df = build_content_quality_table_from_seo(
@@ -5718,22 +8821,35 @@ else:
             fr_map_by_url={u: comp_fr_map[u] for u in usable_competitors},
             tree_map_by_url={u: comp_tree_map[u] for u in usable_competitors},
             manual_query=manual_fkw_new.strip(),
-            manual_query_secondary=manual_fkw2_new.strip()
+            manual_query_secondary=manual_fkw2_new.strip(),
+            store=store
         )
 
-        query_for_ai = manual_fkw_new.strip() or new_title.strip()
         st.session_state.ai_vis_new_df = build_ai_visibility_table(
             query=query_for_ai,
             target_url="Not applicable",
             competitors=usable_competitors,
             device="mobile",
+            serp=serp,
         )
+        finish_run_trace(st.session_state.new_trace)
 
     if show_internal_fetch and st.session_state.new_fetch:
         st.sidebar.markdown("### Internal fetch log (New Post Mode)")
         st.sidebar.write(f"Playwright enabled: {PLAYWRIGHT_OK}")
+        st.sidebar.write(f"HTML parser: {HTML_PARSER} (page views: {HTML_VIEW_BACKEND})")
+        agent = get_fetch_agent()
+        if agent.cache is not None:
+            st.sidebar.write("Fetch cache:", agent.cache.stats)
+        st.sidebar.write("SERP cache:", get_serp_cache().stats)
+        st.sidebar.write("SERP spend (this process):", get_serp_cost_ledger().totals())
+        st.sidebar.write("HTTP connections:", agent.session.pool_stats.snapshot())
+        st.sidebar.write("Reused artifacts:", st.session_state.new_artifacts.stats)
         for u, s in st.session_state.new_fetch:
             st.sidebar.write(u, "—", s)
+    if show_internal_fetch:
+        render_run_trace_sidebar(st.session_state.new_trace, key="new_trace")
+        render_fetch_profiles_sidebar(key="new_profiles")
 
     has_new_results = any(
         df is not None and not df.empty
@@ -0,0 +1,79 @@
+"""
+Per-page analysis scaling: SEO, content-quality and header-gap tables with the analysis pool.
+
+    python benchmarks/bench_analysis_pool.py [--competitors 12] [--workers 1,2,4,8]
+
+Builds one Bayut page and N competitor pages (synthetic, with dates so no HEAD requests
+are made), then times the three per-page tables at each worker count on fresh
+FetchResults. Workers=1 is the in-process path; every other count must produce identical
+tables. The first pool run per worker count (process spawn) is reported separately.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TOPICS = ["Location", "Prices and Rents", "Schools Nearby", "Transport", "Amenities", "Pros", "Cons",
+          "Restaurants", "Parks", "Healthcare", "Nightlife", "Safety", "Community", "FAQs"]
+PARA = ("Jumeirah Village Circle offers townhouses and apartments with parks, schools and clinics nearby; "
+        "rents start around AED 45,000 and service charges vary by building. ")
+
+
+def page(i, sections):
+    parts = [f"<html><head><title>Living in JVC guide {i}</title>",
+             '<meta name="description" content="Everything about living in JVC.">',
+             '<meta property="article:modified_time" content="2024-05-01T10:00:00Z"></head><body><article>',
+             f"<h1>Living in JVC: Complete Guide {i}</h1>"]
+    for j, topic in enumerate(sections):
+        parts.append(f"<h2>{topic} in JVC</h2>" + f"<p>{PARA * 6}</p>")
+        for k in range(3):
+            parts.append(f"<h3>{topic} detail {k} ({i})</h3><p>{PARA * 3}</p><ul><li>Point {k}</li></ul>")
+        parts.append(f'<p><a href="https://example{i}.com/more-{j}">More on {topic}</a></p>')
+    parts.append("<h2>FAQs</h2><h3>Is JVC good for families?</h3><p>Yes, it has many parks.</p></article></body></html>")
+    return "".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--competitors", type=int, default=12)
+    parser.add_argument("--workers", default="1,2,4,8")
+    args = parser.parse_args()
+
+    import streamlit.logger
+    streamlit.logger.set_log_level("error")
+    import app
+
+    htmls = {"https://www.bayut.com/mybayut/jvc-guide/": page(0, TOPICS[::2])}
+    for i in range(1, args.competitors + 1):
+        htmls[f"https://competitor{i}.com/jvc-guide-{i}"] = page(i, TOPICS[i % 3:])
+    urls = list(htmls)
+    bayut, comps = urls[0], urls[1:]
+
+    def tables():
+        frs = {u: app.FetchResult(True, "direct", 200, h, app.clean(h), None) for u, h in htmls.items()}
+        trees = {u: app.get_tree_from_fetchresult(fr) for u, fr in frs.items()}
+        t0 = time.perf_counter()
+        seo = app.build_seo_analysis_update(bayut, frs[bayut], trees[bayut]["nodes"], comps, frs, trees)
+        cq = app.build_content_quality_table_from_seo(seo, frs, trees)
+        gaps = app.build_update_gap_rows(frs[bayut], trees[bayut]["nodes"], comps, frs, trees)
+        secs = time.perf_counter() - t0
+        return secs, json.dumps([seo.to_dict("records"), cq.to_dict("records"), gaps], default=str)
+
+    print(f"{len(comps)} competitors, {os.cpu_count()} CPU cores")
+    print(f"{'workers':>8}{'first run s':>13}{'warm s':>9}{'speedup':>9}  identical")
+    baseline = None
+    for workers in [int(w) for w in args.workers.split(",")]:
+        app.ANALYSIS_WORKERS = workers
+        first, out = tables()
+        warm, out2 = tables()
+        if baseline is None:
+            baseline = (warm, out)
+        same = out == baseline[1] and out2 == baseline[1]
+        print(f"{workers:>8}{first:>13.2f}{warm:>9.2f}{baseline[0] / warm:>8.2f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Fetch tier attempts with and without per-domain fetch profiles, against a local server.
+
+    python benchmarks/bench_fetch_profiles.py [--rounds 8] [--urls 4]
+
+Three loopback "domains" behave like the usual competitor mix:
+- 127.0.0.1  serves articles directly
+- 127.0.0.2  blocks direct fetches (403) but reads fine through Jina/Textise
+- 127.0.0.3  blocks every tier
+Jina and Textise URLs are pointed at the same server. Each round resolves fresh URLs on all
+three domains (so the fetch cache never answers), once with the fixed tier order and once
+with an in-memory FetchProfiles. Reports network tier attempts per round and checks that
+every URL the fixed order fetched is fetched with the same source, text and HTML once profiles
+are on.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from urllib.parse import parse_qs, unquote, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SECTIONS = ["Location", "Prices", "Schools", "Transport", "Amenities", "Pros and Cons"]
+PARA = "Jumeirah Village Circle has parks, schools and clinics; rents start around AED {} a year."
+
+
+def paras(section):
+    # Distinct sentences: the article extractor drops repeated paragraphs.
+    return [f"{section}: " + PARA.format(40_000 + 1_000 * i) for i in range(4)]
+
+
+def article_html(path):
+    body = "".join(f"<h2>{s}</h2>" + "".join(f"<p>{p}</p>" for p in paras(s)) for s in SECTIONS)
+    return f"<html><head><title>{path}</title></head><body><article><h1>Guide {path}</h1>{body}</article></body></html>"
+
+
+def article_md(path):
+    return f"Title: Guide {path}\n\n# Guide {path}\n\n" + "".join(f"## {s}\n\n" + "\n\n".join(paras(s)) + "\n\n" for s in SECTIONS)
+
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code, body, ctype="text/html"):
+        raw = body.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", f"{ctype}; charset=utf-8")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_GET(self):
+        if self.path.startswith("/jina/"):
+            target = urlparse(unquote(self.path[len("/jina/"):]))
+            if target.hostname == "127.0.0.3":
+                return self._send(403, "Forbidden")
+            return self._send(200, article_md(target.path), "text/plain")
+        if self.path.startswith("/textise"):
+            target = urlparse(parse_qs(urlparse(self.path).query)["strURL"][0])
+            if target.hostname == "127.0.0.3":
+                return self._send(403, "Forbidden")
+            return self._send(200, article_html(target.path))
+        host = (self.headers.get("Host") or "").split(":")[0]
+        if host == "127.0.0.1":
+            return self._send(200, article_html(self.path))
+        return self._send(403, "<html><body>Access denied</body></html>")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=8)
+    parser.add_argument("--urls", type=int, default=4, help="URLs per domain per round")
+    args = parser.parse_args()
+
+    import streamlit.logger
+    streamlit.logger.set_log_level("error")
+    import app
+
+    server = ThreadingHTTPServer(("0.0.0.0", 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    def make_agent(profiles):
+        agent = app.FetchAgent(app.DEFAULT_HEADERS, app.IGNORE_TAGS, app.clean, app.looks_blocked,
+                               browser_pool=None, cache=None, profiles=profiles)
+        agent._jina_url = lambda u: f"http://127.0.0.1:{port}/jina/{u}"
+        agent._textise_url = lambda u: f"http://127.0.0.1:{port}/textise?strURL={app.quote_plus(u)}"
+        attempts = Counter()
+        fetch_tier = agent._fetch_tier
+
+        def counted(tier, url, *rest):
+            if tier != "playwright" or (app.PLAYWRIGHT_OK and agent.browser_pool is not None):
+                attempts[tier] += 1
+            return fetch_tier(tier, url, *rest)
+
+        agent._fetch_tier = counted
+        return agent, attempts
+
+    def urls(round_no):
+        return [f"http://127.0.0.{d}:{port}/r{round_no}/page{i}" for d in (1, 2, 3) for i in range(args.urls)]
+
+    runs = {}
+    for label, profiles in (("fixed order", None), ("profiles", app.FetchProfiles(":memory:"))):
+        agent, attempts = make_agent(profiles)
+        per_round, results = [], {}
+        t0 = time.perf_counter()
+        for r in range(args.rounds):
+            before = sum(attempts.values())
+            for u in urls(r):
+                fr = agent.resolve(u)
+                results[u] = (fr.ok, fr.source, fr.text, fr.html)
+            per_round.append(sum(attempts.values()) - before)
+        runs[label] = {"rounds": per_round, "tiers": dict(attempts), "secs": time.perf_counter() - t0,
+                       "results": results, "agent": agent}
+    server.shutdown()
+
+    n = 3 * args.urls
+    print(f"{args.rounds} rounds x {n} URLs (3 domains x {args.urls}); network tier attempts per round:")
+    for label, run in runs.items():
+        print(f"  {label:<12} {run['rounds']}  total {sum(run['rounds'])}  {run['tiers']}  {run['secs']:.1f}s")
+    fixed, learned = runs["fixed order"]["results"], runs["profiles"]["results"]
+    same = all(learned[u] == res for u, res in fixed.items() if res[0])
+    lost = sorted({urlparse(u).hostname for u, res in fixed.items() if not res[0] and learned[u][0]})
+    print(f"fetched pages identical: {same}; newly fetched domains: {lost or 'none'}")
+    print(runs["profiles"]["agent"].profiles.report().to_string(index=False))
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+Offline pipeline benchmark over the saved corpus in benchmarks/corpus/ (see corpus_tool.py).
+
+    python benchmarks/bench_pipeline.py [--repeat 5] [--competitors 1,5,20] [--workers 1] [--out run.json]
+    python benchmarks/bench_pipeline.py --compare before.json after.json
+
+Times each stage on its own (fetch, extract, tree, gap rows, SEO row, CQ row, AI
+visibility) and the whole update-mode pipeline end to end for 1, 5 and 20 competitors.
+Nothing leaves the machine: HTML pages are served from a local HTTP server through the
+direct tier, Jina/Textise pages are injected as the FetchResults those tiers return,
+SERP responses are replayed from the saved JSON, and HEAD date lookups are counted and
+must stay at zero. Every repetition starts from fresh FetchResults, so no per-page cache
+carries over.
+
+The JSON report holds median/min milliseconds per stage plus a digest of each stage's
+output; --compare prints the timing change per stage and flags any digest that moved,
+so a speedup that changed the tables shows up next to its number.
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+STAGES = ("fetch", "extract", "tree", "gap_rows", "seo_row", "cq_row", "ai_visibility")
+
+
+def load_corpus(corpus_dir):
+    with open(os.path.join(corpus_dir, "manifest.json"), encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    pages = [dict(manifest["bayut"], role="bayut")] + [dict(p, role="competitor") for p in manifest["competitors"]]
+    for p in pages:
+        with open(os.path.join(corpus_dir, p["file"]), encoding="utf-8") as fh:
+            p["body"] = fh.read()
+    serp = {}
+    for provider, rel in manifest.get("serp", {}).items():
+        with open(os.path.join(corpus_dir, rel), encoding="utf-8") as fh:
+            serp[provider] = json.load(fh)
+    return manifest, pages, serp
+
+
+def serve(pages):
+    """Serve the HTML pages on 127.0.0.1; returns (server, {corpus url: local url})."""
+    by_path = {f"/{p['file']}": p["body"].encode("utf-8") for p in pages if p["kind"] == "html"}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            body = by_path.get(self.path)
+            self.send_response(200 if body else 404)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body or b"")))
+            self.end_headers()
+            self.wfile.write(body or b"")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    return server, {p["url"]: f"{base}/{p['file']}" for p in pages if p["kind"] == "html"}
+
+
+def digest(obj):
+    return hashlib.sha1(json.dumps(obj, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:12]
+
+
+def git_commit():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--", "app.py"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        return sha + ("+dirty" if dirty else "")
+    except Exception:
+        return "unknown"
+
+
+class Bench:
+    def __init__(self, app, manifest, pages, serp):
+        self.app = app
+        self.query = manifest["query"]
+        self.pages = {p["url"]: p for p in pages}
+        self.bayut = manifest["bayut"]["url"]
+        self.competitors = [p["url"] for p in manifest["competitors"]]
+        self.server, self.local = serve(pages)
+        self.agent = app.FetchAgent(app.DEFAULT_HEADERS, app.IGNORE_TAGS, app.clean, app.looks_blocked,
+                                    browser_pool=None, cache=None)
+        self.head_calls = 0
+
+        def no_head(url):
+            self.head_calls += 1
+            return ""
+
+        app._head_last_modified = no_head
+        cache = app.get_serp_cache()
+        if "dataforseo" in serp:
+            cache.put("dataforseo", self.query, manifest["device"], app._dataforseo_location_key(), serp["dataforseo"])
+        if "serpapi" in serp:
+            cache.put("serpapi", self.query, manifest["device"], app.SERPAPI_LOCATION_KEY, serp["serpapi"])
+        self.providers = [p for p in ("dataforseo", "serpapi") if p in serp]
+
+    # ---- inputs -------------------------------------------------------------
+    def fetch(self, urls, concurrent=False):
+        """FetchResults keyed by corpus URL; HTML goes through the direct tier, reader text is injected."""
+        app = self.app
+        html_urls = [u for u in urls if self.pages[u]["kind"] == "html"]
+        if concurrent:
+            runner = app.AsyncFetchAgent(self.agent)
+            try:
+                got = runner.resolve_many_sync([self.local[u] for u in html_urls])
+            finally:
+                runner.close()
+            fetched = {u: got[self.local[u]] for u in html_urls}
+        else:
+            fetched = {u: self.agent.resolve(self.local[u]) for u in html_urls}
+        bad = [u for u, fr in fetched.items() if fr.source != "direct"]
+        if bad:
+            raise SystemExit(f"direct tier did not clear the quality bar for {bad}; the run would leave the machine")
+        out = {}
+        for u in urls:
+            p = self.pages[u]
+            out[u] = fetched[u] if p["kind"] == "html" else app.FetchResult(True, p["kind"], 200, "", p["body"], None)
+        return out
+
+    def fresh(self, urls):
+        """Fresh FetchResults without the HTTP round trip (direct-tier shape: raw html + extracted text)."""
+        app, out = self.app, {}
+        for u in urls:
+            p = self.pages[u]
+            if p["kind"] == "html":
+                out[u] = app.FetchResult(True, "direct", 200, p["body"], self.agent._extract_article_text_from_html(p["body"]), None)
+            else:
+                out[u] = app.FetchResult(True, p["kind"], 200, "", p["body"], None)
+        return out
+
+    def trees(self, frs):
+        return {u: self.app.get_tree_from_fetchresult(fr) for u, fr in frs.items()}
+
+    # ---- stages -------------------------------------------------------------
+    # Each returns (items, output); prerequisites are built before the clock starts.
+    def stage(self, name):
+        app = self.app
+        urls = [self.bayut] + self.competitors
+        if name == "fetch":
+            html_urls = [u for u in urls if self.pages[u]["kind"] == "html"]
+            return lambda: (len(html_urls), [self.agent.resolve(self.local[u]).text for u in html_urls])
+        if name == "extract":
+            bodies = [self.pages[u]["body"] for u in urls if self.pages[u]["kind"] == "html"]
+            return lambda: (len(bodies), [self.agent._extract_article_text_from_html(b) for b in bodies])
+        frs = self.fresh(urls)
+        if name == "tree":
+            return lambda: (len(frs), self.trees(frs))
+        trees = self.trees(frs)
+        if name == "gap_rows":
+            return lambda: (len(self.competitors), [
+                app.update_mode_rows_header_first(trees[self.bayut]["nodes"], frs[self.bayut], trees[u]["nodes"], frs[u], u)
+                for u in self.competitors])
+        if name == "seo_row":
+            return lambda: (len(urls), [
+                app.seo_row_for_page_extended("Bayut" if u == self.bayut else app.site_name(u), u, frs[u], trees[u]["nodes"])
+                for u in urls])
+        seo = app.build_seo_analysis_update(self.bayut, frs[self.bayut], trees[self.bayut]["nodes"], self.competitors, frs, trees)
+        if name == "cq_row":
+            return lambda: (len(seo), app.build_content_quality_table_from_seo(seo, frs, trees).to_dict("records"))
+        if name == "ai_visibility":
+            return lambda: (len(self.providers), self.ai_visibility(seo))
+        raise KeyError(name)
+
+    def ai_visibility(self, seo, competitors=None):
+        app, out = self.app, []
+        competitors = self.competitors if competitors is None else competitors
+        saved = app.DATAFORSEO_LOGIN, app.DATAFORSEO_PASSWORD, app.SERPAPI_API_KEY
+        try:
+            for provider in self.providers:
+                app.DATAFORSEO_LOGIN = app.DATAFORSEO_PASSWORD = "replay" if provider == "dataforseo" else ""
+                app.SERPAPI_API_KEY = "replay" if provider == "serpapi" else ""
+                out.append(app.build_ai_visibility_table(self.query, self.bayut, competitors).to_dict("records"))
+            app.DATAFORSEO_LOGIN = app.DATAFORSEO_PASSWORD = "replay"
+            out.append(app.enrich_seo_df_with_rank_and_ai(seo, self.query)[0].to_dict("records"))
+        finally:
+            app.DATAFORSEO_LOGIN, app.DATAFORSEO_PASSWORD, app.SERPAPI_API_KEY = saved
+        return out
+
+    def end_to_end(self, n):
+        app = self.app
+        comps = self.competitors[:n]
+        frs = self.fetch([self.bayut] + comps, concurrent=True)
+        trees = self.trees(frs)
+        bayut_nodes = trees[self.bayut]["nodes"]
+        gaps = app.build_update_gap_rows(frs[self.bayut], bayut_nodes, comps, frs, trees)
+        seo = app.build_seo_analysis_update(self.bayut, frs[self.bayut], bayut_nodes, comps, frs, trees)
+        ai = self.ai_visibility(seo, comps)
+        cq = app.build_content_quality_table_from_seo(seo, frs, trees)
+        return len(comps), [gaps, seo.to_dict("records"), cq.to_dict("records"), ai]
+
+
+def measure(make, repeat):
+    """Run `make()` (which sets up and returns the timed callable) `repeat` times."""
+    times, items, out = [], 0, None
+    for _ in range(repeat):
+        fn = make()
+        t0 = time.perf_counter()
+        items, out = fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    median = statistics.median(times)
+    return {
+        "items": items, "median_ms": round(median, 2), "min_ms": round(min(times), 2),
+        "per_item_ms": round(median / max(items, 1), 3), "runs": len(times), "digest": digest(out),
+    }
+
+
+def run(args):
+    os.environ.update({
+        "SERP_CACHE_MODE": "replay", "SERP_CACHE_PATH": "", "FETCH_CACHE_PATH": "",
+        "ANALYSIS_WORKERS": str(args.workers),
+    })
+    import streamlit.logger
+    streamlit.logger.set_log_level("error")
+    import app
+
+    manifest, pages, serp = load_corpus(args.corpus)
+    bench = Bench(app, manifest, pages, serp)
+    sizes = [n for n in (int(x) for x in args.competitors.split(",")) if n <= len(bench.competitors)]
+    report = {
+        "meta": {
+            "commit": git_commit(), "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count(),
+            "html_parser": app.HTML_PARSER, "html_view_backend": app.HTML_VIEW_BACKEND, "analysis_workers": app.analysis_worker_count(),
+            "corpus": {"origin": manifest.get("origin"), "query": manifest["query"], "pages": len(pages),
+                       "kinds": {k: sum(1 for p in pages if p["kind"] == k) for k in ("html", "jina", "textise")}},
+            "repeat": args.repeat,
+        },
+        "stages": {}, "end_to_end": {},
+    }
+    bench.end_to_end(1)  # warm-up: imports, lazy regexes, the analysis pool if any
+    for name in STAGES:
+        report["stages"][name] = measure(lambda: bench.stage(name), args.repeat)
+        print(f"{name:<16}{report['stages'][name]['median_ms']:>10.1f} ms", file=sys.stderr)
+    for n in sizes:
+        report["end_to_end"][str(n)] = measure(lambda: (lambda: bench.end_to_end(n)), args.repeat)
+        print(f"{'e2e x' + str(n):<16}{report['end_to_end'][str(n)]['median_ms']:>10.1f} ms", file=sys.stderr)
+    report["meta"]["head_requests"] = bench.head_calls
+    bench.server.shutdown()
+    if bench.head_calls:
+        print(f"warning: {bench.head_calls} HEAD date lookups were attempted", file=sys.stderr)
+
+    text = json.dumps(report, indent=1)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+
+def compare(old_path, new_path):
+    with open(old_path, encoding="utf-8") as fh:
+        old = json.load(fh)
+    with open(new_path, encoding="utf-8") as fh:
+        new = json.load(fh)
+    print(f"{old['meta']['commit']} -> {new['meta']['commit']}")
+    print(f"{'stage':<18}{'before ms':>11}{'after ms':>11}{'change':>9}  output")
+    for section, prefix in (("stages", ""), ("end_to_end", "e2e x")):
+        for name, after in new.get(section, {}).items():
+            before = old.get(section, {}).get(name)
+            if not before:
+                print(f"{prefix + name:<18}{'-':>11}{after['median_ms']:>11.1f}{'':>9}  new")
+                continue
+            change = (after["median_ms"] - before["median_ms"]) / max(before["median_ms"], 1e-9) * 100
+            same = "same" if after["digest"] == before["digest"] else "CHANGED"
+            print(f"{prefix + name:<18}{before['median_ms']:>11.1f}{after['median_ms']:>11.1f}{change:>+8.1f}%  {same}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", default=os.path.join(HERE, "corpus"))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--competitors", default="1,5,20")
+    parser.add_argument("--workers", type=int, default=1, help="ANALYSIS_WORKERS for the run (1 = in-process)")
+    parser.add_argument("--out", default="", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
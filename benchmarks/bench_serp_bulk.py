@@ -0,0 +1,84 @@
+"""
+SERP rank-check benchmark: live endpoint vs the DataForSEO standard task queue, against the local mock.
+
+    python benchmarks/bench_serp_bulk.py [--keywords 300] [--queue-delay 5] [--live-latency 1.5]
+
+Both paths resolve the same keywords with an empty in-memory SERP cache. Live issues one
+request per keyword through SERP_PLAN_CONCURRENCY threads (what a batch run does today);
+the bulk client posts 100 keywords per task_post and polls tasks_ready. Reports wall time,
+HTTP calls per endpoint and billed cost, and checks both paths yield the same rank maps.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dataforseo_mock import start_mock  # noqa: E402
+
+AREAS = ["jvc", "dubai marina", "downtown dubai", "business bay", "al barsha", "jlt", "palm jumeirah",
+         "arabian ranches", "dubai hills", "mirdif", "al nahda", "deira", "silicon oasis", "motor city", "sharjah"]
+TOPICS = ["apartments for rent in", "villas for sale in", "living in", "pros and cons of", "schools near",
+          "restaurants in", "cost of living in", "best buildings in", "things to do in", "metro stations near",
+          "parks in", "supermarkets in", "gyms in", "hospitals near", "beaches near", "malls near",
+          "studio flats in", "townhouses in", "commute from", "history of"]
+
+
+def keywords(n):
+    return [f"{t} {a}" for t in TOPICS for a in AREAS][:n]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keywords", type=int, default=300)
+    parser.add_argument("--queue-delay", type=float, default=5.0, help="mock seconds before a task is ready")
+    parser.add_argument("--live-latency", type=float, default=1.5, help="mock seconds per live request")
+    args = parser.parse_args()
+
+    server, base = start_mock(queue_delay=args.queue_delay, live_latency=args.live_latency)
+    os.environ.update({
+        "DATAFORSEO_API_BASE": base, "DATAFORSEO_LOGIN": "bench", "DATAFORSEO_PASSWORD": "bench",
+        "SERP_CACHE_PATH": "", "FETCH_CACHE_PATH": "", "DATAFORSEO_POLL_INTERVAL": "1",
+    })
+    import streamlit.logger
+    streamlit.logger.set_log_level("error")
+    import app
+
+    kws = keywords(args.keywords)
+    cache, ledger, calls = app.get_serp_cache(), app.get_serp_cost_ledger(), server.state.calls
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=app.SERP_PLAN_CONCURRENCY) as pool:
+        live = dict(zip(kws, pool.map(lambda q: app.dataforseo_serp_cached(q, "mobile"), kws)))
+    live_secs = time.perf_counter() - t0
+    live_calls, live_cost = dict(calls), ledger.totals().get("dataforseo/live", {}).get("cost", 0.0)
+
+    cache.clear()
+    for k in calls:
+        calls[k] = 0
+    start = len(ledger)
+    t0 = time.perf_counter()
+    bulk = app.DataForSeoTaskClient().run([(q, "mobile") for q in kws])
+    bulk_secs = time.perf_counter() - t0
+    bulk_cost = ledger.totals(since=start).get("dataforseo/standard", {}).get("cost", 0.0)
+
+    same = all(
+        app._dataforseo_rank_map(live[q]) == app._dataforseo_rank_map(bulk[(app.normalize_serp_query(q), "mobile")])
+        for q in kws
+    )
+    served = sum(1 for q in kws if app.dataforseo_serp_cached(q, "mobile").get("tasks"))
+    server.shutdown()
+
+    print(f"{len(kws)} keywords (mock: live {args.live_latency}s/request, queue {args.queue_delay}s)")
+    print(f"{'path':<10}{'wall s':>9}{'HTTP calls':>12}{'cost USD':>11}  calls by endpoint")
+    print(f"{'live':<10}{live_secs:>9.1f}{sum(live_calls.values()):>12}{live_cost:>11.4f}  {live_calls}")
+    print(f"{'standard':<10}{bulk_secs:>9.1f}{sum(calls.values()):>12}{bulk_cost:>11.4f}  {dict(calls)}")
+    print(f"rank maps identical: {same}; served from cache afterwards: {served}/{len(kws)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Startup benchmark: cold import of app.py and the per-rerun cost of re-executing the script.
+
+    python benchmarks/bench_startup.py [--runs 5] [--baseline OLD_APP.py]
+
+Cold start imports app.py in a fresh interpreter (bare mode, no browser session) and
+records which heavy dependencies were loaded. The rerun figure re-executes the compiled
+script in-process with modules already imported, the way Streamlit's script runner does
+on every widget interaction. Pass --baseline (e.g. `git show HEAD~1:app.py > /tmp/old.py`)
+to compare against another revision.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ["pandas", "requests", "bs4", "wordfreq", "playwright", "numpy", "urllib3"]
+
+_COLD = r"""
+import importlib.util, json, sys, time
+import streamlit.logger
+streamlit.logger.set_log_level("error")
+t0 = time.perf_counter()
+spec = importlib.util.spec_from_file_location("__main__", sys.argv[1])
+mod = importlib.util.module_from_spec(spec)
+sys.modules["__main__"] = mod
+spec.loader.exec_module(mod)
+elapsed = time.perf_counter() - t0
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in json.loads(sys.argv[2]) if m in sys.modules]}))
+"""
+
+_RERUN = r"""
+import json, sys, time, types
+import streamlit.logger
+streamlit.logger.set_log_level("error")
+path, runs = sys.argv[1], int(sys.argv[2])
+code = compile(open(path, encoding="utf-8").read(), path, "exec")
+
+def run_once():
+    mod = types.ModuleType("__main__")
+    mod.__file__ = path
+    sys.modules["__main__"] = mod
+    t0 = time.perf_counter()
+    exec(code, mod.__dict__)
+    return time.perf_counter() - t0
+
+run_once()  # first run pays the imports
+print(json.dumps([run_once() for _ in range(runs)]))
+"""
+
+
+def _python(script, *args):
+    out = subprocess.run(
+        [sys.executable, "-c", script, *args],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+        env={**os.environ, "FETCH_CACHE_PATH": ""},
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def measure(path, runs):
+    path = os.path.abspath(path)
+    cold = [_python(_COLD, path, json.dumps(HEAVY)) for _ in range(runs)]
+    reruns = _python(_RERUN, path, str(runs * 4))
+    return {
+        "cold_ms": statistics.median(c["seconds"] for c in cold) * 1000,
+        "rerun_ms": statistics.median(reruns) * 1000,
+        "loaded": cold[-1]["loaded"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--baseline", help="another app.py to compare against")
+    args = parser.parse_args()
+
+    targets = [("current", os.path.join(ROOT, "app.py"))]
+    if args.baseline:
+        targets.append(("baseline", args.baseline))
+
+    print(f"{'build':<10}{'cold import ms':>16}{'rerun ms':>12}  heavy modules loaded at startup")
+    for name, path in targets:
+        r = measure(path, args.runs)
+        print(f"{name:<10}{r['cold_ms']:>16.1f}{r['rerun_ms']:>12.1f}  {', '.join(r['loaded']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
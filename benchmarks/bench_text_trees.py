@@ -0,0 +1,70 @@
+"""
+Plain-text tree builders: scaling against the original implementations.
+
+    python benchmarks/bench_text_trees.py [--lines 4000]
+
+The original builders and the parity fixtures live in tests/test_text_trees.py (pytest checks
+byte-identical JSON there); this script re-runs that parity check as a quick sanity line, then
+times both builders on one unheaded section grown line by line, the case that was quadratic.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+import app  # noqa: E402
+from test_text_trees import BUILDERS, FIXTURES, REFERENCES, read_fixture  # noqa: E402
+
+BODY = "Residents enjoy parks, schools and quick access to Sheikh Mohammed Bin Zayed Road."
+_ref_reader = REFERENCES["reader"]
+_ref_heuristic = REFERENCES["heuristic"]
+
+
+def _dump(nodes):
+    return json.dumps(nodes, ensure_ascii=False)
+
+
+def check_parity():
+    failures = []
+    for name in FIXTURES:
+        text = read_fixture(name)
+        for label, (build, as_lines) in BUILDERS.items():
+            expected = _dump(REFERENCES[label](text))
+            if _dump(build(text)) != expected:
+                failures.append(f"{label} / {name} (str)")
+            if _dump(build(as_lines(text))) != expected:
+                failures.append(f"{label} / {name} (lines)")
+    return failures
+
+
+def _timed(fn, text):
+    t0 = time.perf_counter()
+    fn(text)
+    return (time.perf_counter() - t0) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=4000)
+    args = parser.parse_args()
+
+    failures = check_parity()
+    print(f"parity: {len(FIXTURES)} fixtures x 2 builders x (str, lines): "
+          + ("identical" if not failures else "MISMATCH " + ", ".join(failures)))
+
+    print(f"\n{'builder':<12}{'lines':>8}{'original ms':>14}{'streaming ms':>15}")
+    for n in (args.lines // 4, args.lines):
+        paste = "\n".join(f"{BODY} sentence {i}." for i in range(n))
+        reader = "# Only Heading\n" + paste
+        print(f"{'reader':<12}{n:>8}{_timed(_ref_reader, reader):>14.1f}{_timed(app.build_tree_from_reader_text, reader):>15.1f}")
+        print(f"{'heuristic':<12}{n:>8}{_timed(_ref_heuristic, paste):>14.1f}{_timed(app.build_tree_from_plain_text_heuristic, paste):>15.1f}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Microbenchmark: topic-token canonicalization and header matching on a realistic page pair.
+
+    python benchmarks/bench_vocabulary.py
+
+Compares the precompiled alias tables / memoized normalizers against the original
+per-call implementations (reproduced below) and times one full header-gap pass.
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+
+# Original implementations, kept here only as the baseline.
+def _ref_stem_token(tok):
+    t = app.clean(tok).lower()
+    if len(t) > 5 and t.endswith("ies"):
+        return t[:-3] + "y"
+    if len(t) > 3 and t.endswith("s"):
+        return t[:-1]
+    return t
+
+
+def _ref_canonical_topic_token(tok):
+    stem = _ref_stem_token(tok)
+    for key, vals in app.TOPIC_TOKEN_ALIASES.items():
+        bucket = {_ref_stem_token(key)} | {_ref_stem_token(v) for v in vals}
+        if stem in bucket:
+            return _ref_stem_token(key)
+    return stem
+
+
+def _ref_token_aliases(tok):
+    stem = _ref_stem_token(tok)
+    aliases = {stem}
+    for groups in (app.TOPIC_TOKEN_ALIASES, app.SUBTOPIC_TOKEN_ALIASES):
+        for key, vals in groups.items():
+            bucket = {_ref_stem_token(key)} | {_ref_stem_token(v) for v in vals}
+            if stem in bucket:
+                aliases |= bucket
+                break
+    return aliases
+
+
+SECTIONS = [
+    ("Best Places to Visit in Sharjah", "The Light Village, Al Noor Island and the Heritage Area are the top spots."),
+    ("Ticket Prices and Entry Fees", "Entry costs AED 15 for adults; children under 5 enter free of charge."),
+    ("Opening Hours and Timings", "Open daily from 4pm to midnight, with late hours on weekends."),
+    ("Location and How to Get There", "The venue sits near Al Majaz Waterfront; take the metro then a taxi."),
+    ("Events and Activities", "Light shows, festivals and family activities run throughout the season."),
+    ("Pros of Living Nearby", "Advantages include quiet streets, schools and good community facilities."),
+    ("Cons to Consider", "Drawbacks include traffic at peak hours and limited parking spaces."),
+    ("Practical Tips for Visitors", "Arrive early, bring water and check the event schedule in advance."),
+    ("Nearby Restaurants and Cafes", "Waterfront cafes and family restaurants are a short walk away."),
+    ("Frequently Asked Questions", "Is parking free? Yes, on weekdays."),
+]
+
+
+def _page(sections, extra=0):
+    parts = ["<html><body><article><h1>Sharjah Light Village Guide</h1>"]
+    for i, (h, body) in enumerate(sections):
+        parts.append(f"<h2>{h}</h2><p>{body} {body}</p>")
+        for j in range(extra):
+            parts.append(f"<h3>{h.split()[0]} detail {j} for section {i}</h3><p>{body}</p>")
+    parts.append("</article></body></html>")
+    return "".join(parts)
+
+
+def main():
+    tokens = [w for h, body in SECTIONS for w in (h + " " + body).lower().replace(",", " ").split()] * 20
+
+    def clear():
+        app._stem_token.cache_clear()
+        app._norm_header_cached.cache_clear()
+
+    rows = []
+    for name, ref, cur in [
+        ("_canonical_topic_token", _ref_canonical_topic_token, app._canonical_topic_token),
+        ("_token_aliases", _ref_token_aliases, app._token_aliases),
+    ]:
+        t_ref = timeit.timeit(lambda: [ref(t) for t in tokens], number=5)
+        clear()
+        t_cur = timeit.timeit(lambda: [cur(t) for t in tokens], number=5)
+        per_call = 1e6 / (5 * len(tokens))
+        rows.append((name, t_ref * per_call, t_cur * per_call))
+
+    bayut_html = _page(SECTIONS[::2], extra=2)
+    comp_html = _page(SECTIONS, extra=3)
+    bayut_fr = app.FetchResult(True, "direct", 200, bayut_html, app.clean(bayut_html), None)
+    comp_fr = app.FetchResult(True, "direct", 200, comp_html, app.clean(comp_html), None)
+    bayut_nodes = app.build_tree_from_html(bayut_html)
+    comp_nodes = app.build_tree_from_html(comp_html)
+
+    def gap_pass():
+        app.update_mode_rows_header_first(bayut_nodes, bayut_fr, comp_nodes, comp_fr, "https://example.com/guide")
+
+    clear()
+    cold = timeit.timeit(gap_pass, number=1)
+    warm = timeit.timeit(gap_pass, number=5) / 5
+
+    print(f"{'function':<26}{'original us/call':>18}{'current us/call':>18}{'speedup':>10}")
+    for name, ref_us, cur_us in rows:
+        print(f"{name:<26}{ref_us:>18.2f}{cur_us:>18.2f}{ref_us / max(cur_us, 1e-9):>9.1f}x")
+    print(f"\nheader-gap pass on page pair: cold {cold * 1000:.1f} ms, warm {warm * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
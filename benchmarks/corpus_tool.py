@@ -0,0 +1,300 @@
+"""
+Build the benchmark corpus in benchmarks/corpus/ (read by bench_pipeline.py).
+
+    python benchmarks/corpus_tool.py synth
+    python benchmarks/corpus_tool.py record --bayut URL --query "living in jvc" COMPETITOR_URL ...
+
+synth regenerates the shipped corpus: one Bayut guide plus twenty competitor guides on the
+same topic (HTML in four site layouts, Jina-reader markdown, Textise text) and saved
+DataForSEO / SerpApi responses for the query. It is seeded, so every checkout benchmarks
+the same bytes. Competitor domains use the reserved .example TLD.
+
+record saves live pages through the app's own fetch tiers (direct HTML, else Jina, else
+Textise) and, when credentials are configured, the live SERP responses, into a corpus
+directory with the same manifest layout (--out, default benchmarks/corpus_recorded).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+CORPUS = os.path.join(HERE, "corpus")
+
+QUERY = "living in jvc"
+BAYUT_URL = "https://www.bayut.com/mybayut/living-in-jvc-guide/"
+SECTIONS = [
+    "About Jumeirah Village Circle", "Location and Connectivity", "Property Prices in JVC", "Rental Yields",
+    "Apartments for Rent in JVC", "Villas and Townhouses", "Best Buildings in JVC", "Schools Near JVC",
+    "Nurseries and Childcare", "Hospitals and Clinics", "Supermarkets and Groceries", "Restaurants and Cafes",
+    "Parks and Green Spaces", "Gyms and Fitness", "Public Transport", "Traffic and Parking",
+    "Pros of Living in JVC", "Cons of Living in JVC", "Cost of Living", "Service Charges",
+    "Community and Lifestyle", "Safety and Security", "Upcoming Developments", "Nearby Communities",
+    "Tips for Tenants", "Tips for Buyers", "Mosques Nearby", "Pet-Friendly Buildings",
+]
+SUBS = ["Overview", "Prices", "What to Expect", "Top Picks", "Key Facts", "Things to Know"]
+FAQS = [
+    ("Is JVC a good place to live?", "Yes, JVC suits families and young professionals looking for value."),
+    ("How far is JVC from Dubai Marina?", "Around 15 to 20 minutes by car outside rush hour."),
+    ("Is there a metro station in JVC?", "No, the nearest stations are on the Red Line; buses connect to them."),
+    ("What is the average rent in JVC?", "Studios start near AED 45,000 a year and two-bed units near AED 95,000."),
+    ("Are there schools in JVC?", "Yes, several nurseries and schools operate inside the community."),
+    ("Is JVC freehold?", "Yes, foreigners can buy property in JVC on a freehold basis."),
+]
+WORDS = ("community residents buildings apartments townhouses villas rent prices investors families amenities "
+         "parks schools clinics supermarkets roads access traffic yields tenants landlords developers handover "
+         "service charges layouts balconies pools gyms cafes restaurants mosques districts circle villages "
+         "affordable popular spacious convenient quiet central green modern practical").split()
+LAYOUTS = ("wordpress", "div", "faq_schema", "heavy")
+
+
+def _sentence(rng, topic):
+    words = rng.sample(WORDS, 9)
+    n = rng.randint(8, 90)
+    return (f"{topic} in JVC offers {words[0]} {words[1]} and {words[2]} {words[3]} near {words[4]} {words[5]}, "
+            f"with {n}% of {words[6]} citing {words[7]} {words[8]}.")
+
+
+def _paragraph(rng, topic, n=None):
+    return " ".join(_sentence(rng, topic) for _ in range(n or rng.randint(3, 6)))
+
+
+def _outline(rng, bayut=False):
+    count = 10 if bayut else rng.randint(9, 15)
+    picked = rng.sample(SECTIONS, count)
+    return [(h, rng.sample(SUBS, rng.randint(0, 3))) for h in picked]
+
+
+def _date(rng):
+    return date(2024, 1, 1) + timedelta(days=rng.randint(0, 500))
+
+
+def html_page(rng, url, title, outline, layout):
+    updated = _date(rng)
+    body = [f"<h1>{title}</h1>",
+            f'<p class="byline">Last updated: {updated.strftime("%B %d, %Y")}</p>',
+            f"<p>{_paragraph(rng, 'Life', 4)}</p>"]
+    for h2, subs in outline:
+        body.append(f'<h2 id="{h2.lower().replace(" ", "-")}">{h2}</h2><p>{_paragraph(rng, h2)}</p>')
+        if rng.random() < 0.3:
+            rows = "".join(f"<tr><td>{rng.choice(['Studio', '1 Bed', '2 Bed', '3 Bed'])}</td>"
+                           f"<td>AED {rng.randint(40, 190)},000</td></tr>" for _ in range(4))
+            body.append(f"<table><tr><th>Unit</th><th>Annual rent</th></tr>{rows}</table>")
+        if rng.random() < 0.4:
+            body.append("<ul>" + "".join(f"<li>{_sentence(rng, h2)}</li>" for _ in range(rng.randint(3, 6))) + "</ul>")
+        if rng.random() < 0.3:
+            body.append(f'<img src="https://cdn.example/img/{rng.randint(1, 999)}.jpg" alt="{h2}">')
+        for sub in subs:
+            body.append(f"<h3>{h2.split()[0]} {sub}</h3><p>{_paragraph(rng, sub, 2)}</p>")
+        if rng.random() < 0.25:
+            body.append(f'<p>Read more: <a href="{url.rsplit("/", 2)[0]}/{rng.choice(WORDS)}-guide/">{h2} guide</a></p>')
+    faqs = rng.sample(FAQS, rng.randint(3, 6))
+    if layout == "faq_schema":
+        body.append('<h2>FAQs</h2><div class="faq-accordion">' + "".join(
+            f'<div class="faq-item"><h3>{q}</h3><div class="faq-answer"><p>{a}</p></div></div>' for q, a in faqs) + "</div>")
+    else:
+        body.append("<h2>Frequently Asked Questions</h2>" + "".join(f"<h3>{q}</h3><p>{a}</p>" for q, a in faqs))
+    if rng.random() < 0.5:
+        body.append("<h2>References</h2><ul><li>Dubai Land Department rental index</li><li>RERA service charge index</li></ul>")
+    article = "".join(body)
+
+    ld = [{"@context": "https://schema.org", "@type": "Article", "headline": title,
+           "dateModified": updated.isoformat(), "author": {"@type": "Organization", "name": url.split("/")[2]}}]
+    if layout == "faq_schema":
+        ld.append({"@context": "https://schema.org", "@type": "FAQPage", "mainEntity": [
+            {"@type": "Question", "name": q, "acceptedAnswer": {"@type": "Answer", "text": a}} for q, a in faqs]})
+    head = (f"<head><meta charset=\"utf-8\"><title>{title} | {url.split('/')[2]}</title>"
+            f'<meta name="description" content="{_sentence(rng, "Living")}">'
+            '<meta name="viewport" content="width=device-width, initial-scale=1">'
+            f'<meta property="article:modified_time" content="{updated.isoformat()}T09:00:00+04:00">'
+            f'<link rel="canonical" href="{url}">'
+            + "".join(f'<script type="application/ld+json">{json.dumps(x)}</script>' for x in ld)
+            + "<style>body{font-family:sans-serif}.sidebar{width:300px}</style></head>")
+    nav = "<nav><ul>" + "".join(f'<li><a href="/{w}/">{w.title()}</a></li>' for w in rng.sample(WORDS, 8)) + "</ul></nav>"
+    footer = "<footer><p>Copyright 2024. All rights reserved.</p><a href=\"/privacy/\">Privacy</a></footer>"
+    sidebar = ('<aside class="sidebar"><h3>Related Articles</h3><ul>'
+               + "".join(f'<li><a href="/{w}-guide/">{w.title()} guide</a></li>' for w in rng.sample(WORDS, 5))
+               + "</ul></aside>")
+    if layout == "wordpress":
+        main = f'<article class="post"><div class="entry-content">{article}</div></article>{sidebar}'
+    elif layout == "div":
+        main = f'<div class="wrapper"><div class="post-body">{article}</div><div class="widgets">{sidebar}</div></div>'
+    elif layout == "faq_schema":
+        main = f"<main><article>{article}</article></main>{sidebar}"
+    else:
+        scripts = "".join(f"<script>window.dataLayer=window.dataLayer||[];dataLayer.push({{e:{i}}});</script>" for i in range(12))
+        ads = '<div class="ad-slot"><iframe src="https://ads.example/slot"></iframe></div>'
+        main = f'{scripts}<div id="content" class="blog-content">{ads}{article}{ads}</div>{sidebar}<div class="comments"><h3>Leave a Reply</h3></div>'
+    return f"<!doctype html><html lang=\"en\">{head}<body><header>{nav}</header>{main}{footer}</body></html>"
+
+
+def jina_page(rng, url, title, outline):
+    updated = _date(rng)
+    out = [f"Title: {title}", f"URL Source: {url}", f"Published Time: {updated.isoformat()}T08:00:00Z", "",
+           "Markdown Content:", f"# {title}", "", f"Last updated on {updated.strftime('%B %d, %Y')}", "",
+           _paragraph(rng, "Life", 3), ""]
+    for h2, subs in outline:
+        out += [f"## {h2}", "", _paragraph(rng, h2), ""]
+        if rng.random() < 0.4:
+            out += [f"*   {_sentence(rng, h2)}" for _ in range(3)] + [""]
+        for sub in subs:
+            out += [f"### {h2.split()[0]} {sub}", "", _paragraph(rng, sub, 2), ""]
+    out += ["## FAQs", ""] + [line for q, a in rng.sample(FAQS, 4) for line in (f"### {q}", "", a, "")]
+    out += ["## Share this article", "[Facebook](https://facebook.com) [X](https://x.com)"]
+    return "\n".join(out)
+
+
+def textise_page(rng, url, title, outline):
+    updated = _date(rng)
+    out = [title, f"Updated: {updated.strftime('%d %B %Y')}", "", _paragraph(rng, "Life", 3), ""]
+    for h2, subs in outline:
+        out += [h2, _paragraph(rng, h2), ""]
+        for sub in subs:
+            out += [f"{h2.split()[0]} {sub.title()} Guide", _paragraph(rng, sub, 2)]
+    out += ["Frequently Asked Questions"] + [line for q, a in rng.sample(FAQS, 4) for line in (q, a)]
+    out += ["", "Home | About Us | Contact Us | Privacy Policy"]
+    return "\n".join(out)
+
+
+def serp_payloads(rng, pages):
+    ranked = [BAYUT_URL] + [p["url"] for p in pages]
+    rng.shuffle(ranked)
+    refs = [BAYUT_URL, pages[0]["url"], pages[3]["url"], "https://www.dubailand.gov.ae/en/"]
+    paa = [q for q, _ in FAQS[:4]]
+    organic = [{"type": "organic", "rank_group": i, "rank_absolute": i + 2, "domain": u.split("/")[2], "url": u,
+                "title": f"Living in JVC guide {i}", "description": _sentence(rng, "Living")}
+               for i, u in enumerate(ranked, start=1)]
+    dataforseo = {
+        "version": "0.1.20240801", "status_code": 20000, "status_message": "Ok.", "time": "6.1 sec.", "cost": 0.002,
+        "tasks_count": 1, "tasks_error": 0,
+        "tasks": [{
+            "id": "08011200-1111-0066-0000-4f1cde1fb8c1", "status_code": 20000, "status_message": "Ok.", "cost": 0.002,
+            "data": {"api": "serp", "function": "live", "se": "google", "se_type": "organic", "keyword": QUERY,
+                     "location_name": "United Arab Emirates", "language_code": "en", "device": "mobile", "os": "android"},
+            "result": [{
+                "keyword": QUERY, "type": "organic", "se_domain": "google.ae", "location_code": 2784,
+                "language_code": "en", "check_url": "https://www.google.ae/search?q=living+in+jvc",
+                "item_types": ["ai_overview", "organic", "people_also_ask", "images"],
+                "items_count": len(organic) + 3,
+                "items": [
+                    {"type": "ai_overview", "rank_group": 1, "rank_absolute": 1, "items": [
+                        {"type": "ai_overview_element", "text": _paragraph(rng, "Living", 2)}],
+                     "references": [{"type": "ai_overview_reference", "source": u.split("/")[2], "url": u} for u in refs]},
+                    {"type": "people_also_ask", "rank_group": 1, "rank_absolute": 2, "items": [
+                        {"type": "people_also_ask_element", "title": q} for q in paa]},
+                ] + organic + [{"type": "images", "rank_group": 1, "rank_absolute": len(organic) + 3}],
+            }],
+        }],
+    }
+    serpapi = {
+        "search_metadata": {"status": "Success", "google_url": "https://www.google.ae/search?q=living+in+jvc"},
+        "search_parameters": {"engine": "google", "q": QUERY, "google_domain": "google.ae", "gl": "ae", "hl": "en",
+                              "device": "mobile"},
+        "ai_overview": {"text_blocks": [{"type": "paragraph", "snippet": _paragraph(rng, "Living", 2)}],
+                        "references": [{"title": u.split("/")[2], "link": u} for u in refs]},
+        "related_questions": [{"question": q} for q in paa],
+        "organic_results": [{"position": o["rank_group"], "title": o["title"], "link": o["url"],
+                             "snippet": o["description"]} for o in organic[:20]],
+    }
+    return dataforseo, serpapi
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="\n") as fh:
+        fh.write(text)
+
+
+def synth(out_dir=CORPUS, seed=20240801):
+    rng = random.Random(seed)
+    pages = []
+    for i in range(1, 21):
+        kind = "jina" if i in (7, 14) else "textise" if i in (10, 18) else "html"
+        url = f"https://www.realestate-guide{i}.example/blog/living-in-jvc-{i}/"
+        title = rng.choice(["Living in JVC", "JVC Community Guide", "Guide to Living in Jumeirah Village Circle",
+                            "Pros and Cons of Living in JVC", "Everything About JVC"]) + f" ({2024 + i % 2})"
+        outline = _outline(rng)
+        if kind == "html":
+            layout = LAYOUTS[i % len(LAYOUTS)]
+            text, name = html_page(rng, url, title, outline, layout), f"html/competitor{i:02d}.html"
+        elif kind == "jina":
+            layout, text, name = "reader", jina_page(rng, url, title, outline), f"jina/competitor{i:02d}.md"
+        else:
+            layout, text, name = "text", textise_page(rng, url, title, outline), f"textise/competitor{i:02d}.txt"
+        _write(os.path.join(out_dir, name), text)
+        pages.append({"url": url, "kind": kind, "layout": layout, "file": name})
+
+    bayut_html = html_page(rng, BAYUT_URL, "Living in JVC: Complete Community Guide", _outline(rng, bayut=True), "wordpress")
+    _write(os.path.join(out_dir, "html/bayut.html"), bayut_html)
+    dataforseo, serpapi = serp_payloads(rng, pages)
+    _write(os.path.join(out_dir, "serp/dataforseo_living-in-jvc_mobile.json"), json.dumps(dataforseo, indent=1))
+    _write(os.path.join(out_dir, "serp/serpapi_living-in-jvc_mobile.json"), json.dumps(serpapi, indent=1))
+    manifest = {
+        "origin": "synthetic", "seed": seed, "query": QUERY, "device": "mobile",
+        "bayut": {"url": BAYUT_URL, "kind": "html", "layout": "wordpress", "file": "html/bayut.html"},
+        "competitors": pages,
+        "serp": {"dataforseo": "serp/dataforseo_living-in-jvc_mobile.json",
+                 "serpapi": "serp/serpapi_living-in-jvc_mobile.json"},
+    }
+    _write(os.path.join(out_dir, "manifest.json"), json.dumps(manifest, indent=1) + "\n")
+    return manifest
+
+
+def record(bayut_url, competitors, query, out_dir):
+    sys.path.insert(0, ROOT)
+    import streamlit.logger
+    streamlit.logger.set_log_level("error")
+    import app
+
+    agent = app.get_fetch_agent()
+    ext = {"html": "html", "jina": "md", "textise": "txt"}
+
+    def save(url, name):
+        for tier, kind in (("direct", "html"), ("jina", "jina"), ("textise", "textise")):
+            out = agent._fetch_tier(tier, url)
+            body = out.get("html") if kind == "html" else out.get("text")
+            if out.get("status") == 200 and body:
+                rel = f"{kind}/{name}.{ext[kind]}"
+                _write(os.path.join(out_dir, rel), body)
+                return {"url": url, "kind": kind, "layout": "recorded", "file": rel}
+        print(f"skipped {url}: no tier returned content", file=sys.stderr)
+        return None
+
+    bayut = save(bayut_url, "bayut")
+    pages = [p for p in (save(u, f"competitor{i:02d}") for i, u in enumerate(competitors, start=1)) if p]
+    serp = {}
+    for provider, fetch in (("dataforseo", app._dataforseo_serp_live), ("serpapi", app._serpapi_serp_live)):
+        data = fetch(query, "mobile")
+        if isinstance(data, dict) and not data.get("_error"):
+            rel = f"serp/{provider}_{'-'.join(query.lower().split())}_mobile.json"
+            _write(os.path.join(out_dir, rel), json.dumps(data, indent=1))
+            serp[provider] = rel
+    manifest = {"origin": "recorded", "recorded_at": date.today().isoformat(), "query": query, "device": "mobile",
+                "bayut": bayut, "competitors": pages, "serp": serp}
+    _write(os.path.join(out_dir, "manifest.json"), json.dumps(manifest, indent=1) + "\n")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_synth = sub.add_parser("synth", help="regenerate the shipped synthetic corpus")
+    p_synth.add_argument("--out", default=CORPUS)
+    p_rec = sub.add_parser("record", help="record live pages and SERP responses")
+    p_rec.add_argument("competitors", nargs="+")
+    p_rec.add_argument("--bayut", required=True)
+    p_rec.add_argument("--query", required=True)
+    p_rec.add_argument("--out", default=os.path.join(HERE, "corpus_recorded"))
+    args = parser.parse_args()
+    if args.cmd == "synth":
+        m = synth(args.out)
+    else:
+        m = record(args.bayut, args.competitors, args.query, args.out)
+    print(f"wrote {len(m['competitors']) + 1} pages and {len(m['serp'])} SERP responses to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
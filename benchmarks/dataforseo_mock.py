@@ -0,0 +1,196 @@
+"""
+Local stand-in for the DataForSEO SERP API (live and standard task endpoints).
+
+    python benchmarks/dataforseo_mock.py [--port 8790] [--queue-delay 5] [--live-latency 1.5]
+
+Then point the app at it:
+
+    DATAFORSEO_API_BASE=http://127.0.0.1:8790 DATAFORSEO_LOGIN=x DATAFORSEO_PASSWORD=x ...
+
+Serves deterministic Google organic results (with an AI overview for some keywords) in
+the response shapes the app parses, bills each request at the published per-SERP rates,
+and counts calls per endpoint. Standard tasks appear in tasks_ready `queue_delay` seconds
+after task_post and leave it once collected with task_get. tests/test_serp_bulk.py and
+benchmarks/bench_serp_bulk.py start it in-process with start_mock().
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "/v3/serp/google/organic"
+LIVE_COST = 0.002
+STANDARD_COST = {1: 0.0006, 2: 0.0012}  # by task priority
+DOMAINS = [
+    "bayut.com", "propertyfinder.ae", "dubizzle.com", "timeoutdubai.com", "visitdubai.com",
+    "khaleejtimes.com", "gulfnews.com", "thenationalnews.com", "tripadvisor.com", "wikipedia.org",
+]
+
+
+def fake_serp(task: dict) -> dict:
+    """Deterministic organic result for one task payload."""
+    keyword = task.get("keyword", "")
+    seed = hashlib.sha1(keyword.lower().encode("utf-8")).digest()
+    depth = int(task.get("depth") or 50)
+    slug = "-".join(keyword.lower().split()) or "page"
+    items = []
+    if seed[0] % 3 == 0:
+        refs = [{"type": "ai_overview_reference", "url": f"https://www.{DOMAINS[(seed[i] + i) % len(DOMAINS)]}/{slug}"}
+                for i in range(1, 4)]
+        items.append({"type": "ai_overview", "rank_group": 1, "rank_absolute": 1, "references": refs})
+    for rank in range(1, min(depth, 20) + 1):
+        dom = DOMAINS[(seed[rank % len(seed)] + rank) % len(DOMAINS)]
+        items.append({
+            "type": "organic", "rank_group": rank, "rank_absolute": rank + (1 if items and items[0]["type"] == "ai_overview" else 0),
+            "domain": f"www.{dom}", "url": f"https://www.{dom}/{slug}-{rank}", "title": f"{keyword} {rank}",
+        })
+    if seed[1] % 2 == 0:
+        items.append({"type": "people_also_ask", "items": [{"title": f"What is {keyword}?"}, {"title": f"Is {keyword} worth it?"}]})
+    return {
+        "keyword": keyword, "type": "organic", "se_domain": task.get("se_domain"),
+        "location_code": task.get("location_code"), "language_code": task.get("language_code"),
+        "check_url": f"https://www.google.ae/search?q={keyword}", "item_types": sorted({i["type"] for i in items}),
+        "items_count": len(items), "items": items,
+    }
+
+
+class MockState:
+    def __init__(self, queue_delay: float = 5.0, live_latency: float = 1.5):
+        self.queue_delay = queue_delay
+        self.live_latency = live_latency
+        self.lock = threading.Lock()
+        self.tasks = {}  # id -> {"data", "ready_at", "collected"}
+        self.calls = {"live": 0, "task_post": 0, "tasks_ready": 0, "task_get": 0}
+        self.billed = 0.0
+
+
+def _envelope(tasks, cost=0.0):
+    return {
+        "version": "0.1.mock", "status_code": 20000, "status_message": "Ok.", "time": "0 sec.",
+        "cost": round(cost, 6), "tasks_count": len(tasks), "tasks_error": sum(1 for t in tasks if t["status_code"] >= 40000),
+        "tasks": tasks,
+    }
+
+
+def _task(task_id, status_code, message, data, cost=0.0, result=None):
+    return {
+        "id": task_id, "status_code": status_code, "status_message": message, "time": "0 sec.", "cost": cost,
+        "result_count": len(result or []), "path": [], "data": data, "result": result,
+    }
+
+
+class Handler(BaseHTTPRequestHandler):
+    state: MockState = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body):
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _authorized(self):
+        if self.headers.get("Authorization", "").startswith("Basic "):
+            return True
+        self._send(401, {"status_code": 40100, "status_message": "You are not authorized to access this resource."})
+        return False
+
+    def _body(self):
+        n = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(n) or b"[]") if n else []
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        st = self.state
+        payload = self._body()
+        if self.path == f"{PREFIX}/live/advanced":
+            time.sleep(st.live_latency)
+            tasks = [_task(str(uuid.uuid4()), 20000, "Ok.", t, LIVE_COST, [fake_serp(t)]) for t in payload[:1]]
+            with st.lock:
+                st.calls["live"] += 1
+                st.billed += LIVE_COST * len(tasks)
+            return self._send(200, _envelope(tasks, LIVE_COST * len(tasks)))
+        if self.path == f"{PREFIX}/task_post":
+            if len(payload) > 100:
+                return self._send(200, {"status_code": 40000, "status_message": "You can set only 100 tasks at a time."})
+            tasks = []
+            now = time.monotonic()
+            with st.lock:
+                st.calls["task_post"] += 1
+                for t in payload:
+                    if not t.get("keyword"):
+                        tasks.append(_task(str(uuid.uuid4()), 40501, "Invalid Field: 'keyword'.", t))
+                        continue
+                    cost = STANDARD_COST.get(int(t.get("priority") or 1), STANDARD_COST[1])
+                    task_id = str(uuid.uuid4())
+                    st.tasks[task_id] = {"data": t, "ready_at": now + st.queue_delay, "collected": False, "cost": cost}
+                    st.billed += cost
+                    tasks.append(_task(task_id, 20100, "Task Created.", t, cost))
+            return self._send(200, _envelope(tasks, sum(t["cost"] for t in tasks)))
+        self._send(404, {"status_code": 40400, "status_message": "Not Found."})
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        st = self.state
+        now = time.monotonic()
+        if self.path == f"{PREFIX}/tasks_ready":
+            with st.lock:
+                st.calls["tasks_ready"] += 1
+                ready = [
+                    {"id": tid, "se": "google", "se_type": "organic", "tag": t["data"].get("tag"),
+                     "endpoint_advanced": f"{PREFIX}/task_get/advanced/{tid}"}
+                    for tid, t in st.tasks.items() if not t["collected"] and t["ready_at"] <= now
+                ][:1000]
+            return self._send(200, _envelope([_task(str(uuid.uuid4()), 20000, "Ok.", {}, 0, ready)]))
+        if self.path.startswith(f"{PREFIX}/task_get/advanced/"):
+            tid = self.path.rsplit("/", 1)[-1]
+            with st.lock:
+                st.calls["task_get"] += 1
+                t = st.tasks.get(tid)
+                if t is None:
+                    task = _task(tid, 40400, "Not Found.", {})
+                elif t["ready_at"] > now:
+                    task = _task(tid, 40602, "Task In Queue.", t["data"])
+                else:
+                    t["collected"] = True
+                    task = _task(tid, 20000, "Ok.", t["data"], 0, [fake_serp(t["data"])])
+            return self._send(200, _envelope([task]))
+        self._send(404, {"status_code": 40400, "status_message": "Not Found."})
+
+
+def start_mock(port: int = 0, queue_delay: float = 5.0, live_latency: float = 1.5):
+    """Start the mock in a daemon thread; returns (server, base_url). server.state holds the counters."""
+    state = MockState(queue_delay=queue_delay, live_latency=live_latency)
+    handler = type("BoundHandler", (Handler,), {"state": state})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--queue-delay", type=float, default=5.0, help="seconds before a posted task is ready")
+    parser.add_argument("--live-latency", type=float, default=1.5, help="seconds per live request")
+    args = parser.parse_args()
+    server, base = start_mock(args.port, args.queue_delay, args.live_latency)
+    print(f"DataForSEO mock on {base} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Shared setup: import app.py the way the benchmarks do (bare mode, no browser session), with
+the on-disk caches and trace export off so tests never read or write .cache/, plus the
+stub FetchAgent the fetch tests drive.
+"""
+import os
+import re
+import sys
+import threading
+
+os.environ.setdefault("FETCH_CACHE_PATH", "")
+os.environ.setdefault("FETCH_PROFILE_PATH", "")
+os.environ.setdefault("TRACE_EXPORT_PATH", "")
+os.environ.setdefault("SERP_CACHE_PATH", "")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import streamlit.logger  # noqa: E402
+
+streamlit.logger.set_log_level("error")
+
+import pytest  # noqa: E402
+
+import app  # noqa: E402
+
+
+class StubAgent(app.FetchAgent):
+    """
+    FetchAgent with canned tiers. `answers` maps a tier to the fields its outcome gets (or to a
+    callable url -> fields); an answer with html but no text gets the article text and heading
+    count the direct tier would report, and tiers without an answer come back empty. With
+    answers=None every tier fetches for real, the reader tiers as `url?reader=<tier>` so they
+    reach the same stub server. Records (tier, url, validators sent) per tier fetch, the tiers
+    each resolve() ran, and how much tier work is running.
+    """
+
+    def __init__(self, answers=None, cache=None, **kwargs):
+        super().__init__(app.DEFAULT_HEADERS, app.IGNORE_TAGS, app.clean, app.looks_blocked,
+                         browser_pool=None, cache=cache, **kwargs)
+        self.answers = answers
+        self.fetches = []
+        self.runs = []
+        self.running = 0
+        self._count_lock = threading.Lock()
+
+    def _jina_url(self, url):
+        return url + ("&" if "?" in url else "?") + "reader=jina"
+
+    def _textise_url(self, url):
+        return url + ("&" if "?" in url else "?") + "reader=textise"
+
+    def resolve(self, url, *args, **kwargs):
+        self.runs.append([])
+        return super().resolve(url, *args, **kwargs)
+
+    def _run_tier(self, *args, **kwargs):
+        with self._count_lock:
+            self.running += 1
+        try:
+            return super()._run_tier(*args, **kwargs)
+        finally:
+            with self._count_lock:
+                self.running -= 1
+
+    def _fetch_tier(self, tier, url, validators=None, deadline=None):
+        self.fetches.append((tier, url, validators is not None))
+        if self.runs:
+            self.runs[-1].append(tier)
+        if self.answers is None:
+            return super()._fetch_tier(tier, url, validators, deadline)
+        out = {"tier": tier, "status": None, "html": "", "text": "", "headings": 0}
+        answer = self.answers.get(tier) or {}
+        out.update(answer(url) if callable(answer) else answer)
+        if out["html"] and not out["text"]:
+            out["text"] = self._extract_article_text_from_html(out["html"])
+            out["headings"] = out["headings"] or len(re.findall(r"<h[2-4][\s>]", out["html"]))
+        return out
+
+
+@pytest.fixture
+def stub_agent():
+    """The StubAgent class, e.g. stub_agent({"direct": {"status": 200, "html": html}})."""
+    return StubAgent
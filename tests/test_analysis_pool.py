@@ -0,0 +1,72 @@
+"""
+Analysis pool against the in-process path: the header-gap rows, the SEO table and the content
+quality table for the fixture pages must be identical with ANALYSIS_WORKERS=2 (every call
+fanned out) and with 1 worker. Each page gets a modified date so no HEAD request is made.
+"""
+import json
+import os
+
+import pytest
+
+import app
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+PAGES = sorted(f for f in os.listdir(FIXTURES) if f.endswith(".html"))
+BAYUT = "bayut_guide.html"
+MODIFIED = '<meta property="article:modified_time" content="2024-05-01T10:00:00Z">'
+
+
+def _url(i, name):
+    return f"https://site{i}.example/{name[:-5].replace('_', '-')}/"
+
+
+def _tables(monkeypatch, workers):
+    monkeypatch.setattr(app, "ANALYSIS_WORKERS", workers)
+    monkeypatch.setattr(app, "ANALYSIS_MIN_TASKS", 1)
+    frs = {}
+    for i, name in enumerate(PAGES):
+        with open(os.path.join(FIXTURES, name), encoding="utf-8") as fh:
+            frs[_url(i, name)] = app.FetchResult(True, "direct", 200, MODIFIED + fh.read(), "", None)
+    trees = {u: app.get_tree_from_fetchresult(fr, u) for u, fr in frs.items()}
+    bayut = _url(PAGES.index(BAYUT), BAYUT)
+    comps = [u for u in frs if u != bayut]
+
+    trace = app.start_run_trace("pool-test")
+    try:
+        gaps = app.build_update_gap_rows(frs[bayut], trees[bayut]["nodes"], comps, frs, trees)
+        seo = app.build_seo_analysis_update(bayut, frs[bayut], trees[bayut]["nodes"], comps, frs, trees,
+                                            manual_fkw="living in jvc")
+        cq = app.build_content_quality_table_from_seo(seo, frs, trees, manual_query="living in jvc")
+    finally:
+        app.finish_run_trace(trace, export_path="")
+    pids = {s["attrs"].get("worker_pid") for s in trace.spans if s["kind"] == "analyze"}
+    out = json.dumps({"gaps": gaps, "seo": seo.to_dict("records"), "cq": cq.to_dict("records")}, default=str)
+    return out, pids
+
+
+@pytest.fixture
+def fresh_pool():
+    app.get_analysis_pool.clear()
+    yield
+    app.get_analysis_pool.clear()
+
+
+def test_pool_tables_match_in_process(monkeypatch, fresh_pool):
+    expected, pids = _tables(monkeypatch, 1)
+    assert pids == {None}
+    got, pids = _tables(monkeypatch, 2)
+    assert None not in pids and os.getpid() not in pids, "the tables were not built on the pool"
+    pool = app.get_analysis_pool(2, app._app_mtime())
+    try:
+        assert got == expected
+        assert json.loads(got)["gaps"] and len(json.loads(got)["cq"]) == len(PAGES)
+    finally:
+        pool.shutdown(wait=True)
+
+
+def test_small_batches_stay_in_process(monkeypatch):
+    monkeypatch.setattr(app, "ANALYSIS_WORKERS", 2)
+    calls = []
+    monkeypatch.setattr(app, "get_analysis_pool", lambda *a: calls.append(a))
+    assert app.run_page_tasks(len, [("ab",), ("abc",)]) == [2, 3]  # fewer than ANALYSIS_MIN_TASKS
+    assert calls == []
@@ -0,0 +1,69 @@
+"""Run-scoped artifact store: competitors are reused between runs, the Bayut page never goes stale."""
+import app
+
+BAYUT = "https://www.bayut.com/mybayut/living-in-jvc/"
+COMP = "https://competitor.example/jvc-guide"
+
+
+def _page(title, version):
+    return (f"<html><head><title>{title}</title></head><body><article><h1>{title}</h1>" + "".join(
+        f"<h2>Section {i}</h2><p>Version {version}: section {i} covers rents of AED {40_000 + i} in JVC.</p>"
+        for i in range(12)
+    ) + "</article></body></html>")
+
+
+def _origin(stub_agent):
+    """Direct tier answers from `agent.pages`, with an etag so repeat fetches send validators."""
+    pages = {BAYUT: _page("Bayut", 1), COMP: _page("Competitor", 1)}
+    agent = stub_agent({"direct": lambda url: {"status": 200, "html": pages[url], "etag": f'"{hash(pages[url])}"'}},
+                       cache=app.FetchCache(":memory:"))
+    agent.pages = pages
+    return agent
+
+
+def _direct_fetches(agent):
+    """(url, sent validators) for every direct-tier network fetch."""
+    return [(url, sent) for tier, url, sent in agent.fetches if tier == "direct"]
+
+
+def _run(store, agent, force=False):
+    """The Update-mode fetch sequence: Bayut (always refreshed), then competitors."""
+    cache_mode = "bypass" if force else "use"
+    if force:
+        store.forget([BAYUT, COMP])
+    bayut = app.resolve_with_store(store, agent, [BAYUT], "bayut", refresh=[BAYUT], cache_mode=cache_mode)
+    app.ensure_headings_with_store(store, [BAYUT], bayut, "bayut_tree")
+    comps = app.resolve_with_store(store, agent, [COMP], "comp", cache_mode=cache_mode)
+    app.ensure_headings_with_store(store, [COMP], comps, "comp_tree")
+    return bayut[BAYUT], comps[COMP]
+
+
+def test_bayut_is_refetched_and_competitors_reused(stub_agent):
+    store, agent = app.ArtifactStore(), _origin(stub_agent)
+    bayut1, comp1 = _run(store, agent)
+    rev1 = store.rev(BAYUT)
+    assert _direct_fetches(agent) == [(BAYUT, False), (COMP, False)]
+
+    # Unchanged page: revalidated against the origin (validators sent despite a fresh cache
+    # entry), and the stored result is kept so its derived rows stay valid.
+    agent.fetches.clear()
+    bayut2, comp2 = _run(store, agent)
+    assert _direct_fetches(agent) == [(BAYUT, True)]
+    assert bayut2 is bayut1 and comp2 is comp1 and store.rev(BAYUT) == rev1
+
+    # The editor updates the article: the next run sees the new page.
+    agent.pages[BAYUT] = _page("Bayut", 2)
+    agent.fetches.clear()
+    bayut3, comp3 = _run(store, agent)
+    assert "Version 2" in bayut3.html and comp3 is comp1
+    assert store.rev(BAYUT) != rev1
+
+
+def test_force_refresh_skips_store_and_fetch_cache(stub_agent):
+    store, agent = app.ArtifactStore(), _origin(stub_agent)
+    _, comp1 = _run(store, agent)
+    agent.pages[COMP] = _page("Competitor", 2)
+    agent.fetches.clear()
+    _, comp2 = _run(store, agent, force=True)
+    assert _direct_fetches(agent) == [(BAYUT, False), (COMP, False)]  # live fetches, no cache validators
+    assert comp2 is not comp1 and "Version 2" in comp2.html
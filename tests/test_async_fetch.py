@@ -0,0 +1,179 @@
+"""
+AsyncFetchAgent against a local stub server: slow, slow-drip, blocking and failing sites stay
+inside the per-URL and whole-run budgets, runs share one executor, and no tier work outlives
+close(). Reader tiers are pointed at the stub server too, so nothing leaves the machine; each
+stub site gets its own loopback address so the per-domain throttle treats them as separate hosts.
+"""
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import app
+
+GOOD = ("<html><head><title>JVC guide</title></head><body><article><h1>Living in JVC</h1>" + "".join(
+    f"<h2>Section {i}</h2><p>Section {i} covers rents of AED {40_000 + i} and schools near JVC.</p>"
+    for i in range(20)
+) + "</article></body></html>").encode("utf-8")
+BLOCKED = b"<html><body>Access denied. Please verify you are human (captcha).</body></html>"
+
+
+@pytest.fixture(scope="module")
+def site():
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            path = self.path
+            if path.startswith("/slow"):
+                time.sleep(8)
+            if path.startswith("/drip"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html")
+                self.end_headers()
+                try:
+                    for _ in range(40):
+                        self.wfile.write(b"<p>drip drip drip</p>" * 10)
+                        self.wfile.flush()
+                        time.sleep(0.2)
+                except OSError:
+                    pass
+                return
+            code, body = 200, GOOD
+            if path.startswith("/blocked"):
+                code, body = 403, BLOCKED
+            elif path.startswith("/fail"):
+                code, body = 500, b"oops"
+            try:
+                self.send_response(code)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except OSError:  # the client gave up at its deadline
+                pass
+
+    httpd = ThreadingHTTPServer(("0.0.0.0", 0), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    port = httpd.server_address[1]
+    hosts = {}
+
+    def site(path):
+        """`path` on a stub site of its own (127.0.0.N)."""
+        n = hosts.setdefault(path, len(hosts) + 1)
+        return f"http://127.0.0.{n}:{port}{path}"
+
+    yield site
+    httpd.shutdown()
+
+
+@pytest.fixture
+def agent(stub_agent):
+    """Every tier fetches from the stub server, without retries."""
+    return stub_agent(session=app.build_http_session(retries=0))
+
+
+def test_async_matches_sync_on_a_fast_page(site, agent):
+    fetcher = app.AsyncFetchAgent(agent, url_budget=5, run_budget=0)
+    try:
+        fr = asyncio.run(fetcher.resolve(site("/fast")))
+    finally:
+        fetcher.close()
+    assert fr.ok and fr == agent.resolve(site("/fast"))
+
+
+def test_slow_blocking_and_failing_sites_stay_inside_the_url_budget(site, agent):
+    fetcher = app.AsyncFetchAgent(agent, url_budget=2, run_budget=0)
+    urls = [site(p) for p in ("/fast", "/slow", "/drip", "/blocked", "/fail", "/fast?2")]
+    start = time.monotonic()
+    try:
+        results = fetcher.resolve_many_sync(urls)
+    finally:
+        fetcher.close()
+    assert time.monotonic() - start < 6
+    assert list(results) == urls
+    assert results[site("/fast")].ok and results[site("/fast?2")].ok
+    for path in ("/slow", "/drip", "/blocked", "/fail"):
+        assert not results[site(path)].ok, path
+    assert results[site("/slow")].reason == "deadline_exceeded"
+
+
+def test_run_budget_bounds_the_whole_run(site, agent):
+    fetcher = app.AsyncFetchAgent(agent, url_budget=30, run_budget=1.5)
+    urls = [site(f"/slow{i}") for i in range(4)] + [site("/fast")]
+    start = time.monotonic()
+    try:
+        results = fetcher.resolve_many_sync(urls)
+    finally:
+        fetcher.close()
+    assert time.monotonic() - start < 5
+    assert results[site("/fast")].ok
+    assert all(results[site(f"/slow{i}")].reason == "deadline_exceeded" for i in range(4))
+
+
+def test_no_tier_work_outlives_close(site, agent):
+    fetcher = app.AsyncFetchAgent(agent, url_budget=1, run_budget=0, executor=app.get_fetch_executor())
+    try:
+        fetcher.resolve_many_sync([site("/slow-a"), site("/drip-b")])
+    finally:
+        fetcher.close()
+    assert agent.running == 0 and not fetcher._in_flight
+
+
+def test_runs_share_one_executor(site, agent):
+    def tier_threads():
+        return {t.ident for t in threading.enumerate() if t.name.startswith("fetch-tier")}
+
+    executor = app.get_fetch_executor()
+    app.resolve_all_or_require_manual(agent, [site("/fast"), site("/fail")], "t")
+    threads = tier_threads()
+    for i in range(3):
+        results = app.resolve_all_or_require_manual(agent, [site(f"/fast?{i}"), site("/fail")], "t")
+        assert results[site(f"/fast?{i}")].ok
+    assert app.get_fetch_executor() is executor
+    assert tier_threads() <= threads | {t.ident for t in executor._threads}
+    assert len(executor._threads) <= executor._max_workers
+
+
+def test_close_while_abandoned_work_finishes(stub_agent):
+    # Done callbacks fire on fetch-tier threads while close() takes its snapshot.
+    agent = stub_agent({})
+    agent._run_tier = lambda tier, url, deadline=None, cache_mode="use": time.sleep(0.001 * (hash(url) % 5))
+
+    async def abandon(fetcher, n):
+        await asyncio.gather(*(fetcher._tier("direct", f"https://site{i}.example/", time.monotonic()) for i in range(n)))
+
+    for _ in range(20):
+        fetcher = app.AsyncFetchAgent(agent, url_budget=0.001, run_budget=0, executor=app.get_fetch_executor())
+        asyncio.run(abandon(fetcher, 50))
+        fetcher.close()
+        assert not fetcher._in_flight
+
+
+def test_parallel_tiers_stop_waiting_once_settled(stub_agent):
+    html = GOOD.decode("utf-8")
+    threads, release = [], threading.Event()
+
+    def slow(url):
+        threads.append(threading.current_thread().name)
+        release.wait(10)
+        return {"status": 200, "text": "late reader text " * 400, "headings": 30}
+
+    def reader(url):
+        threads.append(threading.current_thread().name)
+        return {"status": 200, "text": "reader text about JVC " * 200, "headings": 25}
+
+    agent = stub_agent({"direct": {"status": 200, "html": html[:400]}, "jina": reader, "textise": slow},
+                       parallel_tiers=True)
+    start = time.monotonic()
+    try:
+        fr = agent.resolve("https://stub.example/jvc")
+        assert time.monotonic() - start < 5, "resolve waited for the slow tier"
+    finally:
+        release.set()
+    assert fr.ok and fr.source == "jina" and fr.html == html[:400]
+    assert threads and all(name.startswith("fetch-tier") for name in threads)
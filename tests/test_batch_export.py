@@ -0,0 +1,39 @@
+"""Batch exports: the UI's link and details markup is written out as plain URLs and text."""
+import pandas as pd
+
+import app
+
+URL = "https://competitor.example/jvc-guide?page=2&lang=en"
+
+
+def test_links_export_as_their_url():
+    assert app.export_cell_text(app.source_link(URL)) == URL
+
+
+def test_details_cells_export_as_text_lines():
+    tip = app._aio_tip_cell("No", ["Add a Quick Answer & cite <trusted> sources.", "Use intent-matching headings."])
+    assert app.export_cell_text(tip) == (
+        "No\nTips\n- Add a Quick Answer & cite <trusted> sources.\n- Use intent-matching headings.")
+    outdated = app._outdated_misleading_cell("", "Prices rose 12% in 2022 and service charges are AED 15 per sq ft.")
+    assert app.export_cell_text(outdated) == (
+        "Outdated info\nOutdated signals\n- Prices rose 12% in 2022 and service charges are AED 15 per sq ft.")
+
+
+def test_plain_cells_pass_through():
+    for value in ("Add this header with: Schools, Parks", "rents < AED 50k > last year", "", 3, None):
+        assert app.export_cell_text(value) == value
+    assert app.export_cell_text(app._aio_tip_cell("Yes", ["unused tip"])) == "Yes"
+
+
+def test_export_frame_has_no_markup():
+    gaps = pd.DataFrame([
+        {"Headers": "FAQs", "Description": "<div>Important missing FAQ questions:</div><div>1-Is JVC safe?</div>"
+                                           "<div>+2 more FAQ gaps</div>", "Source": app.source_link(URL)},
+        {"Headers": "Schools in JVC", "Description": "Add this header with: Nurseries", "Source": app.source_link(URL)},
+    ])
+    out = app._batch_export_frame("job-1", "gaps", gaps, None)
+    assert list(out.columns) == ["Job", "Headers", "Description", "Source"]
+    assert list(out["Source"]) == [URL, URL]
+    assert list(out["Description"]) == [
+        "Important missing FAQ questions:\n1-Is JVC safe?\n+2 more FAQ gaps", "Add this header with: Nurseries"]
+    assert not out.map(lambda v: "<" in str(v)).any().any()
@@ -0,0 +1,200 @@
+"""
+BrowserPool against a local fixture server: one browser reused across renders, recycling,
+recovery after the browser process dies, the max_pages cap, and shutdown through atexit.
+Skipped when Playwright or its Chromium build is not installed (the stats counters need only
+Playwright).
+"""
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("playwright")
+
+import app  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UA = "Mozilla/5.0 (X11; Linux x86_64) BrowserPoolTest"
+JS_PAGE = (
+    "<html><head><title>JS page</title></head><body><div id='out'></div>"
+    "<script>document.getElementById('out').innerHTML = '<h2>Rendered by script</h2>';</script>"
+    "</body></html>"
+)
+
+
+@pytest.fixture(scope="module")
+def chromium():
+    if not app.PLAYWRIGHT_OK:
+        pytest.skip("playwright not installed")
+    from playwright.sync_api import sync_playwright
+    try:
+        with sync_playwright() as pw:
+            pw.chromium.launch(headless=True, args=["--no-sandbox"]).close()
+    except Exception as exc:  # browser build missing (`playwright install chromium`)
+        pytest.skip(f"chromium not available: {exc}")
+
+
+@pytest.fixture(scope="module")
+def server():
+    state = {"active": 0, "peak": 0, "lock": threading.Lock()}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            slow = self.path.startswith("/slow")
+            if slow:
+                with state["lock"]:
+                    state["active"] += 1
+                    state["peak"] = max(state["peak"], state["active"])
+            try:
+                if slow:
+                    time.sleep(0.4)
+                body = JS_PAGE.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            finally:
+                if slow:
+                    with state["lock"]:
+                        state["active"] -= 1
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    state["base"] = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield state
+    httpd.shutdown()
+
+
+@pytest.fixture
+def pool(chromium):
+    p = app.BrowserPool(max_pages=2, recycle_after=100)
+    yield p
+    p.close()
+
+
+def _render(pool, url):
+    return pool.render(url, UA, timeout_ms=15000, settle_ms=50)
+
+
+def _browser_pids(root_pid):
+    """Chromium main processes (the ones Playwright drives over a pipe) under `root_pid`."""
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as fh:
+                    parents[int(entry)] = int(fh.read().rsplit(")", 1)[1].split()[1])
+            except OSError:
+                continue
+
+    def descends(pid):
+        while pid > 1:
+            if pid == root_pid:
+                return True
+            pid = parents.get(pid, 0)
+        return False
+
+    out = []
+    for pid in parents:
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as fh:
+                cmd = fh.read()
+        except OSError:
+            continue
+        if b"--remote-debugging-pipe" in cmd and descends(pid):
+            out.append(pid)
+    return out
+
+
+def test_renders_reuse_one_browser(pool, server):
+    for i in range(3):
+        ok, html = _render(pool, f"{server['base']}/page{i}")
+        assert ok and "Rendered by script</h2>" in html
+    assert pool.stats["launches"] == 1 and pool.stats["renders"] == 3
+
+
+def test_browser_is_recycled_after_recycle_after_pages(chromium, server):
+    pool = app.BrowserPool(max_pages=1, recycle_after=2)
+    try:
+        for i in range(5):
+            assert _render(pool, f"{server['base']}/r{i}")[0]
+        assert pool.stats["launches"] == 3 and pool.stats["recycled"] == 2
+    finally:
+        pool.close()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="finds the browser process through /proc")
+def test_recovers_after_browser_crash(pool, server):
+    assert _render(pool, f"{server['base']}/before")[0]
+    pids = _browser_pids(os.getpid())
+    assert pids, "expected a running chromium process"
+    for pid in pids:
+        os.kill(pid, signal.SIGKILL)
+    deadline = time.time() + 10
+    while pool._browser is not None and pool._browser.is_connected() and time.time() < deadline:
+        time.sleep(0.1)
+
+    ok, html = _render(pool, f"{server['base']}/after")
+    assert ok and "Rendered by script</h2>" in html
+    assert pool.stats["launches"] == 2
+
+
+def test_max_pages_caps_concurrent_renders(pool, server):
+    server["peak"] = 0
+    with ThreadPoolExecutor(max_workers=6) as ex:
+        results = list(ex.map(lambda i: _render(pool, f"{server['base']}/slow{i}"), range(6)))
+    assert all(ok for ok, _ in results)
+    assert 1 <= server["peak"] <= pool.max_pages
+
+
+def test_pool_is_closed_at_interpreter_exit(chromium, server):
+    # The checking hook is registered before get_browser_pool(), so atexit runs it after pool.close.
+    script = textwrap.dedent(f"""
+        import atexit, os, sys
+        sys.path.insert(0, {ROOT!r})
+        os.environ["FETCH_CACHE_PATH"] = ""
+        os.environ["FETCH_PROFILE_PATH"] = ""
+        import streamlit.logger
+        streamlit.logger.set_log_level("error")
+        import app
+        state = {{}}
+        atexit.register(lambda: print("closed", state["pool"]._browser is None and state["pool"]._pw is None,
+                                      state["pool"]._loop is None, flush=True))
+        state["pool"] = pool = app.get_browser_pool()
+        ok, html = pool.render({server['base'] + '/exit'!r}, "ua", timeout_ms=15000, settle_ms=50)
+        print("rendered", ok, flush=True)
+    """)
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=120)
+    lines = out.stdout.split()
+    assert "rendered" in out.stdout and lines[lines.index("rendered") + 1] == "True", out.stderr[-2000:]
+    assert "closed True True" in out.stdout, out.stderr[-2000:]
+
+
+def test_stats_count_every_render_across_threads(monkeypatch):
+    pool = app.BrowserPool(max_pages=8)
+
+    async def fake_render(url, user_agent, timeout_ms, settle_ms):
+        if url.endswith("/fail"):
+            raise RuntimeError("render failed")
+        return "<html></html>"
+
+    monkeypatch.setattr(pool, "_render", fake_render)
+    monkeypatch.setattr(app, "PLAYWRIGHT_OK", True)
+    urls = [f"http://127.0.0.1/{i}" + ("/fail" if i % 4 == 0 else "") for i in range(400)]
+    try:
+        with ThreadPoolExecutor(max_workers=16) as ex:
+            list(ex.map(lambda u: pool.render(u, UA), urls))
+    finally:
+        pool.close()
+    assert pool.stats["renders"] == 300 and pool.stats["failures"] == 100
@@ -0,0 +1,120 @@
+"""
+FaqMatcher against faq_questions_equivalent: matches(q) must equal the pairwise any(...) over
+the Bayut questions, on fixed and seeded question sets, and the matcher cached on the Bayut
+FetchResult must follow its nodes.
+"""
+import random
+
+import pytest
+
+import app
+
+BAYUT = [
+    "Is JVC a good place to live?", "How far is JVC from Dubai Marina?", "What are the best schools in JVC?",
+    "Are there supermarkets in JVC?", "Is JVC good for families?", "What is the average rent in JVC?",
+    "How do I get to JVC by metro?", "Which areas are near JVC?", "Is JVC safe?", "Are pets allowed in JVC parks?",
+]
+COMPETITOR = [
+    "Is JVC a good place to live?", "is jvc a GOOD place to live", "Q: Is JVC a good place to live?",
+    "1. How far is JVC from Dubai Marina?", "How far is Jumeirah Village Circle from Dubai Marina?",
+    "What are the top schools in JVC?", "Which schools are in JVC?", "Are there any supermarkets in JVC?",
+    "Is JVC good for young families?", "What is the average rent for apartments in JVC?", "How much is rent in JVC?",
+    "Is there a metro station in JVC?", "What areas are close to JVC?", "Is JVC a safe area?", "Is JVC safe at night?",
+    "Can I keep pets in JVC?", "What is the service charge in JVC?", "Is parking free in JVC?", "Who built JVC?",
+    "Is JVC a good place to lvie?", "", "?", "What are the pros and cons of living in JVC?",
+]
+
+
+def _reference(questions, q):
+    return any(app.faq_questions_equivalent(q, b) for b in questions)
+
+
+@pytest.mark.parametrize("question", COMPETITOR)
+def test_fixed_questions_match_reference(question):
+    assert app.FaqMatcher(BAYUT).matches(question) == _reference(BAYUT, question)
+
+
+# Pairs that exactly one rule of faq_questions_equivalent accepts, so a matcher shortcut that
+# skips a rule's candidates cannot hide behind another rule.
+SINGLE_RULE_PAIRS = {
+    "core-token overlap": ("What about cost of living in Dubai Marina?",
+                           "What do I need to know about living costs in Dubai Marina?"),
+    "topic similarity": ("What about best schools in JVC?", "What about school fees in JVC?"),
+    "sequence ratio": ("what is the average rent in al barsha?", "What is the averag erent in Al Barsha?"),
+}
+
+
+@pytest.mark.parametrize("rule", sorted(SINGLE_RULE_PAIRS))
+def test_each_rule_matches_on_its_own(rule):
+    bayut_q, comp_q = SINGLE_RULE_PAIRS[rule]
+    assert app.faq_questions_equivalent(comp_q, bayut_q)
+    others = [q for q in BAYUT if not app.faq_questions_equivalent(comp_q, q)]
+    assert app.FaqMatcher(others + [bayut_q]).matches(comp_q)
+    assert not app.FaqMatcher(others).matches(comp_q)
+
+
+def test_empty_bayut_set_matches_nothing():
+    assert not app.FaqMatcher([]).matches("Is JVC a good place to live?")
+    assert not app.FaqMatcher(["", "   "]).matches("Is JVC a good place to live?")
+
+
+AREAS = ["JVC", "Jumeirah Village Circle", "Dubai Marina", "Downtown Dubai", "Business Bay", "JLT", "Al Barsha",
+         "Dubai Hills", "Arabian Ranches", "Palm Jumeirah"]
+SUBJECTS = ["schools", "the best schools", "supermarkets", "parks", "restaurants", "hospitals", "mosques", "gyms",
+            "metro stations", "beaches", "villas for rent", "apartments for sale", "rent prices", "service charges"]
+TEMPLATES = [
+    "Is {a} a good place to live?", "Is {a} good for families?", "How far is {a} from {b}?", "Are there {s} in {a}?",
+    "What are {s} in {a}?", "Which {s} are near {a}?", "How much are {s} in {a}?", "Is {a} safe?",
+    "What is the average rent in {a}?", "Is {a} close to {b}?", "Where are {s} in {a}?", "Are {s} in {a} expensive?",
+    "What is it like living in {a}?", "Is {a} cheaper than {b}?",
+]
+
+
+def _question(rnd):
+    q = rnd.choice(TEMPLATES).format(a=rnd.choice(AREAS), b=rnd.choice(AREAS), s=rnd.choice(SUBJECTS))
+    r = rnd.random()
+    if r < 0.15:
+        q = q.lower()
+    elif r < 0.25:
+        q = q.rstrip("?")
+    elif r < 0.35:
+        q = f"{rnd.randint(1, 9)}. {q}"
+    elif r < 0.45 and len(q) > 12:  # a typo
+        i = rnd.randrange(3, len(q) - 3)
+        q = q[:i] + q[i + 1] + q[i] + q[i + 2:]
+    return q
+
+
+@pytest.mark.parametrize("seed", range(15))
+def test_seeded_question_sets_match_reference(seed):
+    rnd = random.Random(seed)
+    bayut = [_question(rnd) for _ in range(rnd.randint(0, 25))]
+    matcher = app.FaqMatcher(bayut)
+    queries = [_question(rnd) for _ in range(60)] + [_question(random.Random(q)) for q in bayut[:10]]
+    for q in queries:
+        assert matcher.matches(q) == _reference(bayut, q), (bayut, q)
+
+
+def _faq_nodes(questions):
+    return [{"level": 2, "header": "Frequently Asked Questions", "content": "", "children": [
+        {"level": 3, "header": q, "content": "Yes, according to residents and agents in the area.", "children": []}
+        for q in questions]}]
+
+
+def test_cached_matcher_follows_the_bayut_nodes():
+    fr = app.FetchResult(True, "jina", 200, "", "Bayut guide text", None)
+    nodes = _faq_nodes(BAYUT[:3])
+    first = app.get_bayut_faq_matcher(fr, nodes)
+    assert app.get_bayut_faq_matcher(fr, nodes) is first
+    assert fr.__dict__["_faq_matcher"] == (nodes, first)
+    assert first.matches("Is JVC a good place to live?")
+
+    # The rerun rebuilt the Bayut tree: the matcher must be rebuilt from the new questions.
+    new_nodes = _faq_nodes(["Is parking free in JVC?", "Are pets allowed in JVC parks?"])
+    second = app.get_bayut_faq_matcher(fr, new_nodes)
+    assert second is not first and fr.__dict__["_faq_matcher"][0] is new_nodes
+    assert not second.matches("Is JVC a good place to live?")
+    assert second.matches("Is parking free in JVC?")
+    # An equal but distinct nodes list is a different tree too.
+    assert app.get_bayut_faq_matcher(fr, _faq_nodes(["Is parking free in JVC?", "Are pets allowed in JVC parks?"])) \
+        is not second
@@ -0,0 +1,62 @@
+"""FetchCache: cheap writes, orphan bodies reclaimed on eviction, and live fetches on request."""
+import app
+
+URL = "https://competitor.example/guide"
+
+
+def _outcome(i, size=2000):
+    body = f"<html><body><h2>Version {i}</h2><p>{'x' * size}{i}</p></body></html>"
+    return {"tier": "direct", "status": 200, "html": body, "text": f"Version {i} text", "headings": 1}
+
+
+def _blob_bytes(cache):
+    return cache._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+
+def test_writes_do_not_scan_for_orphans():
+    cache = app.FetchCache(":memory:")
+    statements = []
+    cache._db.set_trace_callback(statements.append)
+    for i in range(5):
+        cache.put(f"{URL}/{i}", "direct", _outcome(i))
+    assert not [q for q in statements if "NOT IN" in q]
+
+
+def test_replaced_bodies_are_reclaimed_when_evicting():
+    cache = app.FetchCache(":memory:", max_bytes=10**9)
+    for i in range(20):
+        cache.put(URL, "direct", _outcome(i))  # each write orphans the previous bodies
+    assert cache._bytes == _blob_bytes(cache)
+    live = cache.get(URL, "direct")
+
+    cache.max_bytes = cache._bytes - 1
+    cache.put(URL + "/other", "direct", _outcome(99))
+    # Sweeping the orphans was enough: nothing live was evicted.
+    assert cache.stats["evicted"] == 0
+    assert cache.get(URL, "direct")["html"] == live["html"]
+    assert cache._bytes == _blob_bytes(cache) <= cache.max_bytes
+
+
+SECTIONS = "<html><body><article>" + "".join(
+    f"<h2>Section {i}</h2><p>Section {i} text about rents of AED {40_000 + i} in JVC.</p>" for i in range(40)
+) + "</article></body></html>"
+
+
+def test_bypass_fetches_live_and_refreshes_the_entry(stub_agent):
+    cache = app.FetchCache(":memory:")
+    agent = stub_agent({"direct": {"status": 200, "html": SECTIONS}}, cache=cache)
+    assert agent.resolve(URL).ok and agent.runs == [["direct"]]
+    assert agent.resolve(URL).ok and agent.runs[-1] == []  # fresh cache entry answers
+    writes = cache.stats["writes"]
+    assert agent.resolve(URL, cache_mode="bypass").ok and agent.runs[-1] == ["direct"]
+    assert cache.stats["writes"] == writes + 1
+
+
+def test_fetch_cache_env_opt_out(monkeypatch):
+    monkeypatch.setattr(app, "FETCH_CACHE_ENABLED", False)
+    monkeypatch.setattr(app, "FETCH_CACHE_PATH", ":memory:")
+    app.get_fetch_cache.clear()
+    try:
+        assert app.get_fetch_cache() is None
+    finally:
+        app.get_fetch_cache.clear()
@@ -0,0 +1,68 @@
+"""Per-domain fetch profiles: the learned tier order must never cost a page its HTML."""
+import pytest
+
+import app
+
+URL = "https://competitor.example/living-in-jvc"
+TITLE = "Living in JVC: Real Title"
+DESC = "What it is like to live in Jumeirah Village Circle."
+
+# Direct: real page HTML with one section, usable but under the early-exit bar.
+DIRECT_HTML = (
+    f"<html><head><title>{TITLE}</title><meta name='description' content='{DESC}'></head><body><article>"
+    "<h1>Living in JVC</h1><h2>Overview</h2>"
+    + "".join(f"<p>Overview point {i}: parks, schools and clinics are close to most buildings.</p>" for i in range(8))
+    + "</article></body></html>"
+)
+# Jina: long markdown with plenty of headings, clears the bar on its own.
+JINA_TEXT = "Title: Living in JVC\n\n" + "".join(
+    f"## Section {i}\n\nSection {i} covers rents around AED {40_000 + i * 1_000} and nearby schools in detail.\n\n"
+    for i in range(30)
+)
+
+
+# Direct is usable but under the bar, Jina clears it, Textise is refused.
+ANSWERS = {
+    "direct": {"status": 200, "html": DIRECT_HTML},
+    "jina": {"status": 200, "text": app.clean(JINA_TEXT), "headings": JINA_TEXT.count("\n## ") + 1},
+    "textise": {"status": 403},
+}
+
+
+@pytest.mark.parametrize("parallel_tiers", [True, False])
+def test_learned_order_keeps_page_html(stub_agent, parallel_tiers):
+    profiles = app.FetchProfiles(":memory:")
+    agent = stub_agent(ANSWERS, profiles=profiles, parallel_tiers=parallel_tiers)
+    assert not agent._clears_bar(agent._fetch_tier("direct", URL)), "fixture: direct must stay under the bar"
+
+    plans = []
+    for _ in range(5):
+        plans.append(agent.plan_tiers(URL))
+        fr = agent.resolve(URL)
+        assert fr.ok and fr.source == "jina"
+        assert fr.html, "reader tier result lost the page HTML"
+        assert app.extract_head_seo(fr.html) == (TITLE, DESC)
+
+    # Jina clears the bar so it learns to go first, but direct still runs for the HTML ...
+    assert plans[0][0] == "direct" and plans[-1][0] == "jina"
+    assert all("direct" in tiers for tiers in agent.runs)
+    # ... and direct (last attempt brought content) ranks ahead of the failing textise tier.
+    assert plans[1].index("direct") < plans[1].index("textise")
+
+
+def test_untried_tiers_rank_behind_tiers_that_brought_content():
+    profiles = app.FetchProfiles(":memory:")
+    profiles.record_tier("a.example", "direct", usable=True, cleared=False, reason="", latency_ms=50, status=200)
+    assert profiles.plan("a.example")[0] == "direct"
+    profiles.record_tier("a.example", "jina", usable=False, cleared=False, reason="http_403", latency_ms=5, status=403)
+    assert profiles.plan("a.example")[-1] == "jina"
+
+
+def test_reader_tier_settles_once_html_tiers_are_cooling(stub_agent):
+    profiles = app.FetchProfiles(":memory:", skip_after=1)
+    profiles.record_tier(app.domain_of(URL), "direct", usable=False, cleared=False, reason="http_403",
+                         latency_ms=5, status=403)
+    agent = stub_agent(ANSWERS, profiles=profiles)
+    fr = agent.resolve(URL)
+    # Direct sits out, so no HTML tier is planned and Jina settles the URL on its own.
+    assert fr.ok and fr.source == "jina" and agent.runs[-1] == ["jina"]
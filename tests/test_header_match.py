@@ -0,0 +1,178 @@
+"""
+HeaderIndex / find_best_bayut_match against the original pairwise loop, kept below as the
+reference: the same section (first one on ties) and the same score for every query, on fixed
+cases and seeded random header sets with duplicates, polarity pairs and near-misses.
+"""
+import random
+from difflib import SequenceMatcher
+
+import pytest
+
+import app
+
+
+# Original implementation: score every section pairwise, keep the first best.
+def reference_similarity(a, b):
+    a_n, b_n = app.norm_header(a), app.norm_header(b)
+    if not a_n or not b_n:
+        return 0.0
+    a_set, b_set = set(a_n.split()), set(b_n.split())
+    jacc = len(a_set & b_set) / max(len(a_set | b_set), 1) if a_set and b_set else 0.0
+    seq = SequenceMatcher(None, a_n, b_n).ratio()
+    base = (0.55 * seq) + (0.45 * jacc)
+    a_core, b_core = set(app._header_core_tokens(a)), set(app._header_core_tokens(b))
+    if not a_core or not b_core:
+        return base
+    core_jacc = len(a_core & b_core) / max(len(a_core | b_core), 1)
+    core_seq = SequenceMatcher(None, " ".join(sorted(a_core)), " ".join(sorted(b_core))).ratio()
+    core_score = (0.60 * core_seq) + (0.40 * core_jacc)
+    subset_bonus = 0.0
+    smallest = min(len(a_core), len(b_core))
+    if 2 <= smallest <= 3 and (a_core.issubset(b_core) or b_core.issubset(a_core)):
+        subset_bonus = 0.84
+    score = max(base, core_score, subset_bonus)
+    for pos_words, neg_words in app.HEADER_OPPOSITE_GROUPS:
+        a_pos, a_neg = app._header_has_any_marker(a, pos_words), app._header_has_any_marker(a, neg_words)
+        b_pos, b_neg = app._header_has_any_marker(b, pos_words), app._header_has_any_marker(b, neg_words)
+        if (a_pos and b_neg) or (a_neg and b_pos):
+            score *= 0.58
+            break
+    return score
+
+
+def reference_best_match(comp_header, bayut_sections, min_score=app.HEADER_MATCH_MIN_SCORE):
+    best, best_score = None, 0.0
+    for b in bayut_sections:
+        sc = reference_similarity(comp_header, b["header"])
+        if sc > best_score:
+            best_score, best = sc, b
+    if best and best_score >= min_score:
+        return {"bayut_section": best, "score": best_score}
+    if not best:
+        return None
+    comp_core = set(app._header_core_tokens(comp_header))
+    best_core = set(app._header_core_tokens(best.get("header", "")))
+    if comp_core and best_core:
+        overlap = len(comp_core & best_core) / max(min(len(comp_core), len(best_core)), 1)
+        if overlap >= 0.67 and best_score >= app.SIMILAR_HEADER_MATCH_FALLBACK:
+            return {"bayut_section": best, "score": best_score}
+    return None
+
+
+def _sections(headers):
+    return [{"level": 2, "header": h, "content": f"About {h}.", "children": []} for h in headers]
+
+
+def _assert_same(query, sections, index, min_score=app.HEADER_MATCH_MIN_SCORE):
+    expected = reference_best_match(query, sections, min_score)
+    got = app.find_best_bayut_match(query, index, min_score=min_score)
+    if expected is None:
+        assert got is None, query
+    else:
+        assert got is not None and got["bayut_section"] is expected["bayut_section"], query
+        assert got["score"] == expected["score"], query
+
+
+BAYUT = [
+    "Living in JVC", "Pros of Living in JVC", "Cons of Living in JVC", "Schools in JVC", "Schools in JVC",
+    "Restaurants in JVC", "Cost of Living", "Transportation in JVC", "Getting Around JVC", "Parks and Recreation",
+    "Advantages of Renting", "Disadvantages of Renting", "FAQs", "", "Supermarkets near JVC", "Mosques in JVC",
+]
+QUERIES = [
+    "Living in JVC", "living in jvc!", "Pros of living in Jumeirah Village Circle", "Cons of Living in JVC",
+    "Benefits of living in JVC", "Drawbacks of living in JVC", "Schools", "Best schools in JVC", "Nurseries in JVC",
+    "Dining in JVC", "Transport", "Public Transport in JVC", "Parks", "Advantages", "Disadvantages of Buying",
+    "Frequently Asked Questions", "Healthcare in JVC", "", "JVC", "Cost of living in Dubai",
+]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_fixed_queries_match_reference(query):
+    sections = _sections(BAYUT)
+    index = app.HeaderIndex(sections)
+    for min_score in (app.HEADER_MATCH_MIN_SCORE, 0.5, 0.8):
+        _assert_same(query, sections, index, min_score)
+    assert app.find_best_bayut_match(query, sections) == reference_best_match(query, sections)
+
+
+def test_ties_resolve_to_the_first_section():
+    sections = _sections(["Schools in JVC", "Parks", "Schools in JVC", "schools in jvc"])
+    m = app.find_best_bayut_match("Schools in JVC", app.HeaderIndex(sections))
+    assert m["bayut_section"] is sections[0]
+    assert m == reference_best_match("Schools in JVC", sections)
+
+
+def test_tie_with_a_looser_bound_later_keeps_the_first_section():
+    # Equal scores, but the second section's upper bound is higher, so it is scored first.
+    sections = _sections(["Disadvantages Transport", "Transport Drawbacks"])
+    index = app.HeaderIndex(sections)
+    a, b = (app._similarity_upper_bound(app.header_features("Community Transport"), f) for f in index.features)
+    assert b > a
+    assert index.best("Community Transport") == (0, reference_similarity("Community Transport", sections[1]["header"]))
+    _assert_same("Community Transport", sections, index, min_score=0.6)
+
+
+def test_polarity_pairs_do_not_match():
+    sections = _sections(["Pros of Living in JVC"])
+    assert app.find_best_bayut_match("Cons of Living in JVC", sections) is None
+    assert reference_best_match("Cons of Living in JVC", sections) is None
+    assert app.header_similarity("Advantages", "Disadvantages") == reference_similarity("Advantages", "Disadvantages")
+
+
+def test_no_overlap_floor_holds():
+    # Headers sharing no word or core token never score above the floor the index prunes with,
+    # but below it they still count: a misspelt header can score 0.54 with no token in common.
+    sections = _sections(["Schools in JVC", "Kensington Waterfront", "Downtown Boulevard"])
+    index = app.HeaderIndex(sections)
+    for query in ("Kensingten Waterfrunt", "Dowtown Bouleverd"):
+        assert 0.5 < reference_similarity(query, index.sections[1 if query[0] == "K" else 2]["header"]) <= 0.6
+        _assert_same(query, sections, index, min_score=0.5)
+        assert index.any_at_least(query, 0.5)
+
+    rnd = random.Random(7)
+    words = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel", "india", "juliet"]
+    for _ in range(400):
+        a = " ".join(rnd.sample(words[:5], rnd.randint(1, 3)))
+        b = " ".join(rnd.sample(words[5:], rnd.randint(1, 3)))
+        assert reference_similarity(a, b) <= app._NO_OVERLAP_MAX_SCORE
+
+
+VOCAB = [
+    "living", "in", "jvc", "dubai", "marina", "schools", "school", "parks", "park", "restaurants", "cafes",
+    "cost", "of", "rent", "rents", "renting", "buying", "transport", "metro", "community", "amenities",
+    "pros", "cons", "advantages", "disadvantages", "benefits", "drawbacks", "the", "best", "top", "guide",
+    "healthcare", "hospitals", "faqs", "nearby", "near", "location", "lifestyle", "villas", "apartments",
+]
+
+
+def _header(rnd):
+    return " ".join(rnd.choice(VOCAB) for _ in range(rnd.randint(1, 6))).title()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_header_sets_match_reference(seed):
+    rnd = random.Random(seed)
+    headers = [_header(rnd) for _ in range(rnd.randint(1, 30))]
+    headers += rnd.sample(headers, min(len(headers), 4))  # duplicates
+    rnd.shuffle(headers)
+    sections = _sections(headers)
+    index = app.HeaderIndex(sections)
+    # Queries: fresh headers, exact and near copies of Bayut headers, and polarity flips.
+    queries = [_header(rnd) for _ in range(60)] + rnd.sample(headers, min(len(headers), 20))
+    queries += [h.replace("Pros", "Cons").replace("Advantages", "Disadvantages") for h in headers[:20]]
+    queries += [h + " " + rnd.choice(VOCAB) for h in headers[:20]]
+    for q in queries:
+        _assert_same(q, sections, index, rnd.choice([app.HEADER_MATCH_MIN_SCORE, 0.5, 0.8]))
+        threshold = rnd.choice([0.55, 0.62, app.HEADER_MATCH_MIN_SCORE, 0.8])
+        assert index.any_at_least(q, threshold) == any(
+            reference_similarity(q, s["header"]) >= threshold for s in sections), q
+
+
+def test_only_header_length_text_is_memoized():
+    app._norm_header_cached.cache_clear()
+    body = "Rents in JVC start around AED 45,000 a year; service charges vary by building. " * 20
+    assert app.norm_header(body) == app._norm_header(body)
+    assert app._norm_header_cached.cache_info().currsize == 0
+    assert app.norm_header("  Schools in JVC! ") == "schools in jvc"
+    assert app._norm_header_cached.cache_info().currsize == 1
+    assert app.norm_header(None) == ""
@@ -0,0 +1,145 @@
+"""
+Parser backends: ParsedPage's read-only views may read an lxml tree, but every analyzer answer
+(and the heading trees, FAQ and gap rows built on the html.parser soup) must match the
+html.parser reference. Fixture pages live in tests/fixtures/html/.
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+import app
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+PAGES = sorted(f for f in os.listdir(FIXTURES) if f.endswith(".html"))
+BAYUT = "bayut_guide.html"
+PAGE_URL = "https://www.bayut.com/mybayut/living-in-jvc/"
+
+needs_lxml = pytest.mark.skipif(not app.LXML_OK, reason="lxml not installed")
+
+
+def _read(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as fh:
+        return fh.read()
+
+
+def _views(html, backend):
+    page = app.ParsedPage(html, backend=backend)
+    return {
+        "links": page.links,
+        "images": page.images,
+        "meta_tags": page.meta_tags,
+        "title": page.title,
+        "jsonld": page.jsonld,
+        "heading_counts": page.heading_counts,
+        "count_images": app._count_images(page),
+        "count_headers": app._count_headers(page),
+        "external_links": app._count_external_links(page, PAGE_URL),
+        "schema_present": app._schema_present(page),
+        "head_seo": app.extract_head_seo(page),
+    }
+
+
+def _page_outputs(monkeypatch, backend):
+    """Trees, FAQ answers and gap rows for the whole corpus with `backend` behind the views."""
+    monkeypatch.setattr(app, "HTML_VIEW_BACKEND", backend)
+    monkeypatch.setattr(app, "ANALYSIS_WORKERS", 1)
+    frs = {name: app.FetchResult(True, "direct", 200, _read(name), "", None) for name in PAGES}
+    trees = {name: app.get_tree_from_fetchresult(fr) for name, fr in frs.items()}
+    faq = {
+        name: [app.page_has_real_faq(fr, trees[name]["nodes"]), app.extract_faq_questions(fr, trees[name]["nodes"]),
+               app.extract_faq_pairs(fr, trees[name]["nodes"])]
+        for name, fr in frs.items()
+    }
+    comps = [name for name in PAGES if name != BAYUT]
+    gaps = app.build_update_gap_rows(frs[BAYUT], trees[BAYUT]["nodes"], comps, frs, trees)
+    return json.loads(json.dumps({"trees": trees, "faq": faq, "gaps": gaps}, default=str))
+
+
+def test_soup_defaults_to_html_parser():
+    assert app.HTML_PARSER == "html.parser"
+    assert app.ParsedPage("<p>x</p>").parser == "html.parser"
+
+
+def test_fixture_trees_are_built_on_html_parser():
+    # HTML5 omitted </p> before a heading: the tree must come from the html.parser soup
+    # whatever the view backend is.
+    html = _read("omitted_end_tags.html")
+    expected = app.build_tree_from_html(app.ParsedPage(html, parser="html.parser", backend="html.parser"))
+    assert app.build_tree_from_html(html) == expected
+    assert [c["header"] for c in expected[0]["children"]] == [
+        "Getting Around", "Community Facilities", "Frequently Asked Questions"]
+
+
+def test_lxml_is_imported_on_first_parse():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = (
+        f"import sys; sys.path.insert(0, {root!r}); import app; loaded = 'lxml' in sys.modules; "
+        "app.ParsedPage('<p><a href=\"/x\">x</a></p>', backend=app.HTML_VIEW_BACKEND).links; "
+        "print(loaded, ('lxml.html' in sys.modules) == (app.HTML_VIEW_BACKEND == 'lxml'))"
+    )
+    env = dict(os.environ, FETCH_CACHE_PATH="", FETCH_PROFILE_PATH="", TRACE_EXPORT_PATH="")
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=120, env=env)
+    assert out.stdout.split() == ["False", "True"], out.stderr[-2000:]
+
+
+@needs_lxml
+def test_lxml_soup_would_reshape_the_tree():
+    # Why the soup stays on html.parser: lxml closes the omitted end tags elsewhere.
+    html = _read("omitted_end_tags.html")
+    ref = app.build_tree_from_html(app.ParsedPage(html, parser="html.parser"))
+    assert app.build_tree_from_html(app.ParsedPage(html, parser="lxml")) != ref
+
+
+@needs_lxml
+@pytest.mark.parametrize("name", PAGES)
+def test_views_match_across_backends(name):
+    html = _read(name)
+    assert _views(html, "lxml") == _views(html, "html.parser")
+
+
+@needs_lxml
+def test_trees_faq_and_gaps_match_across_backends(monkeypatch):
+    reference = _page_outputs(monkeypatch, "html.parser")
+    assert reference["gaps"], "fixture corpus should produce gap rows"
+    assert _page_outputs(monkeypatch, "lxml") == reference
+
+
+def _random_html(seed):
+    """Messy but plausible markup: omitted end tags, misnesting, boilerplate, JSON-LD."""
+    rnd = random.Random(seed)
+    tags = ["p", "div", "span", "li", "ul", "section", "article", "nav", "footer", "aside", "b", "a", "table", "td"]
+    parts = ["<html><head>" if rnd.random() < 0.8 else "", f"<title>Page {seed} &amp; guide</title>"]
+    if rnd.random() < 0.5:
+        parts.append('<script type="application/ld+json">{"@type": "FAQPage", "mainEntity": []}</script>')
+    parts.append(f'<meta name="description" content="Description {seed}"></head><body>')
+    for i in range(rnd.randint(10, 60)):
+        r = rnd.random()
+        if r < 0.2:
+            parts.append(f"<h{rnd.randint(1, 4)}>Heading {i} about topic {rnd.randint(1, 9)}")
+            if rnd.random() < 0.8:
+                parts.append(f"</h{rnd.randint(1, 4)}>")
+        elif r < 0.7:
+            tag = rnd.choice(tags)
+            attrs = f' href="https://site{rnd.randint(0, 3)}.example/{i}"' if tag == "a" else ""
+            parts.append(f"<{tag}{attrs}>Text {i} with some words")
+            if rnd.random() < 0.6:
+                parts.append(f"</{rnd.choice(tags) if rnd.random() < 0.2 else tag}>")
+        elif r < 0.8:
+            parts.append(f'<img src="/{i}.png"' + (' alt="x">' if rnd.random() < 0.5 else ">"))
+        elif r < 0.9:
+            parts.append(f'<meta property="og:x{i}" content="{i}">')
+        else:
+            parts.append(rnd.choice(["</p>", "</div>", "<br>", "<hr>", "</li>", "</ul>", "<!-- c -->"]))
+    parts.append("</body></html>" if rnd.random() < 0.7 else "")
+    return "".join(parts)
+
+
+@needs_lxml
+@pytest.mark.parametrize("seed", range(60))
+def test_random_markup_views_match_across_backends(seed):
+    html = _random_html(seed)
+    assert _views(html, "lxml") == _views(html, "html.parser")
@@ -0,0 +1,155 @@
+"""
+RunTrace / trace_span: nesting across thread hand-offs, the span cap, error status, and the
+OTLP/JSON export.
+"""
+import contextvars
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def trace():
+    t = app.start_run_trace("test-run", mode="update")
+    yield t
+    app.finish_run_trace(t, export_path="")
+
+
+def _by_name(trace):
+    return {s["name"]: s for s in trace.spans}
+
+
+def test_spans_nest_by_the_open_span(trace):
+    with app.trace_span("outer", "stage"):
+        with app.trace_span("inner", "analyze", url="https://a.example/"):
+            pass
+    spans = _by_name(trace)
+    assert spans["outer"]["parent_id"] == trace.root_id
+    assert spans["inner"]["parent_id"] == spans["outer"]["span_id"]
+    assert spans["outer"]["start_ms"] <= spans["inner"]["start_ms"] <= spans["inner"]["end_ms"] <= spans["outer"]["end_ms"]
+    assert spans["inner"]["attrs"] == {"url": "https://a.example/"}
+
+
+def test_thread_hand_offs_keep_their_parent(trace):
+    def fetch(url):
+        with app.trace_span("fetch", "fetch", url=url):
+            with app.trace_span("tier", "fetch", url=url):
+                pass
+
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="trace-test") as pool:
+        with app.trace_span("stage", "stage"):
+            futures = [pool.submit(contextvars.copy_context().run, fetch, f"https://{i}.example/") for i in range(6)]
+            for f in futures:
+                f.result()
+        # Without the copied context a thread sees no active run: nothing is recorded.
+        pool.submit(fetch, "https://untraced.example/").result()
+
+    stage = _by_name(trace)["stage"]
+    fetches = [s for s in trace.spans if s["name"] == "fetch"]
+    tiers = {s["attrs"]["url"]: s for s in trace.spans if s["name"] == "tier"}
+    assert len(fetches) == len(tiers) == 6
+    for f in fetches:
+        assert f["parent_id"] == stage["span_id"] and f["thread"].startswith("trace-test")
+        assert tiers[f["attrs"]["url"]]["parent_id"] == f["span_id"]
+    # The hand-off leaves the submitting thread's current span alone.
+    with app.trace_span("after", "stage"):
+        pass
+    assert _by_name(trace)["after"]["parent_id"] == trace.root_id
+
+
+def test_spans_past_the_cap_are_counted_not_kept(trace, monkeypatch):
+    monkeypatch.setattr(app, "TRACE_MAX_SPANS", 5)
+    for i in range(8):
+        with app.trace_span(f"s{i}", "parse"):
+            pass
+    trace.add("worker", "analyze", 0.0, 1.0)
+    assert len(trace.spans) == 5 and trace.dropped == 4
+    assert trace.to_json()["dropped_spans"] == 4
+
+
+def test_exception_marks_the_span_as_error(trace):
+    with pytest.raises(ValueError):
+        with app.trace_span("outer", "stage"):
+            with app.trace_span("broken", "analyze"):
+                raise ValueError("bad page")
+    spans = _by_name(trace)
+    assert spans["broken"]["status"] == spans["outer"]["status"] == "error"
+    assert spans["broken"]["attrs"]["error"] == "ValueError: bad page"
+    with app.trace_span("next", "stage"):
+        pass
+    assert _by_name(trace)["next"]["parent_id"] == trace.root_id
+    assert trace.summary().set_index("Span").loc["broken", "Errors"] == 1
+
+
+def test_traced_decorator_and_no_active_run():
+    @app.traced("stage")
+    def build(x):
+        return x * 2
+
+    assert app.active_trace() is None
+    with app.trace_span("noop", "stage", url="u") as attrs:
+        attrs["rows"] = 1
+    assert build(2) == 4
+
+    t = app.start_run_trace("decorated")
+    try:
+        assert build(3) == 6
+    finally:
+        app.finish_run_trace(t, export_path="")
+    assert [s["name"] for s in t.spans] == ["build"] and app.active_trace() is None
+
+
+def test_otlp_shape(trace):
+    with app.trace_span("stage", "stage"):
+        with app.trace_span("fetch", "fetch", url="https://a.example/", status=200, ok=True, ms=1.5, none=None):
+            pass
+    with pytest.raises(RuntimeError):
+        with app.trace_span("failing", "serp"):
+            raise RuntimeError("quota")
+    trace.finish(export_path="")
+
+    doc = trace.to_otlp()
+    assert list(doc) == ["resourceSpans"] and len(doc["resourceSpans"]) == 1
+    resource = doc["resourceSpans"][0]
+    assert resource["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": app.TRACE_SERVICE_NAME}}]
+    spans = resource["scopeSpans"][0]["spans"]
+    root, by_name = spans[0], {s["name"]: s for s in spans[1:]}
+
+    assert root["spanId"] == trace.root_id and "parentSpanId" not in root and root["name"] == "test-run"
+    assert {"key": "mode", "value": {"stringValue": "update"}} in root["attributes"]
+    assert all(s["traceId"] == trace.trace_id and len(s["traceId"]) == 32 and len(s["spanId"]) == 16 for s in spans)
+    assert by_name["stage"]["parentSpanId"] == trace.root_id
+    assert by_name["failing"]["parentSpanId"] == trace.root_id
+    assert by_name["fetch"]["parentSpanId"] == by_name["stage"]["spanId"]
+
+    attrs = {a["key"]: a["value"] for a in by_name["fetch"]["attributes"]}
+    assert attrs["status"] == {"intValue": "200"}  # OTLP/JSON encodes int64 as a string
+    assert attrs["ok"] == {"boolValue": True} and attrs["ms"] == {"doubleValue": 1.5}
+    assert attrs["run.kind"] == {"stringValue": "fetch"} and "none" not in attrs
+    assert by_name["fetch"]["kind"] == by_name["failing"]["kind"] == 3 and by_name["stage"]["kind"] == 1
+    assert by_name["failing"]["status"] == {"code": 2} and by_name["stage"]["status"] == {"code": 1}
+    for s in spans:
+        assert isinstance(s["startTimeUnixNano"], str) and int(s["startTimeUnixNano"]) <= int(s["endTimeUnixNano"])
+    assert int(root["endTimeUnixNano"]) - int(root["startTimeUnixNano"]) == pytest.approx(trace.duration_ms * 1e6, abs=1e3)
+
+
+def test_export_appends_one_json_line_per_run(tmp_path):
+    path = str(tmp_path / "traces" / "runs.jsonl")
+    traces = []
+    for name in ("first", "second"):
+        t = app.start_run_trace(name)
+        with app.trace_span("stage", "stage"):
+            pass
+        traces.append(app.finish_run_trace(t, export_path=path))
+    traces[0].finish(export_path=path)  # finishing again does not export again
+
+    with open(path, encoding="utf-8") as fh:
+        lines = fh.read().splitlines()
+    assert len(lines) == 2
+    docs = [json.loads(line) for line in lines]
+    assert [d["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["name"] for d in docs] == ["first", "second"]
+    assert docs == [t.to_otlp() for t in traces]
@@ -0,0 +1,125 @@
+"""
+DataForSeoTaskClient (standard task queue) against the local DataForSEO mock in
+benchmarks/dataforseo_mock.py: batching, tag mapping, tasks_ready polling, timeouts, the
+cost ledger and the SERP cache.
+"""
+import json
+import os
+import sys
+
+import pytest
+
+import app
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from dataforseo_mock import start_mock  # noqa: E402
+
+DROP = "keyword the api loses"
+
+
+@pytest.fixture
+def mock():
+    server, base = start_mock(queue_delay=0.3, live_latency=0)
+    yield server, base
+    server.shutdown()
+
+
+class LossySession:
+    """The app's session, except task_post answers leave out the task tagged for DROP."""
+
+    def __init__(self):
+        self.session = app.build_http_session(retries=0)
+
+    def request(self, method, url, **kwargs):
+        r = self.session.request(method, url, **kwargs)
+        if url.endswith("/task_post"):
+            data = r.json()
+            data["tasks"] = [t for t in data["tasks"] if (t.get("data") or {}).get("keyword") != DROP]
+            r._content = json.dumps(data).encode("utf-8")
+        return r
+
+
+def _client(base, session=None, **kwargs):
+    kwargs.setdefault("poll_interval", 0.1)
+    kwargs.setdefault("timeout", 10)
+    return app.DataForSeoTaskClient(
+        login="test", password="test", base_url=base, session=session or app.build_http_session(retries=0),
+        cache=app.SerpCache(":memory:"), ledger=app.SerpCostLedger(), **kwargs)
+
+
+def _keyword(data):
+    return data["tasks"][0]["result"][0]["keyword"]
+
+
+def test_large_runs_are_posted_in_batches_and_mapped_back_by_tag(mock):
+    server, base = mock
+    queries = [f"apartments for rent in area {i}" for i in range(app.DATAFORSEO_TASK_BATCH * 2 + 30)]
+    client = _client(base)
+    results = client.run([(q, "mobile") for q in queries])
+
+    assert server.state.calls["task_post"] == client.stats["post_calls"] == 3
+    assert client.stats["posted"] == client.stats["collected"] == len(queries)
+    for q in queries:
+        assert _keyword(results[(app.normalize_serp_query(q), "mobile")]) == q
+
+
+def test_results_are_collected_by_polling_tasks_ready(mock):
+    server, base = mock
+    client = _client(base)
+    results = client.run([("living in jvc", "mobile"), ("living in jvc", "desktop")])
+    assert server.state.calls["tasks_ready"] == client.stats["polls"] >= 2  # the first poll finds nothing ready
+    assert server.state.calls["task_get"] == 2
+    assert app._dataforseo_rank_map(results[("living in jvc", "mobile")])
+
+
+def test_duplicate_queries_are_posted_once(mock):
+    server, base = mock
+    client = _client(base)
+    results = client.run([("Living in JVC", "mobile"), ("  living  in jvc ", "mobile")])
+    assert list(results) == [("living in jvc", "mobile")] and client.stats["posted"] == 1
+
+
+def test_task_missing_from_post_response(mock):
+    _, base = mock
+    client = _client(base, session=LossySession())
+    results = client.run([("schools near jvc", "mobile"), (DROP, "mobile")])
+    assert results[(DROP, "mobile")] == {"_error": "dataforseo_task_missing"}
+    assert _keyword(results[("schools near jvc", "mobile")]) == "schools near jvc"
+    assert client.stats["failed"] == 1
+
+
+def test_tasks_not_ready_before_timeout(mock):
+    server, base = mock
+    server.state.queue_delay = 60
+    client = _client(base, timeout=0.5)
+    results = client.run([("parks in jvc", "mobile"), ("gyms in jvc", "mobile")])
+    assert all(r == {"_error": "dataforseo_task_timeout"} for r in results.values())
+    assert [row["Status"] for row in client.ledger.entries] == ["timeout", "timeout"]
+    assert len(client.cache._db.execute("SELECT * FROM serp").fetchall()) == 0
+
+
+def test_one_ledger_row_per_query(mock):
+    _, base = mock
+    queries = [f"villas for sale in area {i}" for i in range(7)]
+    client = _client(base)
+    client.run([(q, "mobile") for q in queries])
+    report = client.ledger.report()
+    assert sorted(report["Query"]) == sorted(queries)
+    assert set(report["Mode"]) == {"standard"} and set(report["Status"]) == {"ok"}
+    assert client.ledger.totals()["dataforseo/standard"] == {"calls": 7, "cost": round(7 * 0.0006, 6)}
+
+
+def test_collected_responses_land_in_the_serp_cache(mock):
+    server, base = mock
+    queries = ["restaurants in jvc", "malls near jvc", "beaches near jvc"]
+    client = _client(base)
+    first = client.run([(q, "mobile") for q in queries])
+    location = app._dataforseo_location_key()
+    for q in queries:
+        assert client.cache.get("dataforseo", q.upper(), "mobile", location) == first[(q, "mobile")]
+
+    posts = server.state.calls["task_post"]
+    again = client.run([(q, "mobile") for q in queries])
+    assert again == first and client.stats["cached"] == 3
+    assert server.state.calls["task_post"] == posts and len(client.ledger) == 3
@@ -0,0 +1,94 @@
+"""SerpCache: normalized query keys, TTL, LRU eviction, error responses, and replay mode."""
+import app
+
+LOC = "United Arab Emirates|en|google.ae|50"
+
+
+def _serp(query, filler=0):
+    return {"status_code": 20000, "tasks": [{"status_code": 20000, "result": [{"keyword": query, "pad": "x" * filler}]}]}
+
+
+def _use(monkeypatch, cache):
+    monkeypatch.setattr(app, "get_serp_cache", lambda: cache)
+
+
+def test_tests_keep_the_serp_cache_in_memory():
+    assert app.SERP_CACHE_PATH == "" and app.get_serp_cache().path == ":memory:"
+
+
+def test_query_key_ignores_case_width_and_whitespace():
+    assert app.normalize_serp_query("  Living   in\tJVC \n") == "living in jvc"
+    assert app.normalize_serp_query("ＪＶＣ　ｒｅｎｔｓ") == "jvc rents"  # full-width letters and space (NFKC)
+    assert app.normalize_serp_query("Café Dubai") == app.normalize_serp_query("Café dubai")
+    assert app.normalize_serp_query(None) == ""
+
+    cache = app.SerpCache(":memory:")
+    cache.put("dataforseo", "Living in JVC", "mobile", LOC, _serp("living in jvc"))
+    assert cache.get("dataforseo", " LIVING  in ｊｖｃ", "mobile", LOC) == _serp("living in jvc")
+    assert cache.get("dataforseo", "living in jvc", "desktop", LOC) is None
+    assert cache.get("serpapi", "living in jvc", "mobile", LOC) is None
+    assert cache.get("dataforseo", "living in jvc", "mobile", "other") is None
+
+
+def test_entries_expire_after_ttl():
+    cache = app.SerpCache(":memory:", ttl=3600)
+    cache.put("dataforseo", "jvc", "mobile", LOC, _serp("jvc"))
+    assert cache.get("dataforseo", "jvc", "mobile", LOC) is not None
+    cache.ttl = 0
+    assert cache.get("dataforseo", "jvc", "mobile", LOC) is None
+    assert cache.stats["expired"] == 1 and cache.stats["hits"] == 1
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path):
+    path = str(tmp_path / "serp.sqlite")
+    cache = app.SerpCache(path)
+    for q in ("a", "b", "c"):
+        cache.put("dataforseo", q, "mobile", LOC, _serp(q, 3000))
+    entry = cache._bytes // 3
+    cache.get("dataforseo", "a", "mobile", LOC)  # "b" is now the least recently used
+
+    cache.max_bytes = entry * 3 + entry // 2
+    cache.put("dataforseo", "d", "mobile", LOC, _serp("d", 3000))
+    assert cache.stats["evicted"] == 1
+    assert cache.get("dataforseo", "b", "mobile", LOC) is None
+    assert all(cache.get("dataforseo", q, "mobile", LOC) for q in ("a", "c", "d"))
+    assert cache._bytes <= cache.max_bytes
+
+    # The byte count survives a reopen (another process sharing the file).
+    assert app.SerpCache(path)._bytes == cache._bytes
+
+
+def test_error_responses_are_not_stored(monkeypatch):
+    cache = app.SerpCache(":memory:")
+    _use(monkeypatch, cache)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"_error": "dataforseo_http_500"} if len(calls) == 1 else _serp("jvc")
+
+    assert app.serp_cached_call("dataforseo", "jvc", "mobile", LOC, fetch) == {"_error": "dataforseo_http_500"}
+    assert cache.stats["writes"] == 0
+    assert app.serp_cached_call("dataforseo", "jvc", "mobile", LOC, fetch) == _serp("jvc")
+    assert app.serp_cached_call("dataforseo", "jvc", "mobile", LOC, fetch) == _serp("jvc")
+    assert len(calls) == 2
+    cache.put("dataforseo", "x", "mobile", LOC, ["not", "a", "response"])
+    assert cache.stats["writes"] == 1
+
+
+def test_replay_serves_stale_entries_and_never_calls_the_provider(monkeypatch):
+    cache = app.SerpCache(":memory:", ttl=0, mode="replay")
+    _use(monkeypatch, cache)
+    cache.put("dataforseo", "jvc", "mobile", LOC, _serp("jvc"))
+
+    def fetch():
+        raise AssertionError("replay mode must not call the provider")
+
+    assert app.serp_cached_call("dataforseo", "JVC", "mobile", LOC, fetch) == _serp("jvc")
+    assert app.serp_cached_call("dataforseo", "dubai marina", "mobile", LOC, fetch) == {"_error": "serp_replay_miss"}
+
+    client = app.DataForSeoTaskClient(login="x", password="x", base_url="http://127.0.0.1:9", cache=cache,
+                                      ledger=app.SerpCostLedger())
+    results = client.run([("jvc", "mobile"), ("dubai marina", "mobile")])
+    assert results == {("jvc", "mobile"): _serp("jvc"), ("dubai marina", "mobile"): {"_error": "serp_replay_miss"}}
+    assert len(client.ledger) == 0
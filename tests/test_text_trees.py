@@ -0,0 +1,144 @@
+"""
+Plain-text tree builders (reader markdown and the title-case heuristic) against the original
+line-by-line implementations, kept below as the reference. tests/fixtures/text_trees/<name>.json
+holds what the original builders produced for tests/fixtures/text/<name>.txt; the streaming
+builders must give byte-identical JSON for string input and for an iterable of lines.
+"""
+import io
+import json
+import os
+import random
+import re
+
+import pytest
+
+import app
+
+HERE = os.path.dirname(__file__)
+TEXT_DIR = os.path.join(HERE, "fixtures", "text")
+TREE_DIR = os.path.join(HERE, "fixtures", "text_trees")
+FIXTURES = sorted(f[:-4] for f in os.listdir(TEXT_DIR) if f.endswith(".txt"))
+
+
+# Original implementations, kept as the reference.
+def reference_reader_tree(text):
+    lines = [l.rstrip() for l in (text or "").splitlines()]
+    nodes, stack = [], []
+
+    def md_level(line):
+        m = re.match(r"^(#{1,4})\s+(.*)$", line.strip())
+        return (len(m.group(1)), app.clean(m.group(2))) if m else None
+
+    current = None
+    for line in lines:
+        s = line.strip()
+        if not s:
+            continue
+        ml = md_level(s)
+        if ml:
+            lvl, header = ml
+            if app.is_noise_header(header):
+                current = None
+                continue
+            while stack and stack[-1]["level"] >= lvl:
+                stack.pop()
+            node = {"level": lvl, "header": header, "content": "", "children": []}
+            (stack[-1]["children"] if stack else nodes).append(node)
+            stack.append(node)
+            current = node
+        elif current:
+            current["content"] += " " + s
+
+    def walk(n):
+        n["content"] = app.clean(n["content"])
+        n["children"] = [walk(c) for c in n["children"]]
+        return n
+
+    return [walk(n) for n in nodes]
+
+
+def reference_heuristic_tree(text):
+    raw = (text or "").replace("\r", "")
+    lines = [l for l in (app.clean(l) for l in raw.split("\n")) if l]
+
+    def looks_like_heading(line):
+        if len(line) < 5 or len(line) > 80 or line.endswith(".") or app.is_noise_header(line):
+            return False
+        words = line.split()
+        if len(words) < 2 or len(words) > 12:
+            return False
+        caps_ratio = sum(1 for w in words if w[:1].isupper()) / max(len(words), 1)
+        allcaps_ratio = sum(1 for c in line if c.isupper()) / max(sum(1 for c in line if c.isalpha()), 1)
+        return (caps_ratio >= 0.6) or (allcaps_ratio >= 0.5)
+
+    nodes, current = [], None
+    for line in lines:
+        if looks_like_heading(line):
+            current = {"level": 2, "header": line, "content": "", "children": []}
+            nodes.append(current)
+        else:
+            if current is None:
+                current = {"level": 2, "header": "Overview", "content": "", "children": []}
+                nodes.append(current)
+            current["content"] = app.clean(current["content"] + " " + line)
+    return nodes
+
+
+# (builder, how a caller hands it lines) per expected-JSON key.
+BUILDERS = {
+    "reader": (app.build_tree_from_reader_text, lambda t: iter(t.splitlines())),
+    "heuristic": (app.build_tree_from_plain_text_heuristic, lambda t: io.StringIO(t, newline="\n")),
+}
+REFERENCES = {"reader": reference_reader_tree, "heuristic": reference_heuristic_tree}
+
+
+def read_fixture(name):
+    with open(os.path.join(TEXT_DIR, name + ".txt"), encoding="utf-8", newline="") as fh:
+        return fh.read()
+
+
+def _dump(nodes):
+    return json.dumps(nodes, ensure_ascii=False)
+
+
+def _expected(name):
+    with open(os.path.join(TREE_DIR, name + ".json"), encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def test_every_fixture_has_expected_trees():
+    assert FIXTURES and all(os.path.exists(os.path.join(TREE_DIR, f + ".json")) for f in FIXTURES)
+
+
+@pytest.mark.parametrize("kind", sorted(BUILDERS))
+@pytest.mark.parametrize("name", FIXTURES)
+def test_fixture_matches_original_builder(name, kind):
+    text, expected = read_fixture(name), _dump(_expected(name)[kind])
+    build, as_lines = BUILDERS[kind]
+    assert _dump(build(text)) == expected
+    assert _dump(build(as_lines(text))) == expected
+
+
+def test_fixture_corpus_has_headed_trees():
+    # Guard against the expected files degenerating to empty lists.
+    trees = [_expected(name) for name in FIXTURES]
+    assert sum(bool(t["reader"]) for t in trees) >= 4 and sum(bool(t["heuristic"]) for t in trees) >= 8
+    assert any(n["children"] for t in trees for n in t["reader"])
+
+
+LINES = [
+    "# Living in JVC", "## Pros Of Living Here", "### Schools Nearby", "#### Nursery Options", "##   Spaced   Header  ",
+    "## Share this article", "## Related Articles", "#NoSpace", "##### Too Deep", "Plain sentence with words.",
+    "Title Case Line Here", "COST OF LIVING", "A B", "x", "", "   ", "tail \x0b text", "Überblick Über Alles Hier",
+    "- list item", "Rents vary widely across the community and the year.",
+]
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_random_text_matches_reference(seed):
+    rnd = random.Random(seed)
+    text = rnd.choice(["\n", "\r\n", "\r", "\n\n"]).join(rnd.choice(LINES) for _ in range(rnd.randint(0, 80)))
+    for kind, (build, as_lines) in BUILDERS.items():
+        expected = _dump(REFERENCES[kind](text))
+        assert _dump(build(text)) == expected, kind
+        assert _dump(build(as_lines(text))) == expected, kind
@@ -0,0 +1,54 @@
+"""
+build_tree_from_html (single document pass) against the nodes the original multi-pass builder
+produced for the same pages. tests/fixtures/trees/<page>.json was generated by the builder as
+it stood before the single-pass rewrite, on html.parser; regenerate only for an intended change.
+"""
+import json
+import os
+
+import pytest
+
+import app
+
+HERE = os.path.dirname(__file__)
+HTML_DIR = os.path.join(HERE, "fixtures", "html")
+TREE_DIR = os.path.join(HERE, "fixtures", "trees")
+PAGES = sorted(f[:-5] for f in os.listdir(HTML_DIR) if f.endswith(".html"))
+
+
+def _load(name):
+    with open(os.path.join(HTML_DIR, name + ".html"), encoding="utf-8") as fh:
+        html = fh.read()
+    with open(os.path.join(TREE_DIR, name + ".json"), encoding="utf-8") as fh:
+        return html, json.load(fh)
+
+
+def test_every_page_has_expected_nodes():
+    assert PAGES and all(os.path.exists(os.path.join(TREE_DIR, p + ".json")) for p in PAGES)
+
+
+@pytest.mark.parametrize("name", PAGES)
+def test_single_pass_matches_original_builder(name):
+    html, expected = _load(name)
+    assert app.build_tree_from_html(html) == expected
+
+
+@pytest.mark.parametrize("backend", ["html.parser", "lxml"])
+@pytest.mark.parametrize("name", PAGES)
+def test_fetch_result_tree_matches_on_each_view_backend(monkeypatch, name, backend):
+    if backend == "lxml" and not app.LXML_OK:
+        pytest.skip("lxml not installed")
+    monkeypatch.setattr(app, "HTML_VIEW_BACKEND", backend)
+    html, expected = _load(name)
+    fr = app.FetchResult(True, "direct", 200, html, "", None)
+    assert app.get_tree_from_fetchresult(fr)["nodes"] == expected
+
+
+def test_long_listicle_keeps_every_heading():
+    html, expected = _load("listicle_long")
+
+    def count(nodes):
+        return sum(1 + count(n["children"]) for n in nodes)
+
+    assert count(expected) >= 80
+    assert count(app.build_tree_from_html(html)) == count(expected)